@@ -0,0 +1,391 @@
+# SPDX-License-Identifier: MIT
+
+'''
+End-to-end call throughput and latency benchmarks
+
+Spawns a private ``dbus-daemon``, starts a server in a separate process and
+drives it with concurrent Jeepney clients, each in its own process. For each
+scenario we report the throughput and the p50/p99 latency.
+
+- ``ping`` - small method call
+- ``array`` - method returning a large array
+- ``buffer`` - same as ``array``, but returning an :class:`array.array`
+- ``property`` - ``org.freedesktop.DBus.Properties.Get``
+- ``introspect`` - ``org.freedesktop.DBus.Introspectable.Introspect``
+- ``signals`` - signal fan-out, every client receives every signal
+
+With ``--peer``, the clients connect directly to the server, without going
+through the bus daemon.
+
+Requires ``dbus-daemon`` to be available.
+'''
+
+import argparse
+import array
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from typing import Any, Dict, Iterator, List, Optional
+
+import jeepney
+import jeepney.io.blocking
+
+import dbus_objects
+
+from dbus_objects import DBusObject, dbus_method, dbus_property, dbus_signal
+from dbus_objects.integration.jeepney import AsyncioDBusServer, BlockingDBusServer, TrioDBusServer
+from dbus_objects.types import Int32Buffer
+
+
+NAME = 'io.github.ffy00.dbus_objects.benchmark'
+PATH = '/io/github/ffy00/dbus_objects/benchmark'
+INTERFACE_ROOT = 'io.github.ffy00.dbus_objects'
+INTERFACE = f'{INTERFACE_ROOT}.BenchmarkObject'
+
+SERVERS = ('blocking', 'trio', 'asyncio')
+SCENARIOS = ('ping', 'array', 'buffer', 'property', 'introspect', 'signals')
+
+
+class BenchmarkObject(DBusObject):
+    def __init__(self) -> None:
+        super().__init__(default_interface_root=INTERFACE_ROOT)
+        self._property = 'some property'
+
+    @dbus_method()
+    def ping(self) -> str:
+        return 'Pong!'
+
+    @dbus_method()
+    def get_array(self, size: int) -> List[int]:
+        return list(range(size))
+
+    @dbus_method()
+    def get_buffer(self, size: int) -> Int32Buffer:
+        return array.array('i', range(size))
+
+    @dbus_method()
+    def emit_ticks(self, count: int) -> None:
+        for _ in range(count):
+            self.tick(time.monotonic())
+
+    @dbus_property()
+    def prop(self) -> str:
+        return self._property
+
+    @prop.setter
+    def prop(self, value: str) -> None:
+        self._property = value
+
+    # the value is the time the signal was emitted at, the monotonic clock is
+    # shared between processes on Linux
+    tick = dbus_signal(sent=float)
+
+
+def serve(kind: str, address: str, workers: Optional[int], ready: Any, peer_address: Optional[str] = None) -> None:
+    '''
+    Runs the server, to be called in a new process
+
+    :param kind: server implementation
+    :param address: bus address
+    :param workers: number of concurrent calls, ``None`` to handle calls one at a time
+    :param ready: event set once the server is listening
+    :param peer_address: address to accept direct connections from peers on
+    '''
+    obj = BenchmarkObject()
+
+    if kind == 'blocking':
+        server = BlockingDBusServer(address, NAME)
+        server.register_object(PATH, obj)
+        if peer_address:
+            server.add_listener(peer_address)
+        ready.set()
+        server.listen(workers=workers)
+    elif kind == 'trio':
+        import trio
+
+        async def serve_trio() -> None:
+            server = await TrioDBusServer.new(address, NAME)
+            server.register_object(PATH, obj)
+            ready.set()
+            await server.listen(max_concurrent_calls=workers)
+        trio.run(serve_trio)
+    elif kind == 'asyncio':
+        async def serve_asyncio() -> None:
+            server = await AsyncioDBusServer.new(address, NAME)
+            server.register_object(PATH, obj)
+            ready.set()
+            await server.listen(max_concurrent_calls=workers)
+        asyncio.run(serve_asyncio())
+    else:  # pragma: no cover
+        raise ValueError(f'Unknown server: {kind}')
+
+
+def scenario_message(scenario: str, array_size: int) -> jeepney.Message:
+    '''
+    Creates the method call message for the scenario
+
+    :param scenario: scenario name
+    :param array_size: size of the array returned in the ``array`` scenario
+    '''
+    obj = jeepney.DBusAddress(PATH, bus_name=NAME, interface=INTERFACE)
+    if scenario == 'ping':
+        return jeepney.new_method_call(obj, 'Ping')
+    if scenario == 'array':
+        return jeepney.new_method_call(obj, 'GetArray', 'i', (array_size,))
+    if scenario == 'buffer':
+        return jeepney.new_method_call(obj, 'GetBuffer', 'i', (array_size,))
+    if scenario == 'property':
+        return jeepney.new_method_call(
+            obj.with_interface('org.freedesktop.DBus.Properties'), 'Get', 'ss', (INTERFACE, 'Prop')
+        )
+    if scenario == 'introspect':
+        return jeepney.new_method_call(obj.with_interface('org.freedesktop.DBus.Introspectable'), 'Introspect')
+    raise ValueError(f'Unknown scenario: {scenario}')  # pragma: no cover
+
+
+def call_client(address: str, msg: jeepney.Message, duration: float, barrier: Any, results: Any) -> None:
+    '''
+    Calls the method in a loop for the given duration, to be called in a new process
+
+    Puts the latency of every call in ``results``.
+
+    :param address: bus address
+    :param msg: method call to perform
+    :param duration: time to run for, in seconds
+    :param barrier: barrier used to start all the clients at the same time
+    :param results: queue to put the results in
+    '''
+    latencies = []
+    with jeepney.io.blocking.open_dbus_connection(address) as connection:
+        # warm up, and make sure the call works
+        reply = connection.send_and_get_reply(msg)
+        if reply.header.message_type == jeepney.MessageType.error:
+            raise RuntimeError(f'Call failed: {reply.body}')
+        barrier.wait()
+        end = time.perf_counter() + duration
+        now = time.perf_counter()
+        while now < end:
+            connection.send_and_get_reply(msg)
+            then, now = now, time.perf_counter()
+            latencies.append(now - then)
+    results.put(latencies)
+
+
+def signal_client(address: str, count: int, timeout: float, barrier: Any, results: Any) -> None:
+    '''
+    Receives the ``Tick`` signals, to be called in a new process
+
+    Puts the latency of every signal and the time the last one was received in ``results``.
+
+    :param address: bus address
+    :param count: number of signals to receive
+    :param timeout: maximum time to wait for the signals, in seconds
+    :param barrier: barrier used to signal that the client is subscribed
+    :param results: queue to put the results in
+    '''
+    rule = jeepney.MatchRule(type='signal', path=PATH, interface=INTERFACE, member='Tick')
+    latencies = []
+    with jeepney.io.blocking.open_dbus_connection(address) as connection:
+        connection.send_and_get_reply(jeepney.message_bus.AddMatch(rule))
+        barrier.wait()
+        end = time.monotonic() + timeout
+        while len(latencies) < count:
+            try:
+                msg = connection.receive(timeout=max(end - time.monotonic(), 0))
+            except TimeoutError:
+                break
+            if rule.matches(msg):
+                latencies.append(time.monotonic() - msg.body[0])
+    results.put((latencies, time.monotonic()))
+
+
+@contextlib.contextmanager
+def private_bus() -> Iterator[str]:
+    '''
+    Spawns a private ``dbus-daemon``, yields its address
+    '''
+    daemon = subprocess.Popen(
+        ['dbus-daemon', '--session', '--nofork', '--print-address'],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    try:
+        assert daemon.stdout
+        yield daemon.stdout.readline().strip()
+    finally:
+        daemon.terminate()
+        daemon.wait()
+
+
+@contextlib.contextmanager
+def running_server(
+    context: multiprocessing.context.BaseContext,
+    kind: str,
+    address: str,
+    workers: Optional[int],
+    peer_address: Optional[str],
+) -> Iterator[None]:
+    '''
+    Runs the server in a new process while in the context
+
+    :param context: multiprocessing context
+    :param kind: server implementation
+    :param address: bus address
+    :param workers: number of concurrent calls
+    :param peer_address: address to accept direct connections from peers on
+    '''
+    ready = context.Event()
+    process = context.Process(  # type: ignore
+        target=serve, args=(kind, address, workers, ready, peer_address), daemon=True,
+    )
+    process.start()
+    try:
+        if not ready.wait(10):
+            raise RuntimeError('The server did not start')
+        yield
+    finally:
+        process.terminate()
+        process.join()
+
+
+def summarize(latencies: List[float], elapsed: float) -> Dict[str, float]:
+    latencies.sort()
+    return {
+        'count': len(latencies),
+        'throughput': len(latencies) / elapsed if elapsed else 0.0,
+        'mean': statistics.mean(latencies) if latencies else 0.0,
+        'p50': latencies[len(latencies) // 2] if latencies else 0.0,
+        'p99': latencies[int(len(latencies) * 0.99)] if latencies else 0.0,
+    }
+
+
+def run_calls(
+    context: multiprocessing.context.BaseContext, address: str, msg: jeepney.Message, clients: int, duration: float,
+) -> Dict[str, float]:
+    barrier = context.Barrier(clients)  # type: ignore
+    results = context.Queue()  # type: ignore
+    processes = [
+        context.Process(target=call_client, args=(address, msg, duration, barrier, results))  # type: ignore
+        for _ in range(clients)
+    ]
+    for process in processes:
+        process.start()
+    latencies = []
+    for _ in processes:
+        latencies += results.get(timeout=duration + 30)
+    for process in processes:
+        process.join()
+    return summarize(latencies, duration)
+
+
+def run_signals(
+    context: multiprocessing.context.BaseContext, address: str, clients: int, count: int, timeout: float,
+) -> Dict[str, float]:
+    barrier = context.Barrier(clients + 1)  # type: ignore
+    results = context.Queue()  # type: ignore
+    processes = [
+        context.Process(target=signal_client, args=(address, count, timeout, barrier, results))  # type: ignore
+        for _ in range(clients)
+    ]
+    for process in processes:
+        process.start()
+    barrier.wait()
+    start = time.monotonic()
+    with jeepney.io.blocking.open_dbus_connection(address) as connection:
+        obj = jeepney.DBusAddress(PATH, bus_name=NAME, interface=INTERFACE)
+        connection.send_and_get_reply(jeepney.new_method_call(obj, 'EmitTicks', 'i', (count,)))
+    latencies: List[float] = []
+    last = start
+    for _ in processes:
+        client_latencies, client_last = results.get(timeout=timeout + 30)
+        latencies += client_latencies
+        last = max(last, client_last)
+    for process in processes:
+        process.join()
+    result = summarize(latencies, last - start)
+    result['lost'] = count * clients - len(latencies)
+    return result
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    context = multiprocessing.get_context('spawn')
+    results: Dict[str, Any] = {
+        'metadata': {
+            'server': args.server,
+            'workers': args.workers,
+            'clients': args.clients,
+            'duration': args.duration,
+            'array_size': args.array_size,
+            'signals': args.signals,
+            'peer': args.peer,
+            'dbus_objects_version': getattr(dbus_objects, '__version__', 'unknown'),
+            'jeepney_version': jeepney.__version__,
+            'python_version': platform.python_version(),
+        },
+        'scenarios': {},
+    }
+    with contextlib.ExitStack() as stack:
+        bus_address = stack.enter_context(private_bus())
+        peer_address = None
+        if args.peer:
+            peer_address = f'unix:path={stack.enter_context(tempfile.TemporaryDirectory())}/peer'
+        stack.enter_context(running_server(context, args.server, bus_address, args.workers, peer_address))
+        # the address the clients connect to
+        address = peer_address or bus_address
+        for scenario in args.scenarios:
+            if scenario == 'signals':
+                if args.server == 'trio':
+                    print(f'{scenario}: skipped, the trio server does not support signals', file=sys.stderr)
+                    continue
+                result = run_signals(context, address, args.clients, args.signals, timeout=args.duration * 10)
+            else:
+                msg = scenario_message(scenario, args.array_size)
+                result = run_calls(context, address, msg, args.clients, args.duration)
+            results['scenarios'][scenario] = result
+            print(
+                f'{scenario:<12} {result["throughput"]:>10.0f}/s  '
+                f'p50 {result["p50"] * 1e3:8.3f} ms  p99 {result["p99"] * 1e3:8.3f} ms'
+                + (f'  lost {result["lost"]}' if result.get('lost') else '')
+            )
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--server', choices=SERVERS, default='blocking', help='server implementation')
+    parser.add_argument(
+        '--workers', type=int, default=None,
+        help='number of calls the server handles concurrently (default: one at a time)',
+    )
+    parser.add_argument('--clients', type=int, default=4, help='number of concurrent clients')
+    parser.add_argument('--duration', type=float, default=5.0, help='duration of each scenario, in seconds')
+    parser.add_argument('--array-size', type=int, default=10_000, help='size of the array in the array and buffer scenarios')
+    parser.add_argument('--signals', type=int, default=10_000, help='number of signals in the signals scenario')
+    parser.add_argument('--scenario', dest='scenarios', action='append', choices=SCENARIOS, help='scenarios to run')
+    parser.add_argument(
+        '--peer', action='store_true',
+        help='connect the clients directly to the server, instead of through the bus (blocking server only)',
+    )
+    parser.add_argument('-o', '--output', help='file to write the results to, as JSON')
+    args = parser.parse_args(argv)
+    if args.peer and args.server != 'blocking':
+        parser.error('--peer is only supported by the blocking server')
+    if not args.scenarios:
+        args.scenarios = list(SCENARIOS)
+
+    results = run(args)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+# SPDX-License-Identifier: MIT
+
+'''
+Decoration time benchmarks
+
+Measures defining DBusObject classes with a lot of members and creating their
+first object, which is the work done when importing a module that exports
+objects. The caches are cleared before every class, as a new process would
+start with them empty.
+'''
+
+import typing
+
+import pyperf
+
+import dbus_objects
+import dbus_objects.signature
+
+
+MEMBER_COUNTS = (100, 500)
+
+ComplexType = typing.Dict[str, typing.List[typing.Tuple[int, str]]]
+
+
+def make_class(count: int) -> typing.Type[dbus_objects.DBusObject]:
+    namespace: typing.Dict[str, typing.Any] = {}
+    for i in range(count):
+        def method(self: typing.Any, number: int, data: ComplexType) -> str:
+            return ''  # pragma: no cover
+
+        def prop(self: typing.Any) -> typing.List[str]:
+            return []  # pragma: no cover
+
+        namespace[f'method_{i}'] = dbus_objects.dbus_method(name=f'method_{i}')(method)
+        namespace[f'prop_{i}'] = dbus_objects.dbus_property(name=f'prop_{i}')(prop)
+        namespace[f'signal_{i}'] = dbus_objects.custom_dbus_signal(name=f'signal_{i}')(value=int, data=ComplexType)
+    return type('ExampleObject', (dbus_objects.DBusObject,), namespace)
+
+
+def bench_decoration(loops: int, count: int) -> float:
+    total = 0.0
+    for _ in range(loops):
+        dbus_objects.signature._cached_signature_of.cache_clear()
+        dbus_objects.signature.dbus_case.cache_clear()
+        start = pyperf.perf_counter()
+        cls = make_class(count)
+        # the first object resolves the class member table
+        cls(default_interface_root='io.github.ffy00.dbus_objects')._dbus_members
+        total += pyperf.perf_counter() - start
+    return total
+
+
+if __name__ == '__main__':
+    runner = pyperf.Runner()
+    runner.metadata['description'] = __doc__.strip().splitlines()[0]
+    for count in MEMBER_COUNTS:
+        runner.bench_time_func(f'decorate {count} methods, properties and signals', bench_decoration, count)
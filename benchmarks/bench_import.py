@@ -0,0 +1,27 @@
+# SPDX-License-Identifier: MIT
+
+'''
+Import time benchmarks
+
+Every value is measured in a new interpreter, like a DBus activated service
+pays at startup. The bare interpreter startup is included as a reference.
+'''
+
+import sys
+
+import pyperf
+
+
+MODULES = (
+    'dbus_objects',
+    'dbus_objects.integration',
+    'dbus_objects.integration.jeepney',
+)
+
+
+if __name__ == '__main__':
+    runner = pyperf.Runner()
+    runner.metadata['description'] = __doc__.strip().splitlines()[0]
+    runner.bench_command('python startup', [sys.executable, '-c', 'pass'])
+    for module in MODULES:
+        runner.bench_command(f'import {module}', [sys.executable, '-c', f'import {module}'])
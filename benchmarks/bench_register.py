@@ -0,0 +1,53 @@
+# SPDX-License-Identifier: MIT
+
+'''
+Object registration benchmarks
+
+Measures registering objects in different paths of a server. The objects are
+spread across 100 parents, so that the tree is not flat.
+'''
+
+import pyperf
+
+from dbus_objects import DBusObject, dbus_method, dbus_property
+from dbus_objects.integration import DBusServerBase
+
+
+PATH_COUNTS = (1_000, 10_000, 100_000)
+
+
+class ExampleObject(DBusObject):
+    def __init__(self) -> None:
+        super().__init__(default_interface_root='io.github.ffy00.dbus_objects')
+
+    @dbus_method()
+    def ping(self) -> str:
+        return 'Pong!'  # pragma: no cover
+
+    @dbus_method()
+    def sum(self, a: int, b: int) -> int:
+        return a + b  # pragma: no cover
+
+    @dbus_property()
+    def prop(self) -> str:
+        return 'some property'  # pragma: no cover
+
+
+def bench_register(loops: int, count: int) -> float:
+    paths = [f'/io/github/ffy00/dbus_objects/{i % 100}/object{i}' for i in range(count)]
+    total = 0.0
+    for _ in range(loops):
+        server = DBusServerBase(bus='SESSION', name='io.github.ffy00.dbus_objects.benchmark')
+        objects = [ExampleObject() for _ in range(count)]
+        start = pyperf.perf_counter()
+        for path, obj in zip(paths, objects):
+            server.register_object(path, obj)
+        total += pyperf.perf_counter() - start
+    return total
+
+
+if __name__ == '__main__':
+    runner = pyperf.Runner()
+    runner.metadata['description'] = __doc__.strip().splitlines()[0]
+    for count in PATH_COUNTS:
+        runner.bench_time_func(f'register_object {count} paths', bench_register, count)
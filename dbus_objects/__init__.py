@@ -5,20 +5,25 @@ from __future__ import annotations
 
 __version__ = '0.0.2'
 
+import copy
 import functools
+import heapq
 import itertools
 import logging
+import threading
+import time
 import types as _types  # to not conflict with our types module
 import typing
 import warnings
-import xml.etree.ElementTree as ET
 
-from typing import Any, Callable, Dict, Generator, List, Optional, Sequence, Tuple, Type
+from typing import Any, Callable, Dict, Generator, List, Optional, Sequence, Tuple, Type, Union
 
 import dbus_objects.signature
 
 
 if typing.TYPE_CHECKING:  # pragma: no cover
+    import xml.etree.ElementTree as ET
+
     import dbus_objects.integration
 
 
@@ -37,7 +42,6 @@ class _DBusDescriptorBase():
         self._interface_orig = interface
         self._interface = self._interface_orig
         self._name = dbus_objects.signature.dbus_case(name) if name else None
-        self._list_name: Optional[str] = None
 
     @property
     def interface(self) -> str:
@@ -51,12 +55,24 @@ class _DBusDescriptorBase():
             raise ValueError("Name hasn't been set yet")
         return self._name
 
-    def register_interface(self, obj: Any) -> None:
+    def resolve(self, default_interface_root: Optional[str], dbus_name: str) -> Any:
+        '''
+        Returns a copy of the descriptor with the interface resolved for the
+        given object interface root and name
+
+        The descriptor itself is shared by all the objects of the class, so it
+        is never modified.
+
+        :param default_interface_root: object interface root
+        :param dbus_name: object DBus name
+        '''
+        resolved = copy.copy(self)
         if not self._interface_orig:
-            if obj.default_interface_root:
-                self._interface = '.'.join([obj.default_interface_root, obj._dbus_name])
+            if default_interface_root:
+                resolved._interface = '.'.join([default_interface_root, dbus_name])
             else:
                 raise DBusObjectException(f'Missing interface in DBus method: {self.name}')
+        return resolved
 
     def __set_name__(self, obj_type: Any, name: str) -> None:
         if not issubclass(obj_type, DBusObject):
@@ -66,14 +82,6 @@ class _DBusDescriptorBase():
         self._owner = obj_type
         self._descriptor_name = name
 
-        # get the method list for our type and initialize it if necessary
-        assert self._list_name
-        self._method_list = getattr(self._owner, self._list_name) or []
-        setattr(self._owner, self._list_name, self._method_list)
-
-        # add ourselves to the owner method list
-        self._method_list.append((self._descriptor_name, self))
-
     def __get__(self, obj: Any, obj_type: Any = None) -> Any:
         raise NotImplementedError('This should be implemented in a subclass')
 
@@ -82,6 +90,9 @@ class _DBusMethodBase(_DBusDescriptorBase):
     '''
     Base descriptor class that implements DBus interface objects based on a method
     '''
+    # arguments after self which are not passed from DBus
+    _implicit_arguments = 0
+
     def __init__(
         self,
         func: Callable[..., Any],
@@ -97,18 +108,27 @@ class _DBusMethodBase(_DBusDescriptorBase):
 
         self._input_signature = dbus_objects.signature.DBusSignature.from_parameters(
             self._func,
+            skip_arguments=self._implicit_arguments,
         )
         self._output_signature = dbus_objects.signature.DBusSignature.from_return(
             self._func,
             self._return_names,
             self._multiple_returns,
         )
+        self._plan = dbus_objects.signature.DBusMethodPlan(
+            self._input_signature,
+            self._output_signature,
+            self._multiple_returns,
+            dbus_objects.signature._is_coroutine_function(self._func),
+        )
+
+    @property
+    def plan(self) -> dbus_objects.signature.DBusMethodPlan:
+        return self._plan
 
     def __get__(self, obj: Any, obj_type: Any = None) -> Any:
         if obj is None:
             return self._func
-        # construct interface from obj
-        self.register_interface(obj)
         return _types.MethodType(self._func, obj)
 
 
@@ -123,19 +143,31 @@ class _DBusMethod(_DBusMethodBase):
         name: Optional[str] = None,
         return_names: Optional[Sequence[str]] = None,
         multiple_returns: bool = False,
+        cpu_bound: bool = False,
     ) -> None:
         super().__init__(func, interface, name, return_names, multiple_returns)
-        self._list_name = '_dbus_methods'
+        if cpu_bound and self._plan.is_async:
+            raise ValueError('Coroutine methods can not be cpu_bound')
+        if cpu_bound and 'h' in self._plan.input_signature + self._plan.output_signature:
+            # the file descriptor numbers are only valid in our process
+            raise ValueError('Methods passing file descriptors can not be cpu_bound')
+        self._cpu_bound = cpu_bound
+
+    @property
+    def cpu_bound(self) -> bool:
+        return self._cpu_bound
 
     @property
     def signature(self) -> Tuple[str, str]:
-        return str(self._input_signature), str(self._output_signature)
+        return self._plan.signature
 
     @property
     def xml(self) -> ET.Element:
         if not self._input_signature or not self._output_signature:
             raise ValueError("Signature hasn't been set yet")
 
+        import xml.etree.ElementTree as ET
+
         xml = ET.Element('method', {'name': self.name})
 
         for direction, signature, names in (
@@ -168,27 +200,48 @@ class _DBusProperty(_DBusMethodBase):
         name: Optional[str] = None,
         return_names: Optional[Sequence[str]] = None,
         multiple_returns: bool = False,
+        emits_changed: Optional[Union[bool, str]] = None,
     ) -> None:
         super().__init__(func, interface, name, return_names, multiple_returns)
-        self._list_name = '_dbus_properties'
         self._setter: Optional[Callable[[Any, Any], Any]] = None
+        if emits_changed not in (None, True, False, 'invalidates'):
+            raise ValueError(f"emits_changed must be True, False or 'invalidates', got {emits_changed!r}")
+        self._emits_changed = emits_changed
         # TODO: Verify signature
-        # TODO: Allow emiting a signal when the value changes
+
+    @property
+    def emits_changed(self) -> Union[bool, str]:
+        # only the setter notifies the changes, so read-only properties do not emit them by default
+        if self._emits_changed is None:
+            return self._setter is not None
+        return self._emits_changed
 
     @property
     def signature(self) -> str:
-        return str(self._output_signature)
+        return self._plan.output_signature
+
+    @property
+    def writable(self) -> bool:
+        return self._setter is not None
 
     @property
     def xml(self) -> ET.Element:
         if not self._input_signature or not self._output_signature:
             raise ValueError("Signature hasn't been set yet")
 
+        import xml.etree.ElementTree as ET
+
         xml = ET.Element('property', {
             'name': self.name,
             'type': self.signature,
             'access': 'read' if not self._setter else 'readwrite',
         })
+        emits_changed = self.emits_changed
+        if emits_changed is not True:
+            ET.SubElement(xml, 'annotation', {
+                'name': 'org.freedesktop.DBus.Property.EmitsChangedSignal',
+                'value': 'false' if emits_changed is False else emits_changed,
+            })
 
         # TODO: Support write-only properties
         # TODO: Export documentation
@@ -203,6 +256,8 @@ class _DBusProperty(_DBusMethodBase):
         if self._setter is None:
             raise AttributeError(f'{self._descriptor_name} has no setter')
         self._setter(obj, value)
+        if self.emits_changed:
+            obj._property_changed(self)
 
     def setter(self, value: Callable[[Any, Any], Any]) -> _DBusProperty:
         '''
@@ -214,6 +269,104 @@ class _DBusProperty(_DBusMethodBase):
         return self
 
 
+class _Scheduler():
+    '''
+    Runs callbacks after a delay
+
+    All callbacks run in a single background thread, which is started lazily
+    on the first call.
+    '''
+    def __init__(self) -> None:
+        self.__logger = logging.getLogger(self.__class__.__name__)
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[float, int, Callable[[], None]]] = []
+        self._counter = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+
+    def call_later(self, delay: float, callback: Callable[[], None]) -> None:
+        with self._cond:
+            heapq.heappush(self._queue, (time.monotonic() + delay, next(self._counter), callback))
+            # the thread does not survive fork, so check if it is still alive
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run,
+                    name='dbus-objects-scheduler',
+                    daemon=True,
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def _next(self) -> Callable[[], None]:
+        with self._cond:
+            while True:
+                if not self._queue:
+                    self._cond.wait()
+                    continue
+                timeout = self._queue[0][0] - time.monotonic()
+                if timeout <= 0:
+                    return heapq.heappop(self._queue)[2]
+                self._cond.wait(timeout)
+
+    def _run(self) -> None:
+        while True:
+            callback = self._next()
+            try:
+                callback()
+            except Exception:
+                self.__logger.exception('An exception ocurred in a scheduled callback')
+
+
+_scheduler = _Scheduler()
+
+
+class _SignalThrottle():
+    '''
+    Collapses bursts of signal emissions into the last value
+
+    In trailing mode (coalesce), the first emission opens a window and the last
+    value seen in it is emitted when it closes. In leading mode (max_rate),
+    an emission goes out right away if the previous one is older than the
+    interval, otherwise it is deferred to the end of the interval.
+    '''
+    def __init__(self, emit: Callable[[Tuple[Any, ...]], None], interval: float, leading: bool) -> None:
+        self._emit = emit
+        self._interval = interval
+        self._leading = leading
+        self._lock = threading.Lock()
+        self._pending: Optional[Tuple[Any, ...]] = None
+        self._scheduled = False
+        self._last = -interval
+
+    def __call__(self, *args: Any) -> None:
+        with self._lock:
+            if self._scheduled:
+                self._pending = args
+                return
+            delay = self._interval
+            if self._leading:
+                now = time.monotonic()
+                delay = self._last + self._interval - now
+                if delay <= 0:
+                    self._last = now
+            if delay > 0:
+                self._pending = args
+                self._scheduled = True
+                _scheduler.call_later(delay, self.flush)
+                return
+        self._emit(args)
+
+    def flush(self) -> None:
+        '''
+        Emits the pending value, if any
+        '''
+        with self._lock:
+            args, self._pending = self._pending, None
+            self._scheduled = False
+            self._last = time.monotonic()
+        if args is not None:
+            self._emit(args)
+
+
 class _DBusSignal(_DBusDescriptorBase):
     '''
     Descriptor class that implements a DBus signal
@@ -224,10 +377,22 @@ class _DBusSignal(_DBusDescriptorBase):
         named_types: Dict[str, Type[Any]],
         interface: Optional[str] = None,
         name: Optional[str] = None,
+        coalesce: Optional[float] = None,
+        max_rate: Optional[float] = None,
     ) -> None:
         super().__init__(interface, name)
         self.__logger = logging.getLogger(self.__class__.__name__)
-        self._list_name = '_dbus_signals'
+        if coalesce is not None and max_rate is not None:
+            raise ValueError(
+                f'{self.__class__.__name__} receives either coalesce or '
+                'max_rate, but not both.'
+            )
+        if (coalesce is not None and coalesce <= 0) or (max_rate is not None and max_rate <= 0):
+            raise ValueError('The signal coalesce window and max rate must be positive')
+        self._throttle_interval = coalesce if coalesce is not None else (
+            1 / max_rate if max_rate is not None else None
+        )
+        self._throttle_leading = max_rate is not None
         if types and named_types:
             # TODO: support mixed?
             raise ValueError(
@@ -249,6 +414,8 @@ class _DBusSignal(_DBusDescriptorBase):
 
     @property
     def xml(self) -> ET.Element:
+        import xml.etree.ElementTree as ET
+
         xml = ET.Element('signal', {'name': self.name})
 
         for name, sig in itertools.zip_longest(
@@ -264,18 +431,31 @@ class _DBusSignal(_DBusDescriptorBase):
 
         return xml
 
-    def emit_signal_callback(self, owner: Any) -> Callable[[Any], None]:
-        def emit_signal(*args: Any) -> None:
-            for callback in owner._emit_signal_callbacks:
-                try:
-                    # TODO: export python signature (__signature__)
-                    callback(self, body=args)
-                except Exception as e:
-                    self.__logger.info(
-                        'An exception ocurred when try to emit signal '
-                        f'{self.name} {args}: {e}'
-                    )
-        return emit_signal
+    def _emit(self, owner: Any, args: Tuple[Any, ...]) -> None:
+        for callback in owner._emit_signal_callbacks:
+            try:
+                # TODO: export python signature (__signature__)
+                callback(self, body=args)
+            except Exception as e:
+                self.__logger.info(
+                    'An exception ocurred when try to emit signal '
+                    f'{self.name} {args}: {e}'
+                )
+
+    def emit_signal_callback(self, owner: Any) -> Callable[..., None]:
+        if self._throttle_interval is None:
+            def emit_signal(*args: Any) -> None:
+                self._emit(owner, args)
+            return emit_signal
+        # the throttle state is kept per object
+        throttle: Optional[_SignalThrottle] = owner._signal_throttles.get(self)
+        if throttle is None:
+            throttle = owner._signal_throttles.setdefault(self, _SignalThrottle(
+                functools.partial(self._emit, owner),
+                self._throttle_interval,
+                self._throttle_leading,
+            ))
+        return throttle
 
     def __set_name__(self, obj_type: Any, name: str) -> None:
         super().__set_name__(obj_type, name)
@@ -283,8 +463,10 @@ class _DBusSignal(_DBusDescriptorBase):
             self._name = dbus_objects.signature.dbus_case(name)
 
     def __get__(self, obj: Any, obj_type: Any = None) -> Any:
-        self.register_interface(obj)  # construct interface from obj
-        return self.emit_signal_callback(obj)
+        if obj is None:
+            return self
+        # emit from the copy with the interface resolved for obj
+        return obj._dbus_members.resolve(self).emit_signal_callback(obj)
 
 
 def dbus_method(
@@ -292,23 +474,33 @@ def dbus_method(
     name: Optional[str] = None,
     return_names: Optional[Sequence[str]] = None,
     multiple_returns: bool = False,
+    cpu_bound: bool = False,
 ) -> Callable[[Callable[..., Any]], _DBusMethod]:
     '''
     This decorator exports a function as a DBus method
 
     The function must have type annotations, they will be used to resolve the
-    method signature.
+    method signature. Coroutine functions are supported by the servers that
+    run on an event loop.
 
     The function name will be used as the DBus method name unless otherwise
     specified in the arguments.
 
+    Methods marked as ``cpu_bound`` are run in worker processes when the
+    server listens with ``processes``, so that they can use more than one
+    core. The workers are forked when the server starts listening, so they
+    work on a copy of the object as it was at that time, and the changes they
+    make to it are lost. The arguments and return values must be picklable,
+    and can't be file descriptors.
+
     :param interface: DBus interface name
     :param name: DBus method name
     :param return_names: Names of the return arguments
     :param multiple_returns: Returns multiple parameters
+    :param cpu_bound: Run the method in a worker process
     '''
     def decorator(func: Callable[..., Any]) -> _DBusMethod:
-        return _DBusMethod(func, interface, name, return_names, multiple_returns)
+        return _DBusMethod(func, interface, name, return_names, multiple_returns, cpu_bound)
     return decorator
 
 
@@ -317,19 +509,27 @@ def dbus_property(
     name: Optional[str] = None,
     return_names: Optional[Sequence[str]] = None,
     multiple_returns: bool = False,
+    emits_changed: Optional[Union[bool, str]] = None,
 ) -> Callable[[Callable[..., Any]], _DBusProperty]:
     '''
     This decorator exports a method as a DBus property
 
     Works just like :meth:`dbus_method` and :meth:`property`
 
+    Setting the property emits ``org.freedesktop.DBus.Properties.PropertiesChanged``.
+    The changes made in a short window are batched into a single signal per
+    interface, see :attr:`DBusObject.properties_changed_delay`. The getter is
+    called in the thread the server calls the methods in.
+
     :param interface: DBus interface name
     :param name: DBus method name
     :param return_names: Names of the return arguments
     :param multiple_returns: Returns multiple parameters
+    :param emits_changed: Emit the new value on change, ``'invalidates'`` only emits the property name (for large values).
+                          Defaults to ``True`` for properties with a setter and ``False`` for read-only ones
     '''
     def decorator(func: Callable[..., Any]) -> _DBusProperty:
-        return _DBusProperty(func, interface, name, return_names, multiple_returns)
+        return _DBusProperty(func, interface, name, return_names, multiple_returns, emits_changed)
     return decorator
 
 
@@ -344,16 +544,30 @@ def custom_dbus_signal(
     *types: Type[Any],
     interface: Optional[str] = None,
     name: Optional[str] = None,
+    coalesce: Optional[float] = None,
+    max_rate: Optional[float] = None,
 ) -> Callable[..., _DBusSignal]:
     '''
     This method returns a custom DBus signal constructor
+
+    Bursts of emissions can be collapsed into the last value, to reduce the
+    bus traffic of signals that fire very often. The pending value is emitted
+    from a background thread, so the server must support emitting signals
+    from other threads.
+
+    :param interface: DBus interface name
+    :param name: DBus signal name
+    :param coalesce: Window (in seconds) in which emissions are collapsed, the last value is emitted at the end
+    :param max_rate: Maximum number of emissions per second, the excess is collapsed into the last value
     '''
     def constructor(*types: Type[Any], **named_types: Type[Any]) -> _DBusSignal:
         return _DBusSignal(
             types=types,
             named_types=named_types,
             interface=interface,
-            name=name
+            name=name,
+            coalesce=coalesce,
+            max_rate=max_rate,
         )
     return constructor
 
@@ -372,26 +586,107 @@ _DBusSignalTupleInternal = Tuple[str, _DBusSignal]  # method name, signal descri
 _DBusSignalTuple = Tuple[Callable[..., Any], _DBusSignal]  # method, signal descriptor
 
 
+class _DBusMemberTable():
+    '''
+    Members of a DBusObject class, with their interface resolved
+
+    Built once per class and interface root, and shared by all the objects with
+    it. The DBus name is only part of the key when some member has no explicit
+    interface, as it is then used to resolve it.
+    '''
+    def __init__(self, cls: Type[DBusObject], default_interface_root: Optional[str], dbus_name: str) -> None:
+        # descriptor -> resolved copy
+        self._resolved: Dict[_DBusDescriptorBase, Any] = {}
+        members = _class_members(cls)
+        for attribute, member in members.items():
+            if isinstance(member, _DBusDescriptorBase):
+                self._resolved[member] = member.resolve(default_interface_root, dbus_name)
+        self.methods: Tuple[_DBusMethodTupleInternal, ...] = tuple(
+            (attribute, self._resolved[member])
+            for attribute, member in members.items()
+            if isinstance(member, _DBusMethod)
+        )
+        self.properties: Tuple[_DBusPropertyTupleInternal, ...] = tuple(
+            (attribute, self._resolved[member])
+            for attribute, member in members.items()
+            if isinstance(member, _DBusProperty)
+        )
+        self.signals: Tuple[_DBusSignalTupleInternal, ...] = tuple(
+            (attribute, self._resolved[member])
+            for attribute, member in members.items()
+            if isinstance(member, _DBusSignal)
+        )
+
+    def resolve(self, descriptor: _DBusDescriptorBase) -> Any:
+        '''
+        Returns the resolved copy of the descriptor
+
+        :param descriptor: class descriptor
+        '''
+        return self._resolved[descriptor]
+
+
+def _class_members(cls: type) -> Dict[str, Any]:
+    members: Dict[str, Any] = {}
+    for klass in reversed(cls.__mro__):
+        members.update(vars(klass))
+    return members
+
+
+class _DBusClassTables():
+    '''
+    Member tables of a DBusObject class
+    '''
+    def __init__(self, cls: type) -> None:
+        # whether the member interfaces depend on the object DBus name
+        self.uses_name = any(
+            isinstance(member, _DBusDescriptorBase) and not member._interface_orig
+            for member in _class_members(cls).values()
+        )
+        # (default interface root, DBus name) -> member table
+        self.tables: Dict[Tuple[Optional[str], Optional[str]], _DBusMemberTable] = {}
+
+
 class DBusObject():
     '''
     This class represents a DBus object. It should be subclassed and to export
     DBus methods, you must define typed functions with the
     :meth:`dbus_objects.dbus_object` decorator.
     '''
-    # type -> method name list
-    _dbus_methods: Optional[List[_DBusMethodTupleInternal]] = None
-    _dbus_properties: Optional[List[_DBusPropertyTupleInternal]] = None
-    _dbus_signals: Optional[List[_DBusSignalTupleInternal]] = None
+    # member tables, set on each class when its first object looks them up
+    _dbus_class_tables: Optional[_DBusClassTables] = None
+
+    #: Window (in seconds) in which property changes are batched into a single PropertiesChanged signal
+    properties_changed_delay = 0.01
 
-    def __init__(self, name: Optional[str] = None, default_interface_root: Optional[str] = None):
+    def __init__(
+        self,
+        name: Optional[str] = None,
+        default_interface_root: Optional[str] = None,
+        serialize_calls: bool = False,
+    ):
         '''
         The class name will be used as the DBus object name unless otherwise
         specified in the arguments.
 
         :param name: DBus object name
+        :param default_interface_root: Interface root used by the members with no explicit interface
+        :param serialize_calls: Never call this object's methods concurrently (for objects which are not thread-safe)
         '''
         self.is_dbus_object = True
+        self.serialize_calls = serialize_calls
+        # held by the servers while calling the object, if serialize_calls is set
+        self._serial_lock = threading.Lock()
         self._emit_signal_callbacks: List[Callable[[_DBusSignal, str, Any], None]] = []
+        self._signal_throttles: Dict[_DBusSignal, _SignalThrottle] = {}
+        # (function that runs a callback in the server thread, callback taking the
+        # interface name, changed properties and invalidated properties)
+        self._properties_changed_callbacks: List[Tuple[
+            Callable[[Callable[[], None]], None],
+            Callable[[str, Dict[str, Any], List[str]], None],
+        ]] = []
+        self._changed_properties: Dict[_DBusProperty, None] = {}  # dict used as an ordered set
+        self._changed_properties_lock = threading.Lock()
         self._dbus_name = dbus_objects.signature.dbus_case(
             name if name else type(self).__name__
         )
@@ -401,40 +696,100 @@ class DBusObject():
     def dbus_name(self) -> str:
         return self._dbus_name
 
+    @property
+    def _dbus_members(self) -> _DBusMemberTable:
+        cls = type(self)
+        # stored in the class itself, not inherited, so it goes away with it
+        class_tables = vars(cls).get('_dbus_class_tables')
+        if class_tables is None:
+            class_tables = _DBusClassTables(cls)
+            cls._dbus_class_tables = class_tables
+        root = self.default_interface_root
+        key = root, self._dbus_name if root and class_tables.uses_name else None
+        table = class_tables.tables.get(key)
+        if table is None:
+            table = class_tables.tables.setdefault(key, _DBusMemberTable(cls, root, self._dbus_name))
+        return table
+
     def get_dbus_methods(self) -> Generator[_DBusMethodTuple, _DBusMethodTuple, None]:
         '''
         Generator that provides the DBus methods
         '''
-        if not self._dbus_methods:
-            return
-        for method_name, descriptor in self._dbus_methods:
-            yield getattr(self, method_name), descriptor
+        for _method_name, descriptor in self._dbus_members.methods:
+            yield _types.MethodType(descriptor._func, self), descriptor
 
     def get_dbus_properties(self) -> Generator[_DBusPropertyTuple, _DBusPropertyTuple, None]:
         '''
         Generator that provides the DBus properties
         '''
-        if not self._dbus_properties:
-            return
-        for property_name, descriptor in self._dbus_properties:
-            descriptor.register_interface(self)  # explicitely register the interface
+        for property_name, descriptor in self._dbus_members.properties:
             yield (
-                lambda: getattr(self, property_name),
-                lambda value: setattr(self, property_name, value),
+                functools.partial(getattr, self, property_name),
+                functools.partial(setattr, self, property_name),
                 descriptor,
             )
 
+    def _property_changed(self, descriptor: _DBusProperty) -> None:
+        if not self._properties_changed_callbacks:
+            return
+        with self._changed_properties_lock:
+            scheduled = bool(self._changed_properties)
+            self._changed_properties[descriptor] = None
+        if not scheduled:
+            _scheduler.call_later(self.properties_changed_delay, self._flush_properties_changed)
+
+    def _flush_properties_changed(self) -> None:
+        with self._changed_properties_lock:
+            changed, self._changed_properties = list(self._changed_properties), {}
+        # the getters are called in the server threads, so that they don't
+        # run concurrently with the calls
+        servers: Dict[Callable[[Callable[[], None]], None], List[Callable[[str, Dict[str, Any], List[str]], None]]] = {}
+        for call_soon, callback in self._properties_changed_callbacks:
+            servers.setdefault(call_soon, []).append(callback)
+        for call_soon, callbacks in servers.items():
+            call_soon(functools.partial(self._emit_properties_changed, call_soon, changed, callbacks))
+
+    def _emit_properties_changed(
+        self,
+        call_soon: Callable[[Callable[[], None]], None],
+        changed: List[_DBusProperty],
+        callbacks: List[Callable[[str, Dict[str, Any], List[str]], None]],
+    ) -> None:
+        # the calls of serialize_calls objects may run in other threads, but
+        # don't hold up the server waiting for them, try again later instead
+        serialized = self.serialize_calls
+        if serialized and not self._serial_lock.acquire(blocking=False):
+            _scheduler.call_later(self.properties_changed_delay, functools.partial(
+                call_soon, functools.partial(self._emit_properties_changed, call_soon, changed, callbacks),
+            ))
+            return
+        try:
+            # interface -> (changed properties, invalidated properties)
+            interfaces: Dict[str, Tuple[Dict[str, Any], List[str]]] = {}
+            members = self._dbus_members
+            for descriptor in changed:
+                descriptor = members.resolve(descriptor)
+                changed_properties, invalidated = interfaces.setdefault(descriptor.interface, ({}, []))
+                if descriptor.emits_changed == 'invalidates':
+                    invalidated.append(descriptor.name)
+                else:
+                    changed_properties[descriptor.name] = (descriptor.signature, descriptor.__get__(self))
+        finally:
+            if serialized:
+                self._serial_lock.release()
+        for interface, (changed_properties, invalidated) in interfaces.items():
+            for callback in callbacks:
+                callback(interface, changed_properties, invalidated)
+
     def get_dbus_signals(self) -> Generator[_DBusSignalTuple, _DBusSignalTuple, None]:
         '''
         Generator that provides the DBus signals
         '''
-        if not self._dbus_signals:
-            return
-        for signal_name, descriptor in self._dbus_signals:
-            yield getattr(self, signal_name), descriptor
+        for _signal_name, descriptor in self._dbus_members.signals:
+            yield descriptor.emit_signal_callback(self), descriptor
 
     def register_server(self, server: dbus_objects.integration.DBusServerBase, path: str) -> None:
-        if not self._dbus_signals:
+        if not self._dbus_members.signals:
             return
         if not server.emit_signal_callback:
             warnings.warn(DBusObjectWarning(
@@ -447,10 +802,40 @@ class DBusObject():
             functools.partial(server.emit_signal_callback, path=path),
         )
 
+    def unregister_server(self, server: dbus_objects.integration.DBusServerBase, path: str) -> None:
+        self._emit_signal_callbacks = [
+            callback for callback in self._emit_signal_callbacks
+            if not (
+                isinstance(callback, functools.partial)
+                and callback.func == server.emit_signal_callback
+                and callback.keywords.get('path') == path
+            )
+        ]
+
 
 class DBusObjectException(Exception):
     pass
 
 
+class DBusError(Exception):
+    '''
+    Error replied to a DBus method call
+
+    Methods can raise it to reply with a specific error name, other
+    exceptions are replied to with ``org.freedesktop.DBus.Error.Failed``.
+    '''
+    def __init__(self, name: str, message: str = '') -> None:
+        '''
+        :param name: DBus error name
+        :param message: error message
+        '''
+        super().__init__(name, message)
+        self.name = name
+        self.message = message
+
+    def __str__(self) -> str:
+        return self.message
+
+
 class DBusObjectWarning(Warning):
     pass
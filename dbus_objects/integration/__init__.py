@@ -1,55 +1,236 @@
 # SPDX-License-Identifier: MIT
 
+import collections
+import contextlib
+import functools
 import logging
 import os.path
-import textwrap
+import threading
 import typing
 import warnings
-import xml.etree.ElementTree as ET
 
-from typing import Any, Callable, Dict, Optional
-
-import treelib
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, KeysView, List, Optional, Tuple
 
 import dbus_objects
 import dbus_objects.types
 
 
+if typing.TYPE_CHECKING:  # pragma: no cover
+    import concurrent.futures
+    import xml.etree.ElementTree as ET
+
+
+class _DBusIndex():
+    '''
+    Flat element index
+
+    Elements are stored in a ``(path, interface, name) -> element`` dictionary,
+    so lookups don't depend on the number of registered paths, interfaces or
+    members. We also keep a ``path -> interface -> name -> element`` mapping,
+    which is used when we need to iterate over the elements of a path.
+    '''
+    def __init__(self) -> None:
+        self._elements: Dict[Tuple[str, str, str], Any] = {}
+        self._paths: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def __contains__(self, path: object) -> bool:
+        return path in self._paths
+
+    @property
+    def paths(self) -> KeysView[str]:
+        '''
+        Registered paths
+        '''
+        return self._paths.keys()
+
+    def interfaces(self, path: str) -> Dict[str, Dict[str, Any]]:
+        '''
+        Fetches the interfaces for given path
+
+        :param path: path
+        '''
+        return self._paths.get(path, {})
+
+    def get_element(self, path: str, interface: str, name: str) -> Any:
+        '''
+        Fetches the element for given path, interface and element name
+
+        :param path: element path
+        :param interface: element interface
+        :param interface: element name
+        '''
+        try:
+            return self._elements[path, interface, name]
+        except KeyError:
+            raise KeyError(f'Element not found: path={path} interface={interface} name={name}') from None
+
+    def add_element(self, path: str, interface: str, name: str, data: Any) -> bool:
+        '''
+        Adds an element to the index
+
+        Returns ``False`` if the element was already registered, in which case
+        the index is left untouched.
+
+        :param path: element path
+        :param interface: element interface
+        :param name: element name
+        :param data: element data
+        '''
+        key = path, interface, name
+        if key in self._elements:
+            return False
+        self._elements[key] = data
+        self._paths.setdefault(path, {}).setdefault(interface, {})[name] = data
+        return True
+
+    def remove_path(self, path: str) -> None:
+        '''
+        Removes all the elements registered in the path
+
+        :param path: elements path
+        '''
+        for interface, elements in self._paths.pop(path, {}).items():
+            for name in elements:
+                del self._elements[path, interface, name]
+
+    def show(self) -> str:
+        '''
+        Returns a textual representation of the index topology
+        '''
+        lines = ['paths']
+
+        def add_level(prefix: str, level: Dict[str, Any], depth: int) -> None:
+            names = sorted(level)
+            for name in names:
+                last = name == names[-1]
+                lines.append(prefix + ('└── ' if last else '├── ') + name)
+                if depth:
+                    add_level(prefix + ('    ' if last else '│   '), level[name], depth - 1)
+
+        add_level('', self._paths, 2)
+        return '\n'.join(lines)
+
+
 # These few following classes implement the standard interfaces
 
 
-class _Introspectable(dbus_objects.DBusObject):
+class _PathMethod(dbus_objects._DBusMethod):
     '''
-    https://dbus.freedesktop.org/doc/dbus-specification.html#standard-interfaces-introspectable
+    DBus method of a standard interface
+
+    The function takes the path being called after ``self``.
     '''
-    _XML_DOCTYPE = textwrap.dedent('''\
-    <!DOCTYPE node PUBLIC
-    "-//freedesktop//DTD D-BUS Object Introspection 1.0//EN"
-    "http://www.freedesktop.org/standards/dbus/1.0/introspect.dtd" >
-    ''')
+    _implicit_arguments = 1
 
-    def __init__(
-        self,
-        path: str,
-        method_tree: Optional[treelib.Tree] = None,
-        property_tree: Optional[treelib.Tree] = None,
-        signal_tree: Optional[treelib.Tree] = None,
-    ):
+
+def _path_method(
+    name: Optional[str] = None,
+    return_names: Optional[Tuple[str, ...]] = None,
+) -> Callable[[Callable[..., Any]], _PathMethod]:
+    def decorator(func: Callable[..., Any]) -> _PathMethod:
+        return _PathMethod(func, name=name, return_names=return_names)
+    return decorator
+
+
+class _StandardInterface(dbus_objects.DBusObject):
+    '''
+    Base class for the standard interfaces available in every path
+
+    These are not registered in the server indexes. A single instance is
+    shared by all paths, the server resolves it at dispatch time, so the
+    methods take the path being called as their first argument.
+    '''
+    def __init__(self, name: str, server: 'DBusServerBase') -> None:
         '''
-        :param path: path where the onject is being resgistered
-        :param method_tree: DBus server method tree
+        :param name: interface name, without the ``org.freedesktop.DBus`` prefix
+        :param server: DBus server the interface is served by
         '''
         super().__init__(
-            name='Introspectable',
+            name=name,
             default_interface_root='org.freedesktop.DBus',
         )
-        self._path = path
-        self._method_tree = method_tree
-        self._property_tree = property_tree
-        self._signal_tree = signal_tree
+        self._server = server
+        self.interface = f'org.freedesktop.DBus.{name}'
+        # DBus method name -> (method attribute name, descriptor)
+        self._methods: Dict[str, Tuple[str, dbus_objects._DBusMethod]] = {}
+        for attribute, method_descriptor in self._dbus_members.methods:
+            self._methods[method_descriptor.name] = attribute, method_descriptor
+        # DBus signal name -> descriptor
+        self._signals = {
+            descriptor.name: descriptor
+            for _signal, descriptor in self.get_dbus_signals()
+        }
+        self._xml: Optional['ET.Element'] = None
+
+    @property
+    def xml(self) -> 'ET.Element':
+        '''
+        Interface XML, generated on first use
+        '''
+        if self._xml is None:
+            import xml.etree.ElementTree as ET
+
+            xml = ET.Element('interface', {'name': self.interface})
+            for _attribute, method_descriptor in self._methods.values():
+                xml.append(method_descriptor.xml)
+            for signal_descriptor in self._signals.values():
+                xml.append(signal_descriptor.xml)
+            self._xml = xml
+        return self._xml
+
+    def serves(self, path: str) -> bool:
+        '''
+        Checks if the interface is available in the path
+
+        :param path: object path
+        '''
+        return self._server._has_path(path)
+
+    def has_method(self, name: str) -> bool:
+        return name in self._methods
+
+    def get_method(self, path: str, name: str) -> dbus_objects._DBusMethodTuple:
+        '''
+        Fetches the method, bound to the path
+
+        :param path: method path
+        :param name: method name
+        '''
+        attribute, descriptor = self._methods[name]
+        return functools.partial(getattr(self, attribute), path), descriptor
+
+
+class _Introspectable(_StandardInterface):
+    '''
+    https://dbus.freedesktop.org/doc/dbus-specification.html#standard-interfaces-introspectable
+    '''
+    _XML_DOCTYPE = (
+        '<!DOCTYPE node PUBLIC\n'
+        '"-//freedesktop//DTD D-BUS Object Introspection 1.0//EN"\n'
+        '"http://www.freedesktop.org/standards/dbus/1.0/introspect.dtd" >\n'
+    )
+
+    def __init__(self, server: 'DBusServerBase') -> None:
+        '''
+        :param server: DBus server the interface is served by
+        '''
+        super().__init__('Introspectable', server)
+
+    @_path_method(return_names=('xml',))
+    def introspect(self, path: str) -> str:
+        # the server invalidates the cached XML when the path or its children change
+        cache = self._server._introspection_cache
+        if path not in cache:
+            enumerated = self._server._enumerate_children(path)
+            if enumerated is not None or not self._server._is_registered(path):
+                # the fallback children may change at any time, so don't cache them
+                return self._generate_xml(path, enumerated or ())
+            cache[path] = self._generate_xml(path)
+        return cache[path]
+
+    def _generate_xml(self, path: str, enumerated: Iterable[str] = ()) -> str:
+        import xml.etree.ElementTree as ET
 
-    @dbus_objects.dbus_method(return_names=('xml',))
-    def introspect(self) -> str:  # noqa: C901
         # xml = ET.Element('node', {'xmlns:doc': 'http://www.freedesktop.org/dbus/1.0/doc.dtd'}) # See: FFY00/dbus-objects#20.
         xml = ET.Element('node')
         interfaces: Dict[str, ET.Element] = {}
@@ -60,136 +241,327 @@ class _Introspectable(dbus_objects.DBusObject):
             return interfaces[name]
 
         # add interfaces
-        if self._method_tree and self._path in self._method_tree:
-            for node in self._method_tree.children(self._path):
-                interface = get_interface(node.tag)
-                for method_node in self._method_tree.children(node.identifier):
-                    method, descriptor = method_node.data
-                    interface.append(descriptor.xml)
-        if self._property_tree and self._path in self._property_tree:
-            for node in self._property_tree.children(self._path):
-                interface = get_interface(node.tag)
-                for property_node in self._property_tree.children(node.identifier):
-                    getter, setter, descriptor = property_node.data
-                    interface.append(descriptor.xml)
-        if self._signal_tree and self._path in self._signal_tree:
-            for node in self._signal_tree.children(self._path):
-                interface = get_interface(node.tag)
-                for signal_node in self._signal_tree.children(node.identifier):
-                    signal, descriptor = signal_node.data
+        for index in (
+            self._server._method_index,
+            self._server._property_index,
+            self._server._signal_index,
+        ):
+            for interface_name, elements in index.interfaces(path).items():
+                interface = get_interface(interface_name)
+                for data in elements.values():
+                    descriptor = data[-1]
                     interface.append(descriptor.xml)
 
+        # add standard interfaces
+        for standard_interface in self._server._standard_interfaces.values():
+            if standard_interface.serves(path):
+                xml.append(standard_interface.xml)
+
         # add nodes (subpaths)
-        if self._method_tree:
-            for node in self._method_tree.children('paths'):
-                if node.identifier == self._path or self._path.startswith(node.identifier):
-                    continue
-                if os.path.dirname(node.identifier) == self._path:
-                    ET.SubElement(xml, 'node', {'name': os.path.basename(node.identifier)})
+        children = dict.fromkeys(os.path.basename(child) for child in self._server._children.get(path, ()))
+        children.update(dict.fromkeys(enumerated))
+        for child in children:
+            ET.SubElement(xml, 'node', {'name': child})
 
         return self._XML_DOCTYPE + ET.tostring(xml).decode()
 
 
-class _Peer(dbus_objects.DBusObject):
+class _Peer(_StandardInterface):
     '''
     https://dbus.freedesktop.org/doc/dbus-specification.html#standard-interfaces-peer
     '''
-    def __init__(self) -> None:
-        super().__init__(
-            name='Peer',
-            default_interface_root='org.freedesktop.DBus',
-        )
+    def __init__(self, server: 'DBusServerBase') -> None:
+        '''
+        :param server: DBus server the interface is served by
+        '''
+        super().__init__('Peer', server)
 
-    @dbus_objects.dbus_method()
-    def ping(self) -> None:
+    @_path_method()
+    def ping(self, path: str) -> None:
         return
 
     # TODO: GetMachineId() - how to reliably get the ID?
 
 
-class _Properties(dbus_objects.DBusObject):
+class _Properties(_StandardInterface):
     '''
     https://dbus.freedesktop.org/doc/dbus-specification.html#standard-interfaces-properties
     '''
-    def __init__(self, obj: dbus_objects.DBusObject) -> None:
-        super().__init__(
-            name='Properties',
-            default_interface_root='org.freedesktop.DBus',
+    def __init__(self, server: 'DBusServerBase') -> None:
+        '''
+        :param server: DBus server the interface is served by
+        '''
+        super().__init__('Properties', server)
+        self.__logger = logging.getLogger(self.__class__.__name__)
+
+    def serves(self, path: str) -> bool:
+        return path in self._server._objects
+
+    def _get_property(self, path: str, interface_name: str, property_name: str) -> dbus_objects._DBusPropertyTuple:
+        interfaces = self._server._property_index.interfaces(path)
+        if interface_name:
+            properties = interfaces.get(interface_name, {})
+            if property_name in properties:
+                return typing.cast(dbus_objects._DBusPropertyTuple, properties[property_name])
+            if not properties and not self._server._has_interface(path, interface_name):
+                raise dbus_objects.DBusError(
+                    'org.freedesktop.DBus.Error.UnknownInterface', f'No such interface: {interface_name}',
+                )
+        else:
+            # an empty interface name means any interface
+            for properties in interfaces.values():
+                if property_name in properties:
+                    return typing.cast(dbus_objects._DBusPropertyTuple, properties[property_name])
+        raise dbus_objects.DBusError(
+            'org.freedesktop.DBus.Error.UnknownProperty', f'No such property: {property_name}',
         )
-        self._obj = obj
 
-    @dbus_objects.dbus_method()
-    def get(self, interface_name: str, property_name: str) -> dbus_objects.types.Variant:
-        # TODO: interface == ''
-        return '', None
+    @_path_method()
+    def get(self, path: str, interface_name: str, property_name: str) -> dbus_objects.types.Variant:
+        getter, _setter, descriptor = self._get_property(path, interface_name, property_name)
+        return descriptor.signature, getter()
 
-    @dbus_objects.dbus_method(name='set')
-    def set_(self, interface_name: str, property_name: str, value: dbus_objects.types.Variant) -> None:
-        # TODO: interface == ''
-        pass
+    @_path_method(name='set')
+    def set_(self, path: str, interface_name: str, property_name: str, value: dbus_objects.types.Variant) -> None:
+        _getter, setter, descriptor = self._get_property(path, interface_name, property_name)
+        if not descriptor.writable:
+            raise dbus_objects.DBusError(
+                'org.freedesktop.DBus.Error.PropertyReadOnly', f"Property '{property_name}' is read-only",
+            )
+        signature, data = value
+        if signature != descriptor.signature:
+            raise dbus_objects.DBusError(
+                'org.freedesktop.DBus.Error.InvalidArgs',
+                f"Invalid signature for property '{property_name}': "
+                f"expected '{descriptor.signature}', got '{signature}'",
+            )
+        setter(data)
 
-    @dbus_objects.dbus_method()
-    def get_all(self, interface_name: str) -> Dict[str, dbus_objects.types.Variant]:
+    @_path_method()
+    def get_all(self, path: str, interface_name: str) -> Dict[str, dbus_objects.types.Variant]:
+        interfaces = self._server._property_index.interfaces(path)
+        selected = interfaces.values() if not interface_name else (interfaces.get(interface_name, {}),)
         return {
             descriptor.name: (descriptor.signature, getter())
-            for getter, setter, descriptor in self._obj.get_dbus_properties()
+            for properties in selected
+            for getter, _setter, descriptor in properties.values()
         }
 
-    # TODO: PropertiesChanged
+    properties_changed = dbus_objects.custom_dbus_signal(name='PropertiesChanged')(
+        interface_name=str,
+        changed_properties=Dict[str, dbus_objects.types.Variant],
+        invalidated_properties=List[str],
+    )
 
+    def emit_properties_changed(
+        self,
+        path: str,
+        interface: str,
+        changed_properties: Dict[str, Any],
+        invalidated_properties: List[str],
+    ) -> None:
+        '''
+        Emits the PropertiesChanged signal in the path
 
-# TODO: org.freedesktop.DBus.ObjectManager
+        :param path: object path
+        :param interface: interface of the properties
+        :param changed_properties: new property values
+        :param invalidated_properties: properties whose value was not sent
+        '''
+        assert self._server.emit_signal_callback
+        body = interface, changed_properties, invalidated_properties
+        try:
+            self._server.emit_signal_callback(self._signals['PropertiesChanged'], path, body)
+        except Exception as e:
+            self.__logger.info(f'An exception ocurred when try to emit signal PropertiesChanged {body}: {e}')
 
 
-class _DBusTree(treelib.Tree):  # type: ignore
-    def __init__(self) -> None:
-        super().__init__()
-        self._paths = self.create_node(identifier='paths')
+# object path -> interface -> property name -> value
+_ManagedObjects = Dict[dbus_objects.DBusObject, Dict[str, Dict[str, dbus_objects.types.Variant]]]
 
-    def get_path_node(self, path: str) -> treelib.Node:
+
+class _ObjectManager(dbus_objects.DBusObject):
+    '''
+    https://dbus.freedesktop.org/doc/dbus-specification.html#standard-interfaces-objectmanager
+
+    Keeps a snapshot of the objects registered under its path, which is
+    updated as objects are registered and their properties change, so that
+    GetManagedObjects does not have to walk the object tree.
+    '''
+    _STANDARD_INTERFACES = (
+        'org.freedesktop.DBus.Peer',
+        'org.freedesktop.DBus.Introspectable',
+        'org.freedesktop.DBus.Properties',
+    )
+
+    def __init__(self, path: str) -> None:
+        '''
+        :param path: path where the object manager is being registered
         '''
-        Fetches the path
+        super().__init__(
+            name='ObjectManager',
+            default_interface_root='org.freedesktop.DBus',
+        )
+        self._path = path
+        self._lock = threading.Lock()
+        # object path -> interface -> property name -> value (variant)
+        self._objects: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        # object path -> (interface, property name, getter, signature) of the properties that are read on demand
+        self._uncached: Dict[str, List[Tuple[str, str, Callable[[], Any], str]]] = {}
 
-        :param path: path
+    @property
+    def paths(self) -> List[str]:
         '''
-        if self.contains(path):
-            return self.get_node(path)
-        else:
-            return self.create_node(identifier=path, parent=self._paths)
+        Paths in the snapshot
+        '''
+        with self._lock:
+            return list(self._objects)
 
-    def get_interface_node(self, path: str, interface: str, create: bool = False) -> treelib.Node:
+    def manages(self, path: str) -> bool:
         '''
-        Fetches the interface for given path and interface name. Optionally
-        creates it if not found.
+        Checks if the path is managed by this object manager
 
-        :param path: interface path
-        :param interface: interface name
-        :param create: whether to create the interface or not if missing
+        :param path: object path
         '''
-        path_node = self.get_path_node(path)
-        for node in self.children(path):
-            if node.tag == interface:
-                return node
-        return self.create_node(interface, parent=path_node,)
+        return path != self._path and path.startswith(self._path.rstrip('/') + '/')
 
-    def get_element(self, path: str, interface: str, name: str) -> Any:
+    def add_object(self, path: str, obj: dbus_objects.DBusObject, emit: bool = True) -> None:
         '''
-        Fetches the element for given path, interface and element name
+        Adds the object interfaces to the snapshot
 
-        :param path: element path
-        :param interface: element interface
-        :param interface: element name
+        :param path: object path
+        :param obj: object
+        :param emit: emit the InterfacesAdded signal
         '''
-        if self.contains(path):
-            # search for interfaces (2nd level)
-            for interface_node in self.children(path):
-                if interface_node.tag == interface:
-                    # search for methods (3rd level)
-                    for method_node in self.children(interface_node.identifier):
-                        if method_node.tag == name:
-                            return method_node.data
-                    break  # right interface but didn't find the method
-        raise KeyError(f'Element not found: path={path} interface={interface} name={name}')
+        interfaces: Dict[str, Dict[str, Any]] = {}
+        uncached = []
+        for _method, method_descriptor in obj.get_dbus_methods():
+            interfaces.setdefault(method_descriptor.interface, {})
+        for _signal, signal_descriptor in obj.get_dbus_signals():
+            interfaces.setdefault(signal_descriptor.interface, {})
+        for getter, _setter, descriptor in obj.get_dbus_properties():
+            properties = interfaces.setdefault(descriptor.interface, {})
+            # only the properties that emit their new value can be kept up to date
+            if descriptor.emits_changed is True:
+                properties[descriptor.name] = (descriptor.signature, getter())
+            else:
+                uncached.append((descriptor.interface, descriptor.name, getter, descriptor.signature))
+
+        with self._lock:
+            if path not in self._objects:
+                self._objects[path] = {}
+                interfaces.update((interface, {}) for interface in self._STANDARD_INTERFACES)
+            for interface, properties in interfaces.items():
+                self._objects[path].setdefault(interface, {}).update(properties)
+            self._uncached.setdefault(path, []).extend(uncached)
+
+        if emit:
+            for interface, property_name, getter, signature in uncached:
+                interfaces[interface][property_name] = (signature, getter())
+            self.interfaces_added(path, interfaces)
+
+    def remove_object(self, path: str) -> None:
+        '''
+        Removes the path from the snapshot and emits the InterfacesRemoved signal
+
+        :param path: object path
+        '''
+        with self._lock:
+            interfaces = self._objects.pop(path, None)
+            self._uncached.pop(path, None)
+        if interfaces is not None:
+            self.interfaces_removed(path, list(interfaces))
+
+    def properties_changed(
+        self,
+        path: str,
+        interface: str,
+        changed_properties: Dict[str, Any],
+        invalidated_properties: List[str],
+    ) -> None:
+        '''
+        Updates the snapshot with the new property values
+
+        :param path: object path
+        :param interface: interface of the properties
+        :param changed_properties: new property values
+        :param invalidated_properties: properties whose value was not sent
+        '''
+        with self._lock:
+            interfaces = self._objects.get(path)
+            if interfaces is not None and interface in interfaces:
+                interfaces[interface].update(changed_properties)
+
+    @dbus_objects.dbus_method()
+    def get_managed_objects(self) -> _ManagedObjects:
+        with self._lock:
+            objects = {
+                path: {interface: dict(properties) for interface, properties in interfaces.items()}
+                for path, interfaces in self._objects.items()
+            }
+            uncached = [(path, entries) for path, entries in self._uncached.items() if entries]
+        for path, entries in uncached:
+            for interface, property_name, getter, signature in entries:
+                objects[path][interface][property_name] = (signature, getter())
+        return typing.cast(_ManagedObjects, objects)
+
+    interfaces_added = dbus_objects.custom_dbus_signal(name='InterfacesAdded')(
+        object_path=dbus_objects.DBusObject,
+        interfaces_and_properties=Dict[str, Dict[str, dbus_objects.types.Variant]],
+    )
+    interfaces_removed = dbus_objects.custom_dbus_signal(name='InterfacesRemoved')(
+        object_path=dbus_objects.DBusObject,
+        interfaces=List[str],
+    )
+
+
+class _Fallback():
+    '''
+    Objects created on demand for the paths under a prefix
+
+    The live instances are kept in least recently used order, so that the
+    oldest ones can be evicted.
+    '''
+    def __init__(
+        self,
+        prefix: str,
+        factory: Callable[[str], Optional[dbus_objects.DBusObject]],
+        enumerate_children: Optional[Callable[[str], Iterable[str]]],
+        max_instances: int,
+    ) -> None:
+        self.prefix = prefix
+        self.factory = factory
+        self.enumerate_children = enumerate_children
+        self.max_instances = max_instances
+        # path -> object
+        self.instances: typing.OrderedDict[str, dbus_objects.DBusObject] = collections.OrderedDict()
+
+
+# id -> server, so that the process pool workers can find the server they were forked from
+_forked_servers: Dict[int, 'DBusServerBase'] = {}
+
+
+def _call_forked(server_id: int, path: str, interface: str, method: str, args: Tuple[Any, ...]) -> Any:
+    '''
+    Calls a method in a process pool worker
+
+    :param server_id: ID of the server the worker was forked from
+    :param path: method path
+    :param interface: method interface
+    :param method: method name
+    :param args: method arguments
+    '''
+    func, _descriptor = _forked_servers[server_id].get_method(path, interface, method)
+    return func(*args)
+
+
+def _detach_forked(server_id: int) -> None:
+    '''
+    Initializes a process pool worker, detaching it from the server connections
+
+    :param server_id: ID of the server the worker was forked from
+    '''
+    _forked_servers[server_id]._detach()
 
 
 class DBusServerBase():
@@ -207,9 +579,33 @@ class DBusServerBase():
         self.__logger = logging.getLogger(self.__class__.__name__)
         self._bus = bus
         self._name = name
-        self._method_tree = _DBusTree()
-        self._property_tree = _DBusTree()
-        self._signal_tree = _DBusTree()
+        self._method_index = _DBusIndex()
+        self._property_index = _DBusIndex()
+        self._signal_index = _DBusIndex()
+        # path -> direct child paths (dict used as an ordered set)
+        self._children: Dict[str, Dict[str, None]] = {}
+        # path -> introspection XML
+        self._introspection_cache: Dict[str, str] = {}
+        # path -> objects registered in it
+        self._objects: Dict[str, List[dbus_objects.DBusObject]] = {}
+        # path -> object manager registered in it
+        self._object_managers: Dict[str, _ObjectManager] = {}
+        # path -> (object, callback) added to the objects properties changed callbacks
+        self._properties_changed_callbacks: Dict[str, List[Tuple[dbus_objects.DBusObject, Callable[..., None]]]] = {}
+        # prefix -> fallback
+        self._fallbacks: Dict[str, _Fallback] = {}
+        # path -> fallback, for the live fallback instances
+        self._fallback_paths: Dict[str, _Fallback] = {}
+        self._fallback_lock = threading.RLock()
+        # interface name -> standard interface, served in every path
+        self._properties = _Properties(self)
+        self._standard_interfaces: Dict[str, _StandardInterface] = {
+            standard_interface.interface: standard_interface
+            for standard_interface in (self._properties, _Peer(self), _Introspectable(self))
+        }
+        # pool the cpu_bound methods are run in, and the paths its workers know about
+        self._process_pool: Optional['concurrent.futures.ProcessPoolExecutor'] = None
+        self._forked_paths: FrozenSet[str] = frozenset()
         # XXX mypy does not support optional class methods
         self.emit_signal_callback: Optional[Callable[[dbus_objects._DBusSignal, str, Any], None]] = None
 
@@ -220,6 +616,96 @@ class DBusServerBase():
         '''
         return self._name
 
+    @contextlib.contextmanager
+    def _cpu_bound_processes(self, processes: Optional[int]) -> Iterator[None]:
+        '''
+        Runs the ``cpu_bound`` methods in a pool of forked processes while in the context
+
+        The workers can only call the methods of the objects registered
+        before they were forked, see :meth:`_submit_cpu_bound`.
+
+        :param processes: number of worker processes, ``None`` to not use a pool
+        '''
+        if not processes:
+            yield
+            return
+
+        import concurrent.futures
+        import multiprocessing
+
+        _forked_servers[id(self)] = self
+        self._forked_paths = frozenset(self._objects)
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=multiprocessing.get_context('fork'),
+                initializer=_detach_forked,
+                initargs=(id(self),),
+            ) as pool:
+                # fork the workers now, so that they are not forked from a
+                # thread handling some other call
+                pool.submit(int).result()
+                self._process_pool = pool
+                yield
+        finally:
+            self._process_pool = None
+            self._forked_paths = frozenset()
+            del _forked_servers[id(self)]
+
+    def _detach(self) -> None:
+        '''
+        Stops emitting signals, in the forked process pool workers
+
+        The workers have a copy of the server connections, writing to them
+        would interleave with the writes of the server process.
+        '''
+        self.emit_signal_callback = None
+        for path, objects in self._objects.items():
+            for obj in objects:
+                obj.unregister_server(self, path)
+        for callbacks in self._properties_changed_callbacks.values():
+            for obj, callback in callbacks:
+                obj._properties_changed_callbacks.remove((self._call_soon, callback))
+        self._properties_changed_callbacks.clear()
+
+    def _call_soon(self, callback: Callable[[], None]) -> None:
+        '''
+        Runs the callback in the thread the object methods are called in
+
+        Used to read the properties for PropertiesChanged, which may have
+        been changed in any thread. Subclasses should override it, the
+        callback is run right away by default.
+
+        :param callback: callback to run
+        '''
+        callback()
+
+    def _submit_cpu_bound(
+        self,
+        descriptor: dbus_objects._DBusMethod,
+        path: str,
+        interface: str,
+        method: str,
+        args: Tuple[Any, ...],
+    ) -> Optional['concurrent.futures.Future[Any]']:
+        '''
+        Calls the method in the process pool, if it should be
+
+        Returns the future for the return value, or ``None`` if the method
+        should be called in this process. That is the case for methods that
+        are not ``cpu_bound``, when there is no process pool, and for the
+        objects registered after the pool was started.
+
+        :param descriptor: method descriptor
+        :param path: method path
+        :param interface: method interface
+        :param method: method name
+        :param args: method arguments
+        '''
+        if self._process_pool is None or not descriptor.cpu_bound or path not in self._forked_paths:
+            return None
+        return self._process_pool.submit(_call_forked, id(self), path, interface, method, args)
+
     def get_method(self, path: str, interface: str, method: str) -> dbus_objects._DBusMethodTuple:
         '''
         Fetches the method for given path, interface and method name
@@ -228,10 +714,18 @@ class DBusServerBase():
         :param interface: method interface
         :param interface: method name
         '''
-        return typing.cast(
-            dbus_objects._DBusMethodTuple,
-            self._method_tree.get_element(path, interface, method)
-        )
+        try:
+            element = self._method_index.get_element(path, interface, method)
+        except KeyError:
+            if path not in self._objects and self._activate_fallback(path):
+                return self.get_method(path, interface, method)
+            standard_interface = self._standard_interfaces.get(interface)
+            if standard_interface and standard_interface.has_method(method) and standard_interface.serves(path):
+                return standard_interface.get_method(path, method)
+            raise
+        if self._fallback_paths:
+            self._touch_fallback(path)
+        return typing.cast(dbus_objects._DBusMethodTuple, element)
 
     def get_property(self, path: str, interface: str, method: str) -> dbus_objects._DBusPropertyTuple:
         '''
@@ -243,31 +737,25 @@ class DBusServerBase():
         '''
         return typing.cast(
             dbus_objects._DBusPropertyTuple,
-            self._property_tree.get_element(path, interface, method)
+            self._property_index.get_element(path, interface, method)
         )
 
     def _register_element(
         self,
-        tree: _DBusTree,
+        index: _DBusIndex,
         path: str,
         interface: str,
         name: str,
         data: Any,
         ignore_warn: bool,
     ) -> None:
-        interface_node = tree.get_interface_node(path, interface)
-        for node in tree.children(interface_node.identifier):
-            if node.tag == name:
-                if not ignore_warn:
-                    warnings.warn(
-                        f'Element already registered! '
-                        f'path={path} '
-                        f'interface={interface} '
-                        f'name={name} '
-                    )
-                break
-        else:  # no break
-            tree.create_node(name, data=data, parent=interface_node)
+        if not index.add_element(path, interface, name, data) and not ignore_warn:
+            warnings.warn(
+                f'Element already registered! '
+                f'path={path} '
+                f'interface={interface} '
+                f'name={name} '
+            )
 
     def _register_object(
         self,
@@ -285,7 +773,7 @@ class DBusServerBase():
         '''
         for method, method_descriptor in obj.get_dbus_methods():
             self._register_element(
-                self._method_tree,
+                self._method_index,
                 path,
                 method_descriptor.interface,
                 method_descriptor.name,
@@ -294,7 +782,7 @@ class DBusServerBase():
             )
         for getter, setter, property_descriptor in obj.get_dbus_properties():
             self._register_element(
-                self._property_tree,
+                self._property_index,
                 path,
                 property_descriptor.interface,
                 property_descriptor.name,
@@ -303,7 +791,7 @@ class DBusServerBase():
             )
         for signal, signal_descriptor in obj.get_dbus_signals():
             self._register_element(
-                self._signal_tree,
+                self._signal_index,
                 path,
                 signal_descriptor.interface,
                 signal_descriptor.name,
@@ -322,19 +810,341 @@ class DBusServerBase():
         obj.register_server(self, path)
         # TODO: validate paths, interfaces and method names
         self._register_object(path, obj)
-        self._register_object(path, _Properties(obj), ignore_warn=True)
-        do = True
-        while do:
-            self._register_object(path, _Peer(), ignore_warn=True)
-            self._register_object(
-                path,
-                _Introspectable(
-                    path,
-                    self._method_tree,
-                    self._property_tree,
-                    self._signal_tree,
-                ),
-                ignore_warn=True,
+        if obj._dbus_members.properties and self.emit_signal_callback:
+            self._add_properties_changed_callback(
+                path, obj, functools.partial(self._properties.emit_properties_changed, path),
             )
-            do = path != '/'
+        self._objects.setdefault(path, []).append(obj)
+        # the fallback instances come and go, they are not reported by the object managers
+        if path not in self._fallback_paths:
+            for manager in self._get_object_managers(path):
+                manager.add_object(path, obj)
+                self._add_properties_changed_callback(path, obj, functools.partial(manager.properties_changed, path))
+        self._register_path(path)
+
+    def register_fallback(
+        self,
+        prefix: str,
+        factory: Callable[[str], Optional[dbus_objects.DBusObject]],
+        enumerate_children: Optional[Callable[[str], Iterable[str]]] = None,
+        max_instances: int = 1024,
+    ) -> None:
+        '''
+        Registers a factory for the objects under the prefix
+
+        Instead of registering every object upfront, the factory is called
+        with the path of the first call that is made to it, and the object it
+        returns is registered. The factory may return ``None`` if there is no
+        object in the path. Only the ``max_instances`` most recently used
+        objects are kept registered, the older ones are unregistered and will
+        be created again when needed, so they should not keep any state.
+
+        As the objects are not known in advance, introspection can only list
+        them if ``enumerate_children`` is provided. It is called with the path
+        being introspected and should return the names of its children.
+
+        :param prefix: path prefix, the factory is used for its descendants
+        :param factory: callable that receives the path and returns the object
+        :param enumerate_children: callable that receives a path and returns its children names
+        :param max_instances: maximum number of objects kept registered
+        '''
+        if prefix in self._fallbacks:
+            raise ValueError(f'Fallback already registered: {prefix}')
+        if max_instances < 1:
+            raise ValueError(f'The fallback must keep at least one instance, got max_instances={max_instances}')
+        self.__logger.debug(f'registering fallback in {prefix}')
+        self._fallbacks[prefix] = _Fallback(prefix, factory, enumerate_children, max_instances)
+        self._register_path(prefix)
+
+    def _get_fallback(self, path: str) -> Optional[_Fallback]:
+        '''
+        Returns the fallback covering the path (the one in its closest ancestor)
+
+        :param path: object path
+        '''
+        if not self._fallbacks:
+            return None
+        while path != '/':
             path = os.path.dirname(path)
+            if path in self._fallbacks:
+                return self._fallbacks[path]
+        return None
+
+    def _activate_fallback(self, path: str) -> bool:
+        '''
+        Creates and registers the fallback object for the path, if any
+
+        :param path: object path
+        '''
+        fallback = self._get_fallback(path)
+        if fallback is None:
+            return False
+        # the factory may be slow, so don't hold up the other paths while it runs
+        obj = fallback.factory(path)
+        if obj is None:
+            return False
+        with self._fallback_lock:
+            if path in self._objects:
+                return True  # created in the meantime by another thread
+            if self._fallbacks.get(fallback.prefix) is not fallback:
+                return False  # unregistered in the meantime
+            self._fallback_paths[path] = fallback
+            fallback.instances[path] = obj
+            self.register_object(path, obj)
+            while len(fallback.instances) > fallback.max_instances:
+                evicted, _obj = fallback.instances.popitem(last=False)
+                self._remove_path(evicted)
+                self._prune_path(evicted)
+        return True
+
+    def _touch_fallback(self, path: str) -> None:
+        '''
+        Marks the fallback object in the path as the most recently used
+
+        This runs on every call, so it doesn't take the fallback lock, the
+        ordered dictionary operations are atomic.
+
+        :param path: object path
+        '''
+        fallback = self._fallback_paths.get(path)
+        if fallback is not None:
+            with contextlib.suppress(KeyError):  # evicted in the meantime
+                fallback.instances.move_to_end(path)
+
+    def _enumerate_children(self, path: str) -> Optional[Iterable[str]]:
+        '''
+        Returns the children names provided by the fallback covering the path
+
+        :param path: object path
+        '''
+        fallback = self._fallbacks.get(path) or self._get_fallback(path)
+        if fallback is None or fallback.enumerate_children is None:
+            return None
+        return fallback.enumerate_children(path)
+
+    def unregister_object(self, path: str) -> None:
+        '''
+        Unregisters all the objects in the path
+
+        This includes the object manager registered in the path, if any. The
+        path is kept as long as it still has children.
+
+        :param path: object path
+        '''
+        if path not in self._objects and path not in self._object_managers:
+            raise KeyError(f'No object registered in path: {path}')
+        self.__logger.debug(f'unregistering {path}')
+        self._remove_path(path)
+        self._prune_path(path)
+
+    def unregister_fallback(self, prefix: str) -> None:
+        '''
+        Unregisters the fallback in the prefix, and the objects it created
+
+        :param prefix: path prefix the fallback was registered with
+        '''
+        with self._fallback_lock:
+            fallback = self._fallbacks.pop(prefix, None)
+            if fallback is None:
+                raise KeyError(f'No fallback registered in path: {prefix}')
+            self.__logger.debug(f'unregistering fallback in {prefix}')
+            for path in list(fallback.instances):
+                self._remove_path(path)
+                self._prune_path(path)
+        self._prune_path(prefix)
+
+    def unregister_subtree(self, prefix: str) -> None:
+        '''
+        Unregisters all the objects in the path and its descendants
+
+        This includes the fallbacks registered in the subtree.
+
+        :param prefix: subtree root path
+        '''
+        self.__logger.debug(f'unregistering subtree {prefix}')
+        with self._fallback_lock:
+            subtree = prefix.rstrip('/') + '/'
+            for fallback_prefix in list(self._fallbacks):
+                if fallback_prefix == prefix or fallback_prefix.startswith(subtree):
+                    del self._fallbacks[fallback_prefix]
+        # post-order, so that the children are removed before their parents
+        stack = [(prefix, False)]
+        while stack:
+            path, visited = stack.pop()
+            if visited:
+                self._children.pop(path, None)
+                self._remove_path(path)
+            else:
+                stack.append((path, True))
+                stack.extend((child, False) for child in self._children.get(path, ()))
+        self._prune_path(prefix)
+
+    def _add_properties_changed_callback(
+        self,
+        path: str,
+        obj: dbus_objects.DBusObject,
+        callback: Callable[..., None],
+    ) -> None:
+        obj._properties_changed_callbacks.append((self._call_soon, callback))
+        self._properties_changed_callbacks.setdefault(path, []).append((obj, callback))
+
+    def _remove_path(self, path: str) -> None:
+        '''
+        Removes everything registered in the path
+
+        :param path: object path
+        '''
+        for obj in self._objects.pop(path, ()):
+            obj.unregister_server(self, path)
+        fallback = self._fallback_paths.pop(path, None)
+        if fallback is not None:
+            fallback.instances.pop(path, None)
+        for obj, callback in self._properties_changed_callbacks.pop(path, ()):
+            obj._properties_changed_callbacks.remove((self._call_soon, callback))
+        manager = self._object_managers.pop(path, None)
+        if manager is not None:
+            self._remove_object_manager_callbacks(manager)
+        for manager in self._get_object_managers(path):
+            manager.remove_object(path)
+        for index in (self._method_index, self._property_index, self._signal_index):
+            index.remove_path(path)
+        self._invalidate_introspection(path)
+
+    def _remove_object_manager_callbacks(self, manager: _ObjectManager) -> None:
+        '''
+        Removes the callbacks the object manager added to its objects
+
+        :param manager: object manager
+        '''
+        for path in manager.paths:
+            callbacks = self._properties_changed_callbacks.get(path, [])
+            for obj, callback in list(callbacks):
+                if isinstance(callback, functools.partial) and callback.func == manager.properties_changed:
+                    callbacks.remove((obj, callback))
+                    obj._properties_changed_callbacks.remove((self._call_soon, callback))
+
+    def _prune_path(self, path: str) -> None:
+        '''
+        Removes the path and its ancestors from the object tree if they are
+        not needed anymore
+
+        :param path: object path
+        '''
+        while path != '/' and not self._children.get(path) and path not in self._objects \
+                and path not in self._object_managers and path not in self._fallbacks:
+            self._children.pop(path, None)
+            self._invalidate_introspection(path)
+            parent = os.path.dirname(path)
+            self._children.get(parent, {}).pop(path, None)
+            self._invalidate_introspection(parent)
+            path = parent
+
+    def register_object_manager(self, path: str) -> None:
+        '''
+        Registers an ``org.freedesktop.DBus.ObjectManager`` in the path
+
+        The object manager reports all the objects registered under the path,
+        including the ones registered before it.
+
+        :param path: object manager path
+        '''
+        if path in self._object_managers:
+            raise ValueError(f'Object manager already registered: {path}')
+        self.__logger.debug(f'registering object manager in {path}')
+        manager = _ObjectManager(path)
+        self._register_object(path, manager, ignore_warn=True)
+        if self.emit_signal_callback:
+            manager.register_server(self, path)
+        for object_path, objects in self._objects.items():
+            if manager.manages(object_path) and object_path not in self._fallback_paths:
+                for obj in objects:
+                    manager.add_object(object_path, obj, emit=False)
+                    self._add_properties_changed_callback(
+                        object_path, obj, functools.partial(manager.properties_changed, object_path),
+                    )
+        self._object_managers[path] = manager
+        self._register_path(path)
+
+    def _get_object_managers(self, path: str) -> List[_ObjectManager]:
+        '''
+        Returns the object managers of the path (the ones in its ancestors)
+
+        :param path: object path
+        '''
+        managers = []
+        while path != '/':
+            path = os.path.dirname(path)
+            if path in self._object_managers:
+                managers.append(self._object_managers[path])
+        return managers
+
+    def _has_path(self, path: str) -> bool:
+        '''
+        Checks if the path exists, either because something is registered in
+        it, because it is an ancestor of a path which does, or because its
+        parent fallback lists it as a child
+
+        :param path: object path
+        '''
+        if self._is_registered(path):
+            return True
+        if self._get_fallback(path) is None:
+            return False
+        children = self._enumerate_children(os.path.dirname(path))
+        return children is not None and os.path.basename(path) in children
+
+    def _is_registered(self, path: str) -> bool:
+        '''
+        Checks if the path is in the object tree
+
+        :param path: object path
+        '''
+        return (
+            path == '/'
+            or path in self._objects
+            or path in self._children
+            or path in self._object_managers
+            or path in self._fallbacks
+        )
+
+    def _has_interface(self, path: str, interface: str) -> bool:
+        '''
+        Checks if the interface is available in the path
+
+        :param path: object path
+        :param interface: interface name
+        '''
+        if any(
+            interface in index.interfaces(path)
+            for index in (self._method_index, self._property_index, self._signal_index)
+        ):
+            return True
+        standard_interface = self._standard_interfaces.get(interface)
+        return standard_interface is not None and standard_interface.serves(path)
+
+    def _register_path(self, path: str) -> None:
+        '''
+        Adds the path and its ancestors to the object tree
+
+        :param path: object path
+        '''
+        self._invalidate_introspection(path)
+        while path != '/':
+            parent = os.path.dirname(path)
+            children = self._children.setdefault(parent, {})
+            if path in children:
+                break  # the ancestors have already been registered
+            children[path] = None
+            self._invalidate_introspection(parent)
+            path = parent
+
+    def _invalidate_introspection(self, path: str) -> None:
+        '''
+        Drops the cached introspection XML for the path
+
+        Must be called whenever the elements registered in the path, or its
+        direct children, change.
+
+        :param path: object path
+        '''
+        self._introspection_cache.pop(path, None)
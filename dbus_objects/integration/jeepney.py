@@ -2,96 +2,930 @@
 
 from __future__ import annotations
 
+import array
+import collections
+import contextlib
+import functools
+import itertools
 import logging
+import os
+import selectors
+import socket
+import struct
+import sys
 import threading
+import time
+import typing
+import uuid
 
-from typing import Any, Optional
+from typing import Any, Callable, Collection, Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
 import jeepney
+import jeepney.bus
+import jeepney.fds
 import jeepney.io.blocking
+import jeepney.low_level
 
 import dbus_objects.integration
 
 
+if typing.TYPE_CHECKING:  # pragma: no cover
+    import asyncio
+    import concurrent.futures
+
+    import trio
+
+
+# maximum number of buffers we pass to sendmsg
+_IOV_MAX = 1024
+
+
+def _sendmsg_all(sock: socket.socket, buffers: Sequence[_Buffer], fds: Optional[array.array[int]] = None) -> None:
+    '''
+    Sends all the buffers in as few ``sendmsg`` calls as possible
+
+    :param sock: socket to send the data on
+    :param buffers: data to send
+    :param fds: file descriptors to send along the first byte of data
+    '''
+    views = collections.deque(memoryview(buffer) for buffer in buffers)
+    ancdata = _scm_rights(fds)
+    while views:
+        _consume_views(views, sock.sendmsg(list(itertools.islice(views, _IOV_MAX)), ancdata))
+        ancdata = []
+
+
+def _scm_rights(fds: Optional[array.array[int]]) -> List[Tuple[int, int, bytes]]:
+    '''
+    Creates the ancillary data to send file descriptors
+
+    :param fds: file descriptors to send
+    '''
+    if not fds:
+        return []
+    return [(socket.SOL_SOCKET, socket.SCM_RIGHTS, fds.tobytes())]
+
+
+def _consume_views(views: typing.Deque[memoryview], sent: int) -> None:
+    '''
+    Drops the data that has already been sent from the buffer queue
+
+    :param views: buffer queue
+    :param sent: number of bytes sent
+    '''
+    while sent:
+        if sent < len(views[0]):
+            views[0] = views[0][sent:]
+            return
+        sent -= len(views.popleft())
+
+
+_Buffer = Union[bytes, bytearray, memoryview, 'array.array[Any]']
+_BUFFER_TYPES = (bytes, bytearray, memoryview, array.array)
+_NATIVE_ENDIANNESS = jeepney.Endianness.little if sys.byteorder == 'little' else jeepney.Endianness.big
+
+
+class _BufferMessage(jeepney.Message):  # type: ignore
+    '''
+    Message with buffers in its body
+
+    The fixed size item arrays given as buffers are written straight from
+    the buffer, instead of being serialised item by item. The buffers are
+    in the native byte order, so the message is too.
+    '''
+
+    def __init__(self, header: jeepney.low_level.Header, body: Tuple[Any, ...]) -> None:
+        super().__init__(header, body)
+        header.endianness = _NATIVE_ENDIANNESS
+
+    def serialise(self, serial: Optional[int] = None, fds: Any = None) -> bytes:
+        return b''.join(self.serialise_buffers(serial, fds))
+
+    def serialise_buffers(self, serial: Optional[int] = None, fds: Any = None) -> List[_Buffer]:
+        '''
+        Converts this message to a list of buffers, the body buffers are not copied
+
+        :param serial: serial number to use instead of ``header.serial``
+        :param fds: array the file descriptors in the message are added to
+        '''
+        header = self.header
+        endianness = header.endianness
+        body_type = jeepney.low_level.parse_signature(list(f'({header.fields[jeepney.HeaderFields.signature]})'))
+        chunks: List[_Buffer] = []
+        pos = 0
+        for arg_type, arg in zip(body_type.fields, self.body):
+            if (
+                isinstance(arg, _BUFFER_TYPES)
+                and isinstance(arg_type, jeepney.low_level.Array)
+                and type(arg_type.elt_type) is jeepney.low_level.FixedType
+            ):
+                view = _buffer_view(arg, arg_type.elt_type.size)
+                prefix_pad = jeepney.low_level.padding(pos, 4)
+                data_pad = jeepney.low_level.padding(pos + prefix_pad + 4, arg_type.elt_type.alignment)
+                chunks.append(
+                    b'\0' * prefix_pad
+                    + struct.pack(endianness.struct_code() + 'I', len(view))
+                    + b'\0' * data_pad
+                )
+                chunks.append(view)
+                pos += prefix_pad + 4 + data_pad + len(view)
+            else:
+                chunks.append(arg_type.serialise(arg, pos, endianness, fds=fds))
+                pos += len(chunks[-1])
+
+        header.body_length = pos
+        if fds:
+            header.fields[jeepney.HeaderFields.unix_fds] = len(fds)
+        header_buf = header.serialise(serial=serial)
+        return [header_buf + b'\0' * jeepney.low_level.padding(len(header_buf), 8), *chunks]
+
+
+def _buffer_view(buffer: _Buffer, item_size: int) -> memoryview:
+    '''
+    Validates a buffer for an array, and returns a byte view of it
+
+    :param buffer: buffer to send
+    :param item_size: size of the array items
+    '''
+    view = memoryview(buffer)
+    if view.itemsize not in (1, item_size):
+        raise TypeError(f'Buffer item size ({view.itemsize}) does not match the array item size ({item_size})')
+    if not view.c_contiguous:
+        raise TypeError('Buffer is not contiguous')
+    view = view.cast('B')
+    if len(view) % item_size:
+        raise ValueError(f'Buffer size ({len(view)}) is not a multiple of the array item size ({item_size})')
+    if len(view) > 2 ** 26:
+        raise jeepney.low_level.SizeLimitError('Array size exceeds 64 MiB limit')
+    return view
+
+
+def _with_buffers(msg: jeepney.Message) -> jeepney.Message:
+    '''
+    Returns a :class:`_BufferMessage` for messages with buffers in the body
+
+    :param msg: message to send
+    '''
+    if any(isinstance(arg, _BUFFER_TYPES) for arg in msg.body):
+        return _BufferMessage(msg.header, msg.body)
+    return msg
+
+
+def _message_buffers(msg: jeepney.Message, serial: int, fds: array.array[int]) -> List[_Buffer]:
+    '''
+    Serialises a message to a list of buffers, to be written with ``sendmsg``
+
+    :param msg: message to serialise
+    :param serial: serial number of the message
+    :param fds: array the file descriptors in the message are added to
+    '''
+    if isinstance(msg, _BufferMessage):
+        return msg.serialise_buffers(serial, fds)
+    return [msg.serialise(serial=serial, fds=fds)]
+
+
+def _message_groups(
+    batch: Iterable[jeepney.Message],
+    outgoing_serial: Iterator[int],
+) -> Iterator[Tuple[List[_Buffer], array.array[int]]]:
+    '''
+    Serialises messages, grouped so that they can be written with one ``sendmsg`` call each
+
+    The file descriptors have to be sent along the first byte of their
+    message, so messages with file descriptors start a new group.
+
+    :param batch: messages to serialise
+    :param outgoing_serial: serial number generator
+    '''
+    buffers: List[_Buffer] = []
+    fds = array.array('i')
+    for msg in batch:
+        msg_fds = array.array('i')
+        msg_buffers = _message_buffers(msg, next(outgoing_serial), msg_fds)
+        if msg_fds:
+            if buffers:
+                yield buffers, fds
+            buffers, fds = [], msg_fds
+        buffers += msg_buffers
+    if buffers:
+        yield buffers, fds
+
+
+def _has_fds(value_type: Any) -> bool:
+    '''
+    Checks whether values of a Jeepney type can hold file descriptors
+
+    :param value_type: Jeepney type
+    '''
+    if isinstance(value_type, (jeepney.low_level.FileDescriptor, jeepney.low_level.Variant)):
+        return True
+    if isinstance(value_type, jeepney.low_level.Array):
+        return _has_fds(value_type.elt_type)
+    if isinstance(value_type, jeepney.low_level.Struct):
+        return any(_has_fds(field) for field in value_type.fields)
+    return False
+
+
+def _map_fds(value_type: Any, value: Any, func: Callable[[Any], Any]) -> Any:
+    '''
+    Applies a function to the file descriptors in a value
+
+    :param value_type: Jeepney type of the value
+    :param value: value
+    :param func: function returning the new file descriptor value
+    '''
+    if not _has_fds(value_type):
+        return value
+    if isinstance(value_type, jeepney.low_level.FileDescriptor):
+        return func(value)
+    if isinstance(value_type, jeepney.low_level.Variant):
+        signature, variant_value = value
+        return signature, _map_fds(jeepney.low_level.parse_signature(list(signature)), variant_value, func)
+    if isinstance(value_type, jeepney.low_level.Struct):
+        return tuple(_map_fds(field, field_value, func) for field, field_value in zip(value_type.fields, value))
+    if isinstance(value_type.elt_type, jeepney.low_level.DictEntry):
+        key_type, item_type = value_type.elt_type.fields
+        return {
+            _map_fds(key_type, key, func): _map_fds(item_type, item, func)
+            for key, item in value.items()
+        }
+    return [_map_fds(value_type.elt_type, item, func) for item in value]
+
+
+def _map_message_fds(msg: jeepney.Message, func: Callable[[Any], Any]) -> Tuple[Any, ...]:
+    '''
+    Applies a function to the file descriptors in a message body, returning the new body
+
+    :param msg: message
+    :param func: function returning the new file descriptor value
+    '''
+    body: Tuple[Any, ...] = msg.body
+    signature = msg.header.fields.get(jeepney.HeaderFields.signature, '')
+    if 'h' not in signature and 'v' not in signature:
+        return body
+    body = _map_fds(jeepney.low_level.parse_signature(list(f'({signature})')), msg.body, func)
+    return body
+
+
+def _own_fd(fd: Any) -> Any:
+    if isinstance(fd, int) and not isinstance(fd, bool):
+        return jeepney.FileDescriptor(fd)
+    return fd
+
+
+def _close_fd(fd: Any) -> Any:
+    if isinstance(fd, jeepney.FileDescriptor):
+        fd.close()
+    return fd
+
+
+def _close_fds(msg: jeepney.Message) -> None:
+    '''
+    Closes the file descriptors owned by a message
+
+    Those are the ones we received, and the ones returned by methods.
+    Other file descriptors (eg. in signals) belong to the caller.
+
+    :param msg: message
+    '''
+    if jeepney.HeaderFields.unix_fds in msg.header.fields:
+        _map_message_fds(msg, _close_fd)
+
+
+class _JeepneyMethodCall():
+    '''
+    Resolved method call
+    '''
+    __slots__ = ('msg', 'method', 'descriptor', 'args')
+
+    def __init__(self, msg: jeepney.Message, method: Callable[..., Any], descriptor: dbus_objects._DBusMethod) -> None:
+        self.msg = msg
+        self.method = method
+        self.descriptor = descriptor
+        body = msg.body
+        if jeepney.HeaderFields.unix_fds in msg.header.fields:
+            # the method gets the raw file descriptors, they are closed after the call
+            body = _map_message_fds(msg, jeepney.FileDescriptor.fileno)
+        self.args = descriptor.plan.unpack_arguments(body)
+
+    def method_return(self, return_args: Any) -> jeepney.Message:
+        plan = self.descriptor.plan
+        msg = jeepney.new_method_return(
+            self.msg,
+            plan.output_signature,
+            plan.pack_return(return_args),
+        )
+        if 'h' in plan.output_signature:
+            # we own the returned file descriptors, they are closed once sent
+            msg.body = _map_message_fds(msg, _own_fd)
+        return _with_buffers(msg)
+
+    def close_fds(self) -> None:
+        '''
+        Closes the file descriptors received in the call
+        '''
+        _close_fds(self.msg)
+
+
 class _JeepneyServerBase(dbus_objects.integration.DBusServerBase):
+    # whether the connection can send and receive file descriptors
+    _unix_fds = True
+
     def __init__(self, bus: str, name: str) -> None:
         super().__init__(bus, name)
         self._logger = logging.getLogger(self.__class__.__name__)
 
     def _log_topology(self) -> None:
         self._logger.debug('server topology:')
-        for line in self._method_tree.show(stdout=False).splitlines():
+        for line in self._method_index.show().splitlines():
             self._logger.debug('\t' + line)
         self._logger.info('started listening...')
 
-    def _jeepney_handle_msg(self, msg: jeepney.Message) -> Optional[jeepney.Message]:
+    def _jeepney_get_call(self, msg: jeepney.Message) -> Union[_JeepneyMethodCall, jeepney.Message, None]:
         '''
-        Handle message
+        Resolves the method call for the message
+
+        Returns the method call to perform, the error message that should be
+        sent as a reply or ``None`` if the message should be ignored.
 
         :param msg: message to handle
         '''
-        if msg.header.message_type == jeepney.MessageType.method_call:
+        call = self._jeepney_resolve_call(msg)
+        if not isinstance(call, _JeepneyMethodCall):
+            _close_fds(msg)
+        return call
+
+    def _jeepney_resolve_call(self, msg: jeepney.Message) -> Union[_JeepneyMethodCall, jeepney.Message, None]:
+        if msg.header.message_type != jeepney.MessageType.method_call:
+            self._logger.info(f'Unhandled message: {msg} / {msg.header} / {msg.header.fields}')
+            return None
+
+        if self._logger.isEnabledFor(logging.DEBUG):
             self._logger.debug(f'received message {msg.header.message_type}')
             for key, value in msg.header.fields.items():
                 self._logger.debug(f'\t{jeepney.HeaderFields(key).name} = {value}')
 
-            # TODO: validate fields are in msg
-            try:
-                method, descriptor = self.get_method(
-                    msg.header.fields[jeepney.HeaderFields.path],
-                    msg.header.fields[jeepney.HeaderFields.interface],
-                    msg.header.fields[jeepney.HeaderFields.member],
-                )
-            except KeyError:
-                self._logger.info(
-                    'Method not found:',
-                    msg.header.fields[jeepney.HeaderFields.path],
-                    msg.header.fields[jeepney.HeaderFields.interface],
-                    msg.header.fields[jeepney.HeaderFields.member]
+        # TODO: validate fields are in msg
+        try:
+            method, descriptor = self.get_method(
+                msg.header.fields[jeepney.HeaderFields.path],
+                msg.header.fields[jeepney.HeaderFields.interface],
+                msg.header.fields[jeepney.HeaderFields.member],
+            )
+        except KeyError as e:
+            self._logger.info(f'Method not found: {e}')
+            path = msg.header.fields[jeepney.HeaderFields.path]
+            if not self._has_path(path):
+                return jeepney.new_error(
+                    msg, 'org.freedesktop.DBus.Error.UnknownObject', 's',
+                    tuple([f'No such object path: {path}'])
                 )
-                return None
+            return jeepney.new_error(
+                msg, 'org.freedesktop.DBus.Error.UnknownMethod', 's',
+                tuple([str(e)])
+            )
 
-            if jeepney.HeaderFields.signature in msg.header.fields:
-                msg_sig = msg.header.fields[jeepney.HeaderFields.signature]
-            else:
-                msg_sig = ''
+        msg_sig = msg.header.fields.get(jeepney.HeaderFields.signature, '')
+        plan = descriptor.plan
 
-            signature_input, signature_output = descriptor.signature
+        if plan.input_signature != msg_sig:
+            self._logger.debug(
+                'got invalid signature, was expecting '
+                f'{plan.input_signature} but got {msg_sig}'
+            )
+            return jeepney.new_error(
+                msg, 'org.freedesktop.DBus.Error.InvalidArgs', 's',
+                tuple([f'Invalid signature, expected {plan.input_signature}'])
+            )
 
-            if signature_input != msg_sig:
-                self._logger.debug(
-                    'got invalid signature, was expecting '
-                    f'{signature_input} but got {msg_sig}'
-                )
-                return_msg = jeepney.new_error(
-                    msg, 'Client Error', 's',
-                    tuple([f'Invalid signature, expected {signature_input}'])
-                )
+        if not self._unix_fds and 'h' in plan.input_signature + plan.output_signature:
+            return jeepney.new_error(
+                msg, 'org.freedesktop.DBus.Error.NotSupported', 's',
+                tuple([f'{self.__class__.__name__} does not support file descriptors']),
+            )
+
+        return _JeepneyMethodCall(msg, method, descriptor)
+
+    def _jeepney_call_error(self, call: _JeepneyMethodCall, e: Exception) -> jeepney.Message:
+        if isinstance(e, dbus_objects.DBusError):
+            self._logger.info(f'Method {call.descriptor.name} replied with an error: {e.name}: {e}')
+            return jeepney.new_error(call.msg, e.name, 's', (e.message,))
+        self._logger.error(
+            f'An exception ocurred when try to call method: {call.descriptor.name}',
+            exc_info=True
+        )
+        # the exception name is not a valid error name, the bus would disconnect us
+        return jeepney.new_error(
+            call.msg, 'org.freedesktop.DBus.Error.Failed', 's', tuple([f'{type(e).__name__}: {e}']),
+        )
+
+    def _jeepney_submit(self, call: _JeepneyMethodCall) -> Optional[concurrent.futures.Future[Any]]:
+        '''
+        Performs the call in the process pool, if it should be
+
+        Returns the future for the return value, or ``None`` if the call
+        should be performed in this process.
+
+        :param call: method call
+        '''
+        fields = call.msg.header.fields
+        return self._submit_cpu_bound(
+            call.descriptor,
+            fields[jeepney.HeaderFields.path],
+            fields[jeepney.HeaderFields.interface],
+            fields[jeepney.HeaderFields.member],
+            call.args,
+        )
+
+    def _jeepney_call_result(self, call: _JeepneyMethodCall, future: concurrent.futures.Future[Any]) -> jeepney.Message:
+        '''
+        Creates the reply for a call performed in the process pool
+
+        :param call: method call
+        :param future: finished future for the return value
+        '''
+        try:
+            return_args = future.result()
+        except Exception as e:
+            return self._jeepney_call_error(call, e)
+        return call.method_return(return_args)
+
+    def _jeepney_call(self, call: _JeepneyMethodCall) -> jeepney.Message:
+        '''
+        Performs the call
+
+        Coroutine methods can't be awaited here, use
+        :meth:`_jeepney_handle_msg_async` in servers that support them.
+
+        :param call: method call
+        '''
+        msg = call.msg
+        if call.descriptor.plan.is_async:
+            call.close_fds()
+            return jeepney.new_error(
+                msg, 'org.freedesktop.DBus.Error.NotSupported', 's',
+                tuple([f'{self.__class__.__name__} does not support coroutine methods']),
+            )
+
+        try:
+            return_args = call.method(*call.args)
+        except Exception as e:
+            return self._jeepney_call_error(call, e)
+        finally:
+            call.close_fds()
+        return call.method_return(return_args)
+
+    async def _jeepney_handle_msg_async(self, msg: jeepney.Message) -> Optional[jeepney.Message]:
+        '''
+        Handle message, awaiting the coroutine methods
+
+        :param msg: message to handle
+        '''
+        call = self._jeepney_get_call(msg)
+        if not isinstance(call, _JeepneyMethodCall):
+            return call
+
+        future = self._jeepney_submit(call)
+        if future is not None:
+            await self._wait_future(future)
+            return self._jeepney_call_result(call, future)
+
+        try:
+            if call.descriptor.plan.is_async:
+                return_args = await call.method(*call.args)
             else:
+                return_args = call.method(*call.args)
+        except Exception as e:
+            return self._jeepney_call_error(call, e)
+        finally:
+            call.close_fds()
+        return call.method_return(return_args)
+
+    async def _wait_future(self, future: concurrent.futures.Future[Any]) -> None:
+        '''
+        Waits for the future to finish, without blocking the event loop
+
+        :param future: future to wait for
+        '''
+        raise NotImplementedError
+
+    def _get_signal_msg(self, signal: dbus_objects._DBusSignal, path: str, body: Any) -> jeepney.Message:
+        emitter = jeepney.wrappers.DBusAddress(path, interface=signal.interface)
+        return _with_buffers(jeepney.new_signal(emitter, signal.name, signal.signature, body))
+
+
+class _BlockingConnection():
+    '''
+    Connection served by :class:`BlockingDBusServer`
+    '''
+    sock: socket.socket
+    outgoing_serial: Iterator[int]
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # messages queued by the listen loop thread
+        self.batch: List[jeepney.Message] = []
+
+    def receive(self) -> jeepney.Message:
+        '''
+        Receives a message without blocking, raises :class:`TimeoutError` if none is available
+        '''
+        raise NotImplementedError
+
+    def reset(self) -> bool:
+        '''
+        Handles the connection being reset, returns ``False`` if it should be dropped
+        '''
+        raise NotImplementedError
+
+    @property
+    def writing(self) -> bool:
+        '''
+        Whether there is output waiting for the socket to be writable
+        '''
+        return False
+
+    def send(self, msg: jeepney.Message) -> None:
+        self._write([msg])
+
+    def flush(self) -> None:
+        '''
+        Writes the queued messages
+        '''
+        if not self.batch:
+            return
+        batch, self.batch = self.batch, []
+        self._write(batch)
+
+    def _write(self, batch: List[jeepney.Message]) -> None:
+        '''
+        Writes messages in as few ``sendmsg`` calls as possible
+
+        :param batch: messages to write
+        '''
+        try:
+            with self.lock:
+                for buffers, fds in _message_groups(batch, self.outgoing_serial):
+                    _sendmsg_all(self.sock, buffers, fds)
+        finally:
+            for msg in batch:
+                _close_fds(msg)
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+class _BlockingBusConnection(_BlockingConnection):
+    '''
+    Connection to a bus
+    '''
+
+    def __init__(self, bus: str, name: Optional[str]) -> None:
+        '''
+        :param bus: DBus bus (hint: usually SESSION or SYSTEM) or address
+        :param name: DBus name to request, ``None`` to not request any
+        '''
+        super().__init__()
+        self.bus = bus
+        self.name = name
+        self.start()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.bus!r}, {self.name!r})'
+
+    def start(self) -> None:
+        '''
+        Start DBus connection
+        '''
+        self.conn = jeepney.io.blocking.open_dbus_connection(self.bus, enable_fds=True)
+        self.sock = self.conn.sock
+        self.outgoing_serial = self.conn.outgoing_serial
+        if self.name:
+            jeepney.io.blocking.Proxy(jeepney.message_bus, self.conn).RequestName(self.name)
+
+    def receive(self) -> jeepney.Message:
+        return self.conn.receive(timeout=0)
+
+    def reset(self) -> bool:
+        '''
+        Restarts the connection, dropping the queued messages
+        '''
+        self.batch.clear()
+        with self.lock:
+            self.conn.close()
+            self.start()
+        return True
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class _BlockingPeerConnection(_BlockingConnection):
+    '''
+    Direct connection with a peer, accepted by a listener
+
+    There is no bus daemon, so the connection replies to the bus methods
+    clients expect to be able to call (``Hello``, ``AddMatch`` and
+    ``RemoveMatch``). Peers receive all signals.
+
+    The socket is non-blocking, so that a peer which doesn't read its
+    messages can't block the server. What can't be written right away is
+    queued, and written by the listen loop once the socket is writable. The
+    peer is disconnected if the queue grows past ``max_output`` bytes.
+    '''
+    _BUS_METHODS = frozenset({'Hello', 'AddMatch', 'RemoveMatch'})
+
+    def __init__(self, sock: socket.socket, unique_name: str, max_output: int, wakeup: Callable[[], None]) -> None:
+        '''
+        :param sock: authenticated socket
+        :param unique_name: unique name given to the peer
+        :param max_output: maximum number of bytes queued for writing
+        :param wakeup: wakes up the listen loop, called when output starts being queued
+        '''
+        super().__init__()
+        self.sock = sock
+        self.sock.setblocking(False)
+        self.unique_name = unique_name
+        self.outgoing_serial = itertools.count(1)
+        self.max_output = max_output
+        self._wakeup = wakeup
+        self._parser = jeepney.low_level.Parser()
+        # data to write, and the file descriptors to send along its first byte (duplicated, we own them)
+        self._output: typing.Deque[Tuple[typing.Deque[memoryview], List[int]]] = collections.deque()
+        self._output_size = 0
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.unique_name!r})'
+
+    def receive(self) -> jeepney.Message:
+        while True:
+            msg = self._parser.get_next_message()
+            if msg is None:
                 try:
-                    return_args = method(*msg.body)
-                except Exception as e:
-                    self._logger.error(
-                        f'An exception ocurred when try to call method: {descriptor.name}',
-                        exc_info=True
-                    )
-                    return_msg = jeepney.new_error(msg, type(e).__name__, 's', tuple([str(e)]))
-                else:
-                    return_msg = jeepney.new_method_return(
-                        msg,
-                        signature_output,
-                        (return_args,) if return_args is not None else tuple()
+                    data, ancdata, _flags, _address = self.sock.recvmsg(
+                        4096, jeepney.fds.fds_buf_size(), socket.MSG_DONTWAIT,
                     )
+                except BlockingIOError:
+                    raise TimeoutError from None
+                if not data:
+                    raise ConnectionResetError('peer disconnected')
+                self._parser.add_data(data, jeepney.FileDescriptor.from_ancdata(ancdata))
+            elif not self._handle_bus_method(msg):
+                return msg
 
-            return return_msg
+    def _handle_bus_method(self, msg: jeepney.Message) -> bool:
+        '''
+        Replies to the message if it is a call to the bus, returns whether it was
+        '''
+        fields = msg.header.fields
+        if (
+            msg.header.message_type != jeepney.MessageType.method_call
+            or fields.get(jeepney.HeaderFields.destination) != 'org.freedesktop.DBus'
+            or fields.get(jeepney.HeaderFields.member) not in self._BUS_METHODS
+        ):
+            return False
+        if fields[jeepney.HeaderFields.member] == 'Hello':
+            self.send(jeepney.new_method_return(msg, 's', (self.unique_name,)))
         else:
-            self._logger.info(f'Unhandled message: {msg} / {msg.header} / {msg.header.fields}')
+            self.send(jeepney.new_method_return(msg))
+        return True
+
+    @property
+    def writing(self) -> bool:
+        return bool(self._output)
+
+    def send(self, msg: jeepney.Message) -> None:
+        try:
+            super().send(msg)
+        except OSError:
+            # the peer is gone, the listen loop will drop the connection
+            pass
+
+    def flush(self) -> None:
+        if self.batch:
+            super().flush()
+        elif self._output:
+            with self.lock:
+                self._write_output()
+
+    def _write(self, batch: List[jeepney.Message]) -> None:
+        try:
+            with self.lock:
+                was_writing = bool(self._output)
+                for buffers, fds in _message_groups(batch, self.outgoing_serial):
+                    views = collections.deque(memoryview(buffer).cast('B') for buffer in buffers)
+                    # the messages close their file descriptors once we return
+                    self._output.append((views, [os.dup(fd) for fd in fds]))
+                    self._output_size += sum(len(view) for view in views)
+                self._write_output()
+                if self._output_size > self.max_output:
+                    self._drop_output()
+                    # makes the socket readable, so that the listen loop drops the connection
+                    with contextlib.suppress(OSError):
+                        self.sock.shutdown(socket.SHUT_RDWR)
+                    raise ConnectionResetError(f'{self} is not reading its messages, disconnecting')
+                if self._output and not was_writing:
+                    self._wakeup()
+        finally:
+            for msg in batch:
+                _close_fds(msg)
+
+    def _write_output(self) -> None:
+        '''
+        Writes as much of the queued output as the socket takes without blocking
+        '''
+        while self._output:
+            views, fds = self._output[0]
+            try:
+                sent = self.sock.sendmsg(list(itertools.islice(views, _IOV_MAX)), _scm_rights(array.array('i', fds)))
+            except BlockingIOError:
+                return
+            # the file descriptors went out with the first byte
+            for fd in fds:
+                os.close(fd)
+            fds.clear()
+            self._output_size -= sent
+            _consume_views(views, sent)
+            if not views:
+                self._output.popleft()
+
+    def _drop_output(self) -> None:
+        for _views, fds in self._output:
+            for fd in fds:
+                os.close(fd)
+        self._output.clear()
+        self._output_size = 0
+
+    def reset(self) -> bool:
+        self.close()
+        return False
+
+    def close(self) -> None:
+        with self.lock:
+            self._drop_output()
+        super().close()
+
+
+class _PeerListener():
+    '''
+    Socket accepting direct connections from peers
+    '''
+
+    def __init__(self, address: str, uids: Collection[int]) -> None:
+        '''
+        :param address: DBus address to listen on
+        :param uids: user IDs allowed to connect
+        '''
+        self.address = address
+        self.uids = uids
+        self.guid = uuid.uuid4().hex
+        self._path = next(jeepney.bus.get_connectable_addresses(address))
+        self.sock = socket.socket(socket.AF_UNIX)
+        try:
+            self.sock.bind(self._path)
+            self.sock.listen()
+        except OSError:
+            self.sock.close()
+            raise
+        self.sock.setblocking(False)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.address!r})'
+
+    def accept(self) -> Optional[socket.socket]:
+        '''
+        Accepts a connection without blocking, returns ``None`` if there are no pending connections
+        '''
+        try:
+            sock, _address = self.sock.accept()
+        except BlockingIOError:
             return None
+        return sock
 
-    def _get_signal_msg(self, signal: dbus_objects._DBusSignal, path: str, body: Any) -> jeepney.Message:
-        emitter = jeepney.wrappers.DBusAddress(path, interface=signal.interface)
-        msg = jeepney.new_signal(emitter, signal.name, signal.signature, body)
-        return msg
+    def close(self) -> None:
+        self.sock.close()
+        if not self._path.startswith('\0'):
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self._path)
+
+
+def _peer_uid(sock: socket.socket) -> Optional[int]:
+    '''
+    Fetches the user ID of the process on the other end of the socket, if the platform supports it
+
+    :param sock: connected unix socket
+    '''
+    if not hasattr(socket, 'SO_PEERCRED'):  # pragma: no cover
+        return None
+    creds = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    _pid, uid, _gid = struct.unpack('3i', creds)
+    return typing.cast(int, uid)
+
+
+def _set_deadline(sock: socket.socket, deadline: Optional[float]) -> None:
+    '''
+    Sets the socket timeout to the time left until the deadline
+
+    :param sock: socket
+    :param deadline: :func:`time.monotonic` deadline, ``None`` for no deadline
+    '''
+    if deadline is None:
+        return
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError('Deadline exceeded')
+    sock.settimeout(remaining)
+
+
+def _recv_line(sock: socket.socket, max_size: int = 16384, deadline: Optional[float] = None) -> bytes:
+    '''
+    Receives a ``\\r\\n`` terminated line, without consuming any data after it
+
+    :param sock: socket to receive the line from
+    :param max_size: maximum line size
+    :param deadline: :func:`time.monotonic` time by which the whole line must have been received
+    '''
+    line = b''
+    while len(line) < max_size:
+        _set_deadline(sock, deadline)
+        data = sock.recv(max_size - len(line), socket.MSG_PEEK)
+        if not data:
+            raise ConnectionResetError('peer disconnected')
+        # the terminator may start in the data we already consumed
+        end = (line + data).find(b'\r\n', max(len(line) - 1, 0))
+        if end != -1:
+            return line + sock.recv(end + 2 - len(line))
+        line += sock.recv(len(data))
+    raise ValueError('Line too long')
+
+
+def _sasl_external_handshake(  # noqa: C901
+    sock: socket.socket,
+    uids: Collection[int],
+    guid: str,
+    timeout: Optional[float] = None,
+    max_lines: int = 16,
+) -> bool:
+    '''
+    Authenticates the peer with SASL EXTERNAL, the server side of the handshake
+
+    Returns whether the peer was authenticated, the socket is ready to
+    exchange messages if it was.
+
+    https://dbus.freedesktop.org/doc/dbus-specification.html#auth-protocol
+
+    :param sock: connected unix socket
+    :param uids: user IDs allowed to connect
+    :param guid: server GUID
+    :param timeout: seconds the whole handshake may take
+    :param max_lines: maximum number of lines the peer may send
+    '''
+    deadline = None if timeout is None else time.monotonic() + timeout
+    lines = 0
+
+    def recv_line() -> bytes:
+        nonlocal lines
+        lines += 1
+        if lines > max_lines:
+            raise ValueError('Too many handshake lines')
+        return _recv_line(sock, deadline=deadline)
+
+    uid = _peer_uid(sock)
+    _set_deadline(sock, deadline)
+    if sock.recv(1) != b'\0':
+        return False
+    authenticated = False
+    rejected = b'REJECTED EXTERNAL\r\n'
+    while True:
+        command, _, argument = recv_line()[:-2].partition(b' ')
+        if command == b'AUTH':
+            mechanism, _, identity = argument.partition(b' ')
+            if mechanism != b'EXTERNAL':
+                sock.sendall(rejected)
+                continue
+            if not identity:
+                # no initial response, ask for it (it can be empty)
+                sock.sendall(b'DATA\r\n')
+                command, _, identity = recv_line()[:-2].partition(b' ')
+                if command != b'DATA':
+                    sock.sendall(rejected)
+                    continue
+            # an empty identity means the one from the credentials
+            authenticated = (
+                uid is not None
+                and uid in uids
+                and (not identity or bytes.fromhex(identity.decode('ascii')) == str(uid).encode())
+            )
+            sock.sendall(f'OK {guid}\r\n'.encode() if authenticated else rejected)
+        elif command == b'BEGIN' and authenticated:
+            return True
+        elif command in (b'CANCEL', b'ERROR'):
+            authenticated = False
+            sock.sendall(rejected)
+        elif command == b'NEGOTIATE_UNIX_FD' and authenticated:
+            sock.sendall(b'AGREE_UNIX_FD\r\n')
+        else:
+            sock.sendall(b'ERROR\r\n')
 
 
 class BlockingDBusServer(_JeepneyServerBase):
@@ -99,19 +933,52 @@ class BlockingDBusServer(_JeepneyServerBase):
     This class represents a DBus server. It should be instanciated.
     '''
 
+    # seconds peers have to authenticate
+    peer_auth_timeout = 5.0
+    # peers authenticating at the same time, the others are rejected
+    peer_max_handshakes = 16
+    # bytes queued for a peer that isn't reading before it is disconnected
+    peer_max_output = 64 * 2 ** 20
+
+    # bytes written to the wakeup pipe
+    _WAKEUP_STOP = b'\0'
+    _WAKEUP_CONNECTIONS = b'\1'
+    _WAKEUP_CALLBACKS = b'\2'
+
     def __init__(self, bus: str, name: str) -> None:
         '''
         Blocking DBus server built on top of Jeepney
 
+        The objects can be served on more buses with :meth:`add_bus`.
+
         :param bus: DBus bus (hint: usually SESSION or SYSTEM)
         :param name: DBus name
         '''
         super().__init__(bus, name)
         self._logger = logging.getLogger(self.__class__.__name__)
+        # served connections, replaced instead of modified so that it can be
+        # iterated from any thread
+        self._connections: Tuple[_BlockingConnection, ...] = ()
+        self._listeners: Tuple[_PeerListener, ...] = ()
+        self._connections_lock = threading.Lock()
+        self._peer_serial = itertools.count(1)
+        # peers being authenticated
+        self._handshakes = 0
+        # path -> object lock, for objects that need their calls to be serialized
+        self._serial_locks: Dict[str, threading.Lock] = {}
+        # whether the listen loop thread queues the messages it sends
+        self._batching = False
+        self._listen_thread: Optional[int] = None
+        # callbacks to run in the listen loop thread, see _call_soon
+        self._callbacks: typing.Deque[Callable[[], None]] = collections.deque()
+        self._callbacks_lock = threading.Lock()
+        # self-pipe used to wake up the listen loop
+        self._wakeup_read, self._wakeup_write = os.pipe()
+        os.set_blocking(self._wakeup_read, False)
+        os.set_blocking(self._wakeup_write, False)
 
         self.emit_signal_callback = self.emit_signal
 
-        self._dbus = jeepney.DBus()
         self._conn_start()
 
     def __del__(self) -> None:
@@ -121,50 +988,511 @@ class BlockingDBusServer(_JeepneyServerBase):
         '''
         Start DBus connection
         '''
-        self._conn = jeepney.io.blocking.open_dbus_connection(self._bus)
-        jeepney.io.blocking.Proxy(self._dbus, self._conn).RequestName(self._name)
+        self._add_connection(_BlockingBusConnection(self._bus, self._name))
+
+    def add_bus(self, bus: str, name: Optional[str] = None) -> None:
+        '''
+        Serves the objects on another bus
+
+        The same objects are served on all buses, method calls are replied
+        to on the bus they were received from and signals are emitted on all
+        of them. Can be called while listening.
+
+        :param bus: DBus bus (hint: usually SESSION or SYSTEM) or address
+        :param name: DBus name to request on the bus, defaults to the server name
+        '''
+        self._add_connection(_BlockingBusConnection(bus, name or self._name))
+
+    def add_listener(self, address: str, uids: Optional[Iterable[int]] = None) -> None:
+        '''
+        Accepts direct connections from peers on a socket
+
+        Peers connected directly don't go through the bus daemon, which
+        halves the number of socket hops per call. They are served the same
+        objects, and receive all signals. Can be called while listening.
+
+        Peers are authenticated with SASL EXTERNAL, using the credentials
+        of the socket, which is only supported on Linux.
+
+        :param address: DBus address to listen on (``unix:path=...`` or ``unix:abstract=...``)
+        :param uids: user IDs allowed to connect, defaults to the user running the server
+        '''
+        listener = _PeerListener(address, frozenset(uids) if uids is not None else frozenset({os.getuid()}))
+        with self._connections_lock:
+            self._listeners += (listener,)
+        self._wakeup(self._WAKEUP_CONNECTIONS)
+
+    def _add_connection(self, connection: _BlockingConnection) -> None:
+        with self._connections_lock:
+            self._connections += (connection,)
+        self._wakeup(self._WAKEUP_CONNECTIONS)
+
+    def _remove_connection(self, connection: _BlockingConnection) -> None:
+        with self._connections_lock:
+            self._connections = tuple(
+                other for other in self._connections if other is not connection
+            )
+
+    def _accept(self, listener: _PeerListener) -> None:
+        '''
+        Accepts the pending connections of the listener
+
+        The peers are authenticated in separate threads, so that they can't
+        block the listen loop. The peers whose user is not allowed are
+        rejected right away, and so are the ones over ``peer_max_handshakes``.
+        '''
+        while True:
+            sock = listener.accept()
+            if sock is None:
+                return
+            uid = _peer_uid(sock)
+            if uid is None or uid not in listener.uids:
+                self._logger.debug(f'peer rejected, user {uid} is not allowed')
+                sock.close()
+                continue
+            with self._connections_lock:
+                accepted = self._handshakes < self.peer_max_handshakes
+                if accepted:
+                    self._handshakes += 1
+            if not accepted:
+                self._logger.debug('peer rejected, too many peers authenticating')
+                sock.close()
+                continue
+            threading.Thread(
+                target=self._authenticate_peer,
+                args=(listener, sock),
+                name=f'{self.__class__.__name__}-auth',
+                daemon=True,
+            ).start()
+
+    def _authenticate_peer(self, listener: _PeerListener, sock: socket.socket) -> None:
+        try:
+            authenticated = _sasl_external_handshake(sock, listener.uids, listener.guid, self.peer_auth_timeout)
+        except (OSError, ValueError) as e:
+            self._logger.debug(f'peer authentication failed: {e}')
+            authenticated = False
+        finally:
+            with self._connections_lock:
+                self._handshakes -= 1
+        if not authenticated:
+            sock.close()
+            return
+        connection = _BlockingPeerConnection(
+            sock,
+            f':1.{next(self._peer_serial)}',
+            self.peer_max_output,
+            functools.partial(self._wakeup, self._WAKEUP_CONNECTIONS),
+        )
+        self._logger.debug(f'peer connected: {connection}')
+        self._add_connection(connection)
+
+    def _send(self, connection: _BlockingConnection, msg: jeepney.Message) -> None:
+        '''
+        Send message
+
+        Can be called from any thread. Messages sent from the listen loop
+        thread are queued, and written all at once at the end of the loop
+        iteration.
 
-    def _handle_msg(self, msg: jeepney.Message) -> None:
+        :param connection: connection to send the message on
+        :param msg: message to send
+        '''
+        if self._batching and threading.get_ident() == self._listen_thread:
+            connection.batch.append(msg)
+        else:
+            connection.send(msg)
+
+    def _handle_msg(self, connection: _BlockingConnection, msg: jeepney.Message) -> None:
         '''
         Handle message
 
+        :param connection: connection the message was received from
         :param msg: message to handle
         '''
-        return_msg = self._jeepney_handle_msg(msg)
+        call = self._jeepney_get_call(msg)
+        if not isinstance(call, _JeepneyMethodCall):
+            return_msg = call
+        else:
+            future = self._jeepney_submit(call)
+            if future is not None:
+                future.add_done_callback(
+                    lambda future: self._send(connection, self._jeepney_call_result(call, future))
+                )
+                return
+            return_msg = self._jeepney_call(call)
         if return_msg:
-            self._conn.send(return_msg)
+            self._send(connection, return_msg)
+
+    def _handle_msg_worker(self, connection: _BlockingConnection, msg: jeepney.Message) -> None:
+        '''
+        Handle message in a worker thread
+
+        :param connection: connection the message was received from
+        :param msg: message to handle
+        '''
+        lock = self._serial_locks.get(msg.header.fields.get(jeepney.HeaderFields.path))
+        if lock is None:
+            self._handle_msg(connection, msg)
+        else:
+            with lock:
+                self._handle_msg(connection, msg)
+
+    def _handle_serial_worker(
+        self,
+        queues: Dict[str, typing.Deque[Tuple[_BlockingConnection, jeepney.Message]]],
+        queues_lock: threading.Lock,
+        path: str,
+        connection: _BlockingConnection,
+        msg: jeepney.Message,
+    ) -> None:
+        '''
+        Handle message in a worker thread, and then the ones queued for the same path
+
+        :param queues: path -> messages waiting for the one being handled
+        :param queues_lock: lock protecting ``queues``
+        :param path: path of the ``serialize_calls`` object
+        :param connection: connection the message was received from
+        :param msg: message to handle
+        '''
+        while True:
+            try:
+                self._handle_msg_worker(connection, msg)
+            except Exception:
+                self._logger.exception('An exception ocurred when handling message')
+            with queues_lock:
+                queue = queues[path]
+                if not queue:
+                    del queues[path]
+                    return
+                connection, msg = queue.popleft()
+
+    def register_object(self, path: str, obj: dbus_objects.DBusObject) -> None:
+        super().register_object(path, obj)
+        if obj.serialize_calls:
+            # shared with the object, which reads its changed properties under it
+            self._serial_locks[path] = obj._serial_lock
+
+    def _remove_path(self, path: str) -> None:
+        super()._remove_path(path)
+        self._serial_locks.pop(path, None)
+
+    def _detach(self) -> None:
+        super()._detach()
+        # the sockets are shared with the server process, so they are left open
+        self._connections = ()
+        self._listeners = ()
 
     def emit_signal(self, signal: dbus_objects._DBusSignal, path: str, body: Any) -> None:
         self._logger.debug(f'emitting signal: {signal.name} {body}')
-        self._conn.send_message(self._get_signal_msg(signal, path, body))
+        msg = self._get_signal_msg(signal, path, body)
+        for connection in self._connections:
+            self._send(connection, msg)
 
     def close(self) -> None:
         '''
-        Close the DBus connection
+        Close the DBus connections
+        '''
+        for connection in self._connections:
+            connection.close()
+        for listener in self._listeners:
+            listener.close()
+        if self._wakeup_read != -1:
+            os.close(self._wakeup_read)
+            os.close(self._wakeup_write)
+            self._wakeup_read = self._wakeup_write = -1
+
+    def stop(self) -> None:
+        '''
+        Stop listening
+
+        Makes the current (or next) :meth:`listen` call return as soon as
+        possible. Can be called from any thread, or from a signal handler.
+        '''
+        self._wakeup(self._WAKEUP_STOP)
+
+    def _call_soon(self, callback: Callable[[], None]) -> None:
+        '''
+        Runs the callback in the listen loop thread, or right away if not listening
+        '''
+        with self._callbacks_lock:
+            listening = self._listen_thread is not None
+            if listening:
+                self._callbacks.append(callback)
+        if listening:
+            self._wakeup(self._WAKEUP_CALLBACKS)
+        else:
+            callback()
+
+    def _run_callbacks(self) -> None:
+        '''
+        Runs the callbacks queued by :meth:`_call_soon`
         '''
-        self._conn.close()
+        while self._callbacks:
+            callback = self._callbacks.popleft()
+            try:
+                callback()
+            except Exception:
+                self._logger.exception('An exception ocurred in a callback')
+
+    def _wakeup(self, reason: bytes) -> None:
+        try:
+            os.write(self._wakeup_write, reason)
+        except BlockingIOError:  # pragma: no cover
+            pass  # the pipe is full, so there is already a wakeup pending
 
-    def listen(self, delay: float = 0.1, event: Optional[threading.Event] = None) -> None:
+    def listen(
+        self,
+        delay: float = 0.1,
+        event: Optional[threading.Event] = None,
+        workers: Optional[int] = None,
+        max_batch: int = 64,
+        processes: Optional[int] = None,
+    ) -> None:
         '''
         Start listening and handling messages
 
-        :param delay: loop delay
-        :param event: event which can be activated to stop listening
+        The server waits on the connection sockets, so it doesn't consume any
+        CPU while idle. Use :meth:`stop` to stop listening.
+
+        All the messages already available in a connection are handled in
+        one go (up to ``max_batch``), and the resulting replies and signals
+        are written all at once.
+
+        By default, messages are handled one at a time. When ``workers`` is
+        set, messages are handled in a thread pool and replies are sent as
+        soon as each of them finishes. Calls to objects created with
+        ``serialize_calls`` are still performed one at a time, the ones
+        waiting for another call to the same object are queued without
+        taking a worker. Once all workers are busy, we stop receiving
+        messages until one finishes.
+
+        When ``processes`` is set, the methods marked as ``cpu_bound`` are
+        run in a pool of worker processes, and replies are sent as soon as
+        each of them finishes, so they don't block the other calls.
+
+        :param delay: how often to check ``event``
+        :param event: event which can be cleared to stop listening (prefer :meth:`stop`)
+        :param workers: number of worker threads
+        :param max_batch: maximum number of messages handled per connection per loop iteration
+        :param processes: number of worker processes for the ``cpu_bound`` methods
         '''
         self._log_topology()
-        try:
-            while event is None or event.is_set():
+        with self._cpu_bound_processes(processes):
+            if not workers:
+                self._batching = True
                 try:
-                    msg = self._conn.receive(timeout=delay)
-                except TimeoutError:
-                    pass
-                except ConnectionResetError:
-                    self._logger.debug('connection reset abruptly, restarting...')
-                    self._conn_start()
-                else:
-                    self._handle_msg(msg)
-        except KeyboardInterrupt:
-            self._logger.info('exiting...')
+                    self._listen(delay, event, self._handle_msg, max_batch)
+                finally:
+                    self._batching = False
+                return
+
+            import concurrent.futures
+
+            slots = threading.BoundedSemaphore(workers)
+
+            def release(future: concurrent.futures.Future[None]) -> None:
+                slots.release()
+                if future.exception():
+                    self._logger.error('An exception ocurred when handling message', exc_info=future.exception())
+
+            # path -> calls waiting for the one running, for the serialize_calls objects
+            serial_queues: Dict[str, typing.Deque[Tuple[_BlockingConnection, jeepney.Message]]] = {}
+            serial_queues_lock = threading.Lock()
+
+            with concurrent.futures.ThreadPoolExecutor(
+                max_workers=workers,
+                thread_name_prefix=self.__class__.__name__,
+            ) as executor:
+                def submit(connection: _BlockingConnection, msg: jeepney.Message) -> None:
+                    path = msg.header.fields.get(jeepney.HeaderFields.path)
+                    if path not in self._serial_locks:
+                        slots.acquire()
+                        executor.submit(self._handle_msg_worker, connection, msg).add_done_callback(release)
+                        return
+                    # queued without holding a worker, so that calls to a slow
+                    # object don't take all of them
+                    with serial_queues_lock:
+                        queue = serial_queues.get(path)
+                        if queue is not None:
+                            queue.append((connection, msg))
+                            return
+                        serial_queues[path] = collections.deque()
+                    slots.acquire()
+                    executor.submit(
+                        self._handle_serial_worker, serial_queues, serial_queues_lock, path, connection, msg,
+                    ).add_done_callback(release)
+
+                self._listen(delay, event, submit, max_batch)
+
+    def _receive_ready(
+        self,
+        connection: _BlockingConnection,
+        handle_msg: Callable[[_BlockingConnection, jeepney.Message], None],
+        max_batch: int,
+    ) -> bool:
+        '''
+        Handles the messages which can be received without blocking
+
+        Returns ``True`` if it stopped because it reached ``max_batch``.
+
+        :param connection: connection to receive the messages from
+        :param handle_msg: message handler
+        :param max_batch: maximum number of messages to handle
+        '''
+        for _ in range(max_batch):
+            try:
+                msg = connection.receive()
+            except TimeoutError:
+                return False
+            handle_msg(connection, msg)
+        return True
+
+    def _listen(
+        self,
+        delay: float,
+        event: Optional[threading.Event],
+        handle_msg: Callable[[_BlockingConnection, jeepney.Message], None],
+        max_batch: int,
+    ) -> None:
+        # the event can't wake us up, so we need to poll it
+        timeout = None if event is None else delay
+        self._listen_thread = threading.get_ident()
+        with selectors.DefaultSelector() as selector:
+            selector.register(self._wakeup_read, selectors.EVENT_READ)
+            # jeepney might already have buffered messages, so we need to
+            # empty the connections before waiting on them
+            pending = self._update_selector(selector)
+            try:
+                while event is None or event.is_set():
+                    self._receive_pending(selector, pending, handle_msg, max_batch)
+                    self._run_callbacks()
+                    self._flush(selector, pending)
+                    if self._wait(selector, pending, 0 if pending else timeout):
+                        break
+            except KeyboardInterrupt:
+                self._logger.info('exiting...')
+            finally:
+                with self._callbacks_lock:
+                    self._listen_thread = None
+        # the ones queued after the last iteration
+        self._run_callbacks()
+
+    def _receive_pending(
+        self,
+        selector: selectors.BaseSelector,
+        pending: Set[_BlockingConnection],
+        handle_msg: Callable[[_BlockingConnection, jeepney.Message], None],
+        max_batch: int,
+    ) -> None:
+        '''
+        Handles the messages available in the pending connections
+
+        The connections which were emptied are removed from ``pending``.
+        '''
+        for connection in list(pending):
+            try:
+                if not self._receive_ready(connection, handle_msg, max_batch):
+                    pending.discard(connection)
+            except ConnectionError:
+                self._reset_connection(selector, pending, connection)
+
+    def _flush(self, selector: selectors.BaseSelector, pending: Set[_BlockingConnection]) -> None:
+        '''
+        Writes the messages queued in all connections
+
+        The connections with output left are watched for being writable.
+        '''
+        for connection in self._connections:
+            try:
+                connection.flush()
+            except ConnectionError:
+                self._reset_connection(selector, pending, connection)
+                continue
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if connection.writing else 0)
+            try:
+                key = selector.get_key(connection.sock)
+            except KeyError:  # not registered yet
+                continue
+            if key.events != events:
+                selector.modify(connection.sock, events, connection)
+
+    def _wait(
+        self,
+        selector: selectors.BaseSelector,
+        pending: Set[_BlockingConnection],
+        timeout: Optional[float],
+    ) -> bool:
+        '''
+        Waits for the connections to be readable, and adds them to ``pending``
+
+        Returns ``True`` if we were asked to stop.
+        '''
+        stop = False
+        for key, events in selector.select(timeout):
+            if isinstance(key.data, _BlockingConnection):
+                # the writable ones are written to in the next flush
+                if events & selectors.EVENT_READ:
+                    pending.add(key.data)
+            elif isinstance(key.data, _PeerListener):
+                self._accept(key.data)
+            elif self._consume_wakeup():
+                stop = True
+            else:
+                pending.update(self._update_selector(selector))
+        return stop
+
+    def _update_selector(self, selector: selectors.BaseSelector) -> Set[_BlockingConnection]:
+        '''
+        Registers the new connections and listeners in the selector, and unregisters the removed ones
+
+        Returns the new connections.
+
+        :param selector: listen loop selector
+        '''
+        registered = {key.data for key in selector.get_map().values() if key.data is not None}
+        current: Set[Union[_BlockingConnection, _PeerListener]] = {*self._connections, *self._listeners}
+        for endpoint in registered - current:
+            selector.unregister(endpoint.sock)
+        new = current - registered
+        for endpoint in new:
+            selector.register(endpoint.sock, selectors.EVENT_READ, endpoint)
+        return {endpoint for endpoint in new if isinstance(endpoint, _BlockingConnection)}
+
+    def _reset_connection(
+        self,
+        selector: selectors.BaseSelector,
+        pending: Set[_BlockingConnection],
+        connection: _BlockingConnection,
+    ) -> None:
+        '''
+        Restarts the connection, or drops it if it can't be restarted
+        '''
+        selector.unregister(connection.sock)
+        if connection.reset():
+            self._logger.debug(f'connection {connection} reset abruptly, restarted')
+            selector.register(connection.sock, selectors.EVENT_READ, connection)
+            pending.add(connection)
+        else:
+            self._logger.debug(f'connection {connection} closed')
+            self._remove_connection(connection)
+            pending.discard(connection)
+
+    def _consume_wakeup(self) -> bool:
+        '''
+        Empties the wakeup pipe
+
+        Returns ``True`` if we were asked to stop.
+        '''
+        stop = False
+        try:
+            while True:
+                data = os.read(self._wakeup_read, 512)
+                if not data:  # pragma: no cover
+                    break
+                stop = stop or self._WAKEUP_STOP in data
+        except BlockingIOError:
+            pass
+        return stop
 
 
 class TrioDBusServer(_JeepneyServerBase):
@@ -172,22 +1500,33 @@ class TrioDBusServer(_JeepneyServerBase):
     This class represents a DBus server. It should be instanciated.
     '''
 
-    def __init__(self, bus: str, name: str) -> None:
+    def __init__(self, bus: str, name: str, enable_fds: bool = False) -> None:
         '''
-        Blocking DBus server built on top of Jeepney
+        Trio DBus server built on top of Jeepney
+
+        Methods defined as coroutine functions are awaited.
+
+        File descriptor passing is optional, as Jeepney then receives one
+        message at a time, which makes small calls slower.
 
         :param bus: DBus bus (hint: usually SESSION or SYSTEM)
         :param name: DBus name
+        :param enable_fds: support sending and receiving file descriptors
         '''
         super().__init__(bus, name)
         self._logger = logging.getLogger(self.__class__.__name__)
+        self._unix_fds = enable_fds
+        # queue of messages to be written, while listening
+        self._outgoing: Optional[trio.MemorySendChannel[jeepney.Message]] = None
+        # token of the trio run we are listening in
+        self._token: Optional[trio.lowlevel.TrioToken] = None
         # TODO: support signals
         # self.emit_signal_callback = self.emit_signal
 
     # We can't have an async __init__ method, so we use this as an alternative.
     @classmethod
-    async def new(cls, bus: str, name: str) -> TrioDBusServer:
-        inst = cls(bus, name)
+    async def new(cls, bus: str, name: str, enable_fds: bool = False) -> TrioDBusServer:
+        inst = cls(bus, name, enable_fds)
         await inst._conn_start()
         return inst
 
@@ -197,24 +1536,115 @@ class TrioDBusServer(_JeepneyServerBase):
         '''
         import jeepney.io.trio
 
-        self._conn = await jeepney.io.trio.open_dbus_connection(self._bus)
+        self._conn = await jeepney.io.trio.open_dbus_connection(self._bus, enable_fds=self._unix_fds)
         async with self._conn.router() as router:
             bus_proxy = jeepney.io.trio.Proxy(jeepney.message_bus, router)
             await bus_proxy.RequestName(self._name)
 
+    async def _send(self, msg: jeepney.Message) -> None:
+        '''
+        Send message
+
+        While listening, messages are queued to the writer task, which
+        writes all the queued messages at once.
+
+        :param msg: message to send
+        '''
+        if self._outgoing is None:
+            await self._write([msg])
+        else:
+            await self._outgoing.send(msg)
+
+    async def _writer(self, channel: trio.MemoryReceiveChannel[jeepney.Message], max_batch: int) -> None:
+        '''
+        Writes the queued messages
+
+        :param channel: queued messages
+        :param max_batch: maximum number of messages per write
+        '''
+        import trio
+
+        async for msg in channel:
+            batch = [msg]
+            while len(batch) < max_batch:
+                try:
+                    batch.append(channel.receive_nowait())
+                except trio.WouldBlock:
+                    break
+            await self._write(batch)
+
+    async def _write(self, batch: List[jeepney.Message]) -> None:
+        '''
+        Writes messages in as few ``sendmsg`` calls as possible
+
+        :param batch: messages to write
+        '''
+        import trio
+
+        conn = self._conn
+        try:
+            async with conn.send_lock:
+                # a partial write would corrupt the stream
+                with trio.CancelScope(shield=True):
+                    for buffers, fds in _message_groups(batch, conn.outgoing_serial):
+                        views = collections.deque(memoryview(buffer) for buffer in buffers)
+                        ancdata = _scm_rights(fds)
+                        while views:
+                            sent = await conn.socket.sendmsg(list(itertools.islice(views, _IOV_MAX)), ancdata)
+                            _consume_views(views, sent)
+                            ancdata = []
+        finally:
+            for msg in batch:
+                _close_fds(msg)
+
+    def _call_soon(self, callback: Callable[[], None]) -> None:
+        '''
+        Runs the callback in the trio run we are listening in, or right away if not listening
+        '''
+        import trio
+
+        token = self._token
+        if token is None:
+            callback()
+            return
+        try:
+            token.run_sync_soon(callback)
+        except trio.RunFinishedError:
+            callback()
+
+    async def _wait_future(self, future: concurrent.futures.Future[Any]) -> None:
+        import trio
+
+        token = trio.lowlevel.current_trio_token()
+        done = trio.Event()
+        future.add_done_callback(lambda _future: token.run_sync_soon(done.set))
+        await done.wait()
+
     async def _handle_msg(self, msg: jeepney.Message) -> None:
         '''
         Handle message
 
         :param msg: message to handle
         '''
-        return_msg = self._jeepney_handle_msg(msg)
+        return_msg = await self._jeepney_handle_msg_async(msg)
         if return_msg:
-            await self._conn.send(return_msg)
+            await self._send(return_msg)
+
+    async def _handle_msg_limited(self, msg: jeepney.Message, limiter: trio.CapacityLimiter) -> None:
+        '''
+        Handle message and release the limiter slot acquired for it
+
+        :param msg: message to handle
+        :param limiter: limiter the message slot was acquired from
+        '''
+        try:
+            await self._handle_msg(msg)
+        finally:
+            limiter.release_on_behalf_of(msg)
 
     async def emit_signal(self, signal: dbus_objects._DBusSignal, path: str, body: Any) -> None:
         self._logger.debug(f'emitting signal: {signal.name} {body}')
-        await self._conn.send_message(self._get_signal_msg(signal, path, body))
+        await self._send(self._get_signal_msg(signal, path, body))
 
     async def close(self) -> None:
         '''
@@ -222,21 +1652,240 @@ class TrioDBusServer(_JeepneyServerBase):
         '''
         await self._conn.aclose()
 
-    async def listen(self) -> None:
+    async def _receive(self, max_batch: int) -> List[jeepney.Message]:
+        '''
+        Receives the next message, plus the ones jeepney already has buffered
+
+        :param max_batch: maximum number of messages to return
+        '''
+        batch = [await self._conn.receive()]
+        while len(batch) < max_batch:
+            msg = self._conn.parser.get_next_message()
+            if msg is None:
+                break
+            batch.append(msg)
+        return batch
+
+    async def listen(
+        self,
+        max_concurrent_calls: Optional[int] = None,
+        max_batch: int = 64,
+        processes: Optional[int] = None,
+    ) -> None:
         '''
         Start listening and handling messages
 
-        :param delay: loop delay
+        All the messages already available in the connection are handled in
+        one go (up to ``max_batch``). Replies and signals are queued and
+        written by a separate task, which writes all the queued messages at
+        once.
+
+        By default, messages are handled one at a time. When
+        ``max_concurrent_calls`` is set, each message is handled in its own
+        task, and replies are sent as soon as each of them finishes. Once
+        the limit is reached, we stop receiving messages until a task finishes.
+
+        When ``processes`` is set, the methods marked as ``cpu_bound`` are
+        run in a pool of worker processes. Use it with
+        ``max_concurrent_calls``, so that they run in parallel.
+
+        :param max_concurrent_calls: maximum number of messages being handled at the same time
+        :param max_batch: maximum number of messages handled, or written, at once
+        :param processes: number of worker processes for the ``cpu_bound`` methods
         '''
+        import trio
+
         self._log_topology()
+        limiter = trio.CapacityLimiter(max_concurrent_calls) if max_concurrent_calls else None
+        send_channel, receive_channel = trio.open_memory_channel(max_batch)
+        with self._cpu_bound_processes(processes):
+            try:
+                async with trio.open_nursery() as nursery:
+                    nursery.start_soon(self._writer, receive_channel, max_batch)
+                    self._outgoing = send_channel
+                    self._token = trio.lowlevel.current_trio_token()
+                    while True:
+                        try:
+                            batch = await self._receive(max_batch)
+                        except ConnectionResetError:
+                            self._logger.debug('connection reset abruptly, restarting...')
+                            await self._conn_start()
+                            continue
+                        for msg in batch:
+                            if limiter is None:
+                                await self._handle_msg(msg)
+                            else:
+                                await limiter.acquire_on_behalf_of(msg)
+                                nursery.start_soon(self._handle_msg_limited, msg, limiter)
+            except KeyboardInterrupt:
+                self._logger.info('exiting...')
+            finally:
+                self._outgoing = None
+                self._token = None
+
+
+class AsyncioDBusServer(_JeepneyServerBase):
+    '''
+    This class represents a DBus server. It should be instanciated.
+    '''
+
+    # Jeepney's asyncio integration does not support file descriptors
+    _unix_fds = False
+
+    def __init__(self, bus: str, name: str) -> None:
+        '''
+        Asyncio DBus server built on top of Jeepney
+
+        Methods defined as coroutine functions are awaited.
+
+        :param bus: DBus bus (hint: usually SESSION or SYSTEM)
+        :param name: DBus name
+        '''
+        super().__init__(bus, name)
+        self._logger = logging.getLogger(self.__class__.__name__)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._signal_tasks: Set[asyncio.Future[None]] = set()
+
+        self.emit_signal_callback = self.emit_signal
+
+    # We can't have an async __init__ method, so we use this as an alternative.
+    @classmethod
+    async def new(cls, bus: str, name: str) -> AsyncioDBusServer:
+        inst = cls(bus, name)
+        await inst._conn_start()
+        return inst
+
+    async def _conn_start(self) -> None:
+        '''
+        Start DBus connection
+        '''
+        import asyncio
+
+        import jeepney.io.asyncio
+
+        self._loop = asyncio.get_running_loop()
+        self._conn = await jeepney.io.asyncio.open_dbus_connection(self._bus)
+        async with jeepney.io.asyncio.DBusRouter(self._conn) as router:
+            bus_proxy = jeepney.io.asyncio.Proxy(jeepney.message_bus, router)
+            await bus_proxy.RequestName(self._name)
+
+    async def _conn_restart(self) -> None:
+        '''
+        Restart DBus connection
+        '''
         try:
-            while True:
-                try:
-                    msg = await self._conn.receive()
-                except ConnectionResetError:
-                    self._logger.debug('connection reset abruptly, restarting...')
-                    await self._conn_start()
-                else:
-                    await self._handle_msg(msg)
-        except KeyboardInterrupt:
-            self._logger.info('exiting...')
+            await self._conn.close()
+        except OSError:  # pragma: no cover
+            pass
+        await self._conn_start()
+
+    async def _handle_msg(self, msg: jeepney.Message) -> None:
+        '''
+        Handle message
+
+        :param msg: message to handle
+        '''
+        return_msg = await self._jeepney_handle_msg_async(msg)
+        if return_msg:
+            await self._conn.send(return_msg)
+
+    async def _handle_msg_limited(self, msg: jeepney.Message, semaphore: asyncio.Semaphore) -> None:
+        '''
+        Handle message and release the semaphore slot acquired for it
+
+        :param msg: message to handle
+        :param semaphore: semaphore the message slot was acquired from
+        '''
+        try:
+            await self._handle_msg(msg)
+        finally:
+            semaphore.release()
+
+    def emit_signal(self, signal: dbus_objects._DBusSignal, path: str, body: Any) -> None:
+        '''
+        Schedules the signal to be sent
+
+        Can be called from any thread.
+        '''
+        import asyncio
+
+        self._logger.debug(f'emitting signal: {signal.name} {body}')
+        if self._loop is None or self._loop.is_closed():
+            raise RuntimeError('The server is not connected')
+        msg = self._get_signal_msg(signal, path, body)
+        try:
+            in_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:  # no running event loop in this thread
+            in_loop = False
+        if in_loop:
+            task = self._loop.create_task(self._conn.send(msg))
+            self._signal_tasks.add(task)
+            task.add_done_callback(self._signal_tasks.discard)
+        else:
+            asyncio.run_coroutine_threadsafe(self._conn.send(msg), self._loop)
+
+    def _call_soon(self, callback: Callable[[], None]) -> None:
+        '''
+        Runs the callback in the event loop, or right away if it is closed
+        '''
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            callback()
+            return
+        loop.call_soon_threadsafe(callback)
+
+    async def close(self) -> None:
+        '''
+        Close the DBus connection
+        '''
+        await self._conn.close()
+        self._loop = None
+
+    async def _wait_future(self, future: concurrent.futures.Future[Any]) -> None:
+        import asyncio
+
+        await asyncio.wrap_future(future)
+
+    async def listen(self, max_concurrent_calls: Optional[int] = None, processes: Optional[int] = None) -> None:
+        '''
+        Start listening and handling messages
+
+        By default, messages are handled one at a time. When
+        ``max_concurrent_calls`` is set, each message is handled in its own
+        task, and replies are sent as soon as each of them finishes. Once
+        the limit is reached, we stop receiving messages until a task finishes.
+
+        When ``processes`` is set, the methods marked as ``cpu_bound`` are
+        run in a pool of worker processes. Use it with
+        ``max_concurrent_calls``, so that they run in parallel.
+
+        :param max_concurrent_calls: maximum number of messages being handled at the same time
+        :param processes: number of worker processes for the ``cpu_bound`` methods
+        '''
+        import asyncio
+
+        self._log_topology()
+        semaphore = asyncio.Semaphore(max_concurrent_calls) if max_concurrent_calls else None
+        tasks: Set[asyncio.Future[None]] = set()
+        with self._cpu_bound_processes(processes):
+            try:
+                while True:
+                    try:
+                        msg = await self._conn.receive()
+                    except (ConnectionResetError, EOFError):
+                        self._logger.debug('connection reset abruptly, restarting...')
+                        await self._conn_restart()
+                        continue
+
+                    if semaphore is None:
+                        await self._handle_msg(msg)
+                    else:
+                        await semaphore.acquire()
+                        task = asyncio.ensure_future(self._handle_msg_limited(msg, semaphore))
+                        tasks.add(task)
+                        task.add_done_callback(tasks.discard)
+            except KeyboardInterrupt:
+                self._logger.info('exiting...')
+            finally:
+                for pending in tasks:
+                    pending.cancel()
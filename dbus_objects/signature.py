@@ -2,11 +2,13 @@
 
 from __future__ import annotations
 
-import inspect
+import array
+import functools
 import sys
+import types as _types  # to not conflict with our types module
 import typing
 
-from typing import Any, Callable, Iterable, Iterator, List, Optional, Sequence, Type
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Type
 
 import dbus_objects
 import dbus_objects.types
@@ -18,20 +20,88 @@ else:
     _typing = typing
 
 
+# code object flags, see the inspect module
+_CO_VARARGS = 0x04
+_CO_VARKEYWORDS = 0x08
+_CO_COROUTINE = 0x80
+
+# attributes that change what inspect.signature returns for a function
+_SIGNATURE_OVERRIDES = ('__wrapped__', '__signature__', '_partialmethod', '__partialmethod__', '_is_coroutine_marker')
+
+# missing annotation marker
+_EMPTY: Any = object()
+
+
+def _is_plain_function(func: Callable[..., Any]) -> bool:
+    return isinstance(func, _types.FunctionType) and not any(
+        hasattr(func, attr) for attr in _SIGNATURE_OVERRIDES
+    )
+
+
+def _function_annotations(func: Callable[..., Any]) -> Tuple[List[Tuple[str, Any]], Any]:
+    '''
+    Fetches the parameter and return annotations of a function
+
+    Plain functions are read directly from their code object, we only fall
+    back to :mod:`inspect` (which is slow to import) for other callables.
+    Missing annotations are ``_EMPTY``.
+
+    :param func: function to inspect
+    '''
+    if not _is_plain_function(func):
+        import inspect
+
+        sig = inspect.signature(func)
+        return [
+            (name, _EMPTY if param.annotation is param.empty else param.annotation)
+            for name, param in sig.parameters.items()
+        ], _EMPTY if sig.return_annotation is sig.empty else sig.return_annotation
+
+    code = func.__code__
+    annotations = func.__annotations__
+    # same order as inspect: positional, *args, keyword-only, **kwargs
+    positional = code.co_argcount
+    keyword_only = code.co_kwonlyargcount
+    names = list(code.co_varnames[:positional])
+    index = positional + keyword_only
+    if code.co_flags & _CO_VARARGS:
+        names.append(code.co_varnames[index])
+        index += 1
+    names += code.co_varnames[positional:positional + keyword_only]
+    if code.co_flags & _CO_VARKEYWORDS:
+        names.append(code.co_varnames[index])
+    return [(name, annotations.get(name, _EMPTY)) for name in names], annotations.get('return', _EMPTY)
+
+
+def _is_coroutine_function(func: Callable[..., Any]) -> bool:
+    '''
+    Same as :func:`inspect.iscoroutinefunction`, without importing :mod:`inspect` for plain functions
+
+    :param func: function to check
+    '''
+    if not _is_plain_function(func):
+        import inspect
+
+        return inspect.iscoroutinefunction(func)
+    return bool(func.__code__.co_flags & _CO_COROUTINE)
+
+
 class DBusSignature():
     def __init__(
         self,
         annotations: Sequence[Type[Any]],
         names: Optional[Sequence[str]] = None,
     ) -> None:
-        self._list = self._get_signatures(annotations)
+        self._annotations = tuple(annotations)
+        self._list = self._get_signatures(self._annotations)
+        self._str = sys.intern(''.join(self._list))
         self._names = names
 
     def __iter__(self) -> Iterator[Any]:
         return iter(self._list)
 
     def __str__(self) -> str:
-        return ''.join(self._list)
+        return self._str
 
     def __repr__(self) -> str:
         return f'{self.__class__.__name__}({str(self)})'
@@ -40,28 +110,38 @@ class DBusSignature():
     def names(self) -> Optional[Sequence[str]]:
         return self._names
 
+    @property
+    def annotations(self) -> Tuple[Type[Any], ...]:
+        return self._annotations
+
     @classmethod
     def from_parameters(
         cls,
         func: Callable[..., Any],
         skip_first_argument: bool = True,
+        skip_arguments: int = 0,
     ) -> DBusSignature:
-        sig = inspect.signature(func)
-        args = sig.parameters.copy()  # type: ignore
+        '''
+        :param func: function
+        :param skip_first_argument: skip the first argument (``self``)
+        :param skip_arguments: number of arguments to skip after it, which are not passed from DBus
+        '''
+        args, _ret = _function_annotations(func)
 
         # remove self if it is a class method
         if skip_first_argument and args:
-            args.popitem(last=False)
+            del args[0]
+        del args[:skip_arguments]
 
-        for name, value in args.items():
-            if value.annotation is value.empty:
+        for name, annotation in args:
+            if annotation is _EMPTY:
                 raise dbus_objects.DBusObjectException(
                     f'Argument is missing a type annotation: {name} ({func})'
                 )
 
         return cls(
-            [arg.annotation for arg in args.values()],
-            [name for name in args],
+            [annotation for _name, annotation in args],
+            [name for name, _annotation in args],
         )
 
     @classmethod
@@ -71,11 +151,10 @@ class DBusSignature():
         return_names: Optional[Sequence[str]] = None,
         multiple_returns: bool = False,
     ) -> DBusSignature:
-        sig = inspect.signature(func)
-        ret = sig.return_annotation
+        _args, ret = _function_annotations(func)
 
         annotations: List[Type[Any]]
-        if not ret or ret is sig.empty:
+        if not ret or ret is _EMPTY:
             annotations = []
         elif multiple_returns:
             annotations = list(_typing.get_args(ret))
@@ -93,24 +172,32 @@ class DBusSignature():
         '''
         attr_class: type = typ if not _typing.get_origin(typ) else _typing.get_origin(typ)  # type: ignore
         args = _typing.get_args(typ)
-        # TODO: Variants, File Descriptors, DBus Signature
+        # TODO: Variants, DBus Signature
         if attr_class is typing.cast(Type[Any], _typing.Annotated):
             if args[0] == int:
-                if args[1] in ('y', 'q', 'u', 't', 'n', 'i', 'x'):
+                if args[1] in ('y', 'q', 'u', 't', 'n', 'i', 'x', 'h'):
                     assert isinstance(args[1], str)
                     return args[1]
                 else:
                     raise dbus_objects.DBusObjectException(
                         f'Unknown int-based DBus signature type: {args[1]}'
                     )
+            elif args[0] == dbus_objects.types.Buffer:
+                if args[1] in dbus_objects.types._BUFFER_TYPECODES:
+                    assert isinstance(args[1], str)
+                    return args[1]
+                else:
+                    raise dbus_objects.DBusObjectException(
+                        f'Unknown buffer-based DBus signature type: {args[1]}'
+                    )
             elif typ is dbus_objects.types.Variant:
                 return 'v'
         elif attr_class is list:
-            return 'a' + cls._type_signature(args[0])
+            return 'a' + signature_of(args[0])
         elif attr_class is dict:
-            return 'a{' + cls._type_signature(args[0]) + cls._type_signature(args[1]) + '}'
+            return 'a{' + signature_of(args[0]) + signature_of(args[1]) + '}'
         elif attr_class is tuple:
-            return '(' + ''.join(cls._type_signature(arg) for arg in args) + ')'
+            return '(' + ''.join(signature_of(arg) for arg in args) + ')'
         elif attr_class is str:
             return 's'
         elif attr_class is float:
@@ -131,11 +218,130 @@ class DBusSignature():
         '''
         signature = []
         for arg in args:
-            signature.append(cls._type_signature(arg))
+            signature.append(signature_of(arg))
 
         return signature
 
 
+@functools.lru_cache(maxsize=1024)
+def _cached_signature_of(typ: Any) -> str:
+    return DBusSignature._type_signature(typ)
+
+
+def signature_of(typ: Any) -> str:
+    '''
+    Converts a python type to a DBus signature
+
+    The results are cached, as the same types tend to be used by a lot of
+    members. Unhashable types are converted without caching.
+
+    :param typ: python type to convert
+    '''
+    try:
+        hash(typ)
+    except TypeError:
+        return DBusSignature._type_signature(typ)
+    return _cached_signature_of(typ)
+
+
+# python type -> function converting the value received from the DBus library
+_ARGUMENT_CONVERTERS: Dict[Any, Callable[[Any], Any]] = {}
+
+
+def _buffer_converter(typecode: str) -> Callable[[Any], memoryview]:
+    '''
+    Creates the converter for a buffer type
+
+    Byte arrays are received as :class:`bytes`, which we can wrap without
+    copying, the other arrays are received as lists and packed into an
+    :class:`array.array`.
+
+    :param typecode: array typecode of the buffer items
+    '''
+    if typecode == 'B':
+        return memoryview
+
+    def convert(value: Any) -> memoryview:
+        return memoryview(array.array(typecode, value))
+    return convert
+
+
+for _signature, _typecode in dbus_objects.types._BUFFER_TYPECODES.items():
+    _ARGUMENT_CONVERTERS[_typing.Annotated[dbus_objects.types.Buffer, _signature]] = _buffer_converter(_typecode)
+
+
+def _pack_nothing(value: Any) -> Tuple[Any, ...]:
+    return ()
+
+
+def _pack_single(value: Any) -> Tuple[Any, ...]:
+    return (value,)
+
+
+class DBusMethodPlan():
+    '''
+    Precompiled marshalling plan for a DBus method
+
+    Holds everything the server needs to dispatch a call, so that the call
+    path does not need to build signature strings or decide how to wrap the
+    return value.
+    '''
+    __slots__ = (
+        'input_signature',
+        'output_signature',
+        'signature',
+        'converters',
+        'pack_return',
+        'is_async',
+    )
+
+    def __init__(
+        self,
+        input_signature: DBusSignature,
+        output_signature: DBusSignature,
+        multiple_returns: bool = False,
+        is_async: bool = False,
+    ) -> None:
+        '''
+        :param input_signature: method input signature
+        :param output_signature: method output signature
+        :param multiple_returns: the method returns multiple parameters
+        :param is_async: the method is a coroutine function
+        '''
+        self.input_signature = str(input_signature)
+        self.output_signature = str(output_signature)
+        self.signature = self.input_signature, self.output_signature
+        self.is_async = is_async
+
+        converters = tuple(_ARGUMENT_CONVERTERS.get(arg) for arg in input_signature.annotations)
+        self.converters = converters if any(converters) else None
+
+        self.pack_return: Callable[[Any], Tuple[Any, ...]]
+        if not self.output_signature:
+            self.pack_return = _pack_nothing
+        elif multiple_returns:
+            self.pack_return = tuple
+        else:
+            self.pack_return = _pack_single
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.input_signature!r}, {self.output_signature!r})'
+
+    def unpack_arguments(self, body: Tuple[Any, ...]) -> Tuple[Any, ...]:
+        '''
+        Converts the message body to the method arguments
+
+        :param body: message body
+        '''
+        if self.converters is None:
+            return body
+        return tuple(
+            arg if converter is None else converter(arg)
+            for converter, arg in zip(self.converters, body)
+        )
+
+
+@functools.lru_cache(maxsize=4096)  # called for every object, with a small set of names
 def dbus_case(text: str) -> str:
     '''
     Converts text to the DBus object capitalization (camel case with the first
@@ -6,6 +6,7 @@ Custom Python types
 
 from __future__ import annotations
 
+import array
 import sys
 import typing
 
@@ -41,8 +42,64 @@ Int64 = _typing.Annotated[int, 'x']  # noqa: F821
 Signature = _typing.Annotated[str, 'g']  # noqa: F821
 '''DBus signature'''
 
+UnixFD = _typing.Annotated[int, 'h']  # noqa: F821
+'''
+DBus Unix file descriptor
+
+Methods receive the file descriptor number, which is closed once the method
+returns (:func:`os.dup` it to keep it open). File descriptors returned by
+methods are closed once the reply is sent, the ones emitted in signals are
+not. The asyncio server does not support file descriptors, and the trio one
+only does with ``enable_fds``.
+'''
+
 Variant = _typing.Annotated[typing.Tuple[str, typing.Any], 'v']  # noqa: F821
 '''DBus variant'''
 
+Buffer = typing.Union[bytes, bytearray, memoryview, array.array]  # type: ignore
+'''
+Contiguous buffer, used by the DBus array types below
+
+The buffer data is sent as-is, so it must be in the native byte order,
+and typed buffers (eg. :class:`array.array`) must have the same item
+size as the DBus type.
+'''
+
+ByteBuffer = _typing.Annotated[Buffer, 'ay']  # noqa: F821
+'''DBus byte array, as a buffer (received as a :class:`memoryview`)'''
+
+UInt16Buffer = _typing.Annotated[Buffer, 'aq']  # noqa: F821
+'''DBus uint16 array, as a buffer (received as a :class:`memoryview`)'''
+
+UInt32Buffer = _typing.Annotated[Buffer, 'au']  # noqa: F821
+'''DBus uint32 array, as a buffer (received as a :class:`memoryview`)'''
+
+UInt64Buffer = _typing.Annotated[Buffer, 'at']  # noqa: F821
+'''DBus uint64 array, as a buffer (received as a :class:`memoryview`)'''
+
+Int16Buffer = _typing.Annotated[Buffer, 'an']  # noqa: F821
+'''DBus int16 array, as a buffer (received as a :class:`memoryview`)'''
+
+Int32Buffer = _typing.Annotated[Buffer, 'ai']  # noqa: F821
+'''DBus int32 array, as a buffer (received as a :class:`memoryview`)'''
+
+Int64Buffer = _typing.Annotated[Buffer, 'ax']  # noqa: F821
+'''DBus int64 array, as a buffer (received as a :class:`memoryview`)'''
+
+DoubleBuffer = _typing.Annotated[Buffer, 'ad']  # noqa: F821
+'''DBus double array, as a buffer (received as a :class:`memoryview`)'''
+
+# buffer signature -> array typecode
+_BUFFER_TYPECODES = {
+    'ay': 'B',
+    'aq': 'H',
+    'au': 'I',
+    'at': 'Q',
+    'an': 'h',
+    'ai': 'i',
+    'ax': 'q',
+    'ad': 'd',
+}
+
 MultipleReturn = typing.Tuple  # type: ignore
 '''Multiple return type. Used when you want to return multiple variables in a DBus method'''
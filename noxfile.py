@@ -30,3 +30,21 @@ def test(session):
         f'--cov-report=xml:{xmlcov_output}',
         'tests/', *session.posargs
     )
+
+
+@nox.session(python='3.9')
+def benchmark(session):
+    '''
+    Runs the benchmarks, the first positional argument is the output directory
+    (defaults to ``.benchmarks``), the remaining ones are passed to pyperf
+    '''
+    output = session.posargs[0] if session.posargs else '.benchmarks'
+    os.makedirs(output, exist_ok=True)
+
+    session.install('.[jeepney]', 'pyperf')
+
+    for name in ('import', 'decoration', 'register'):
+        result = os.path.join(output, f'{name}.json')
+        if os.path.exists(result):
+            os.remove(result)
+        session.run('python', os.path.join('benchmarks', f'bench_{name}.py'), '-o', result, *session.posargs[1:])
@@ -1,12 +1,13 @@
 # SPDX-License-Identifier: MIT
 
-import multiprocessing
-import time
+import threading
 
 import jeepney
 import jeepney.io.blocking
 import pytest
 
+import dbus_objects
+
 from dbus_objects import DBusObject, custom_dbus_signal, dbus_method, dbus_property, dbus_signal
 from dbus_objects.integration import DBusServerBase
 from dbus_objects.integration.jeepney import BlockingDBusServer
@@ -35,7 +36,7 @@ class ExampleObject(DBusObject):
 
     @dbus_method(multiple_returns=True)
     def multiple(self, msg: str) -> MultipleReturn[int, int]:
-        return 1, 2  # pragma: no cover
+        return 1, 2
 
     @dbus_property()
     def prop(self) -> str:
@@ -60,6 +61,43 @@ class ExampleObjectWithSignal(DBusObject):
         name=str,
         age=int,
     )
+    coalesced_signal = custom_dbus_signal(coalesce=0.1)(int)
+    rate_limited_signal = custom_dbus_signal(max_rate=10)(int)
+
+
+class ExampleObjectWithProperties(DBusObject):
+    def __init__(self):
+        super().__init__(default_interface_root='com.example.object')
+        self._name = 'name'
+        self._age = 0
+        self._blob = ''
+        # threads the age getter was called in
+        self.age_threads = []
+
+    @dbus_property()
+    def name(self) -> str:
+        return self._name
+
+    @name.setter
+    def name(self, value: str):
+        self._name = value
+
+    @dbus_property()
+    def age(self) -> int:
+        self.age_threads.append(threading.current_thread())
+        return self._age
+
+    @age.setter
+    def age(self, value: int):
+        self._age = value
+
+    @dbus_property(emits_changed='invalidates')
+    def blob(self) -> str:
+        return self._blob
+
+    @blob.setter
+    def blob(self, value: str):
+        self._blob = value
 
 
 class DummyServer(DBusServerBase):
@@ -67,9 +105,24 @@ class DummyServer(DBusServerBase):
         super().__init__(bus, name)
         self.emit_signal_callback = self.emit_signal
         self.emitted_signal = None
+        self.emitted_signals = []
 
     def emit_signal(self, signal, path, body):
         self.emitted_signal = (signal.name, path, body)
+        self.emitted_signals.append(self.emitted_signal)
+
+
+class ManualScheduler():
+    def __init__(self):
+        self.callbacks = []
+
+    def call_later(self, delay, callback):
+        self.callbacks.append(callback)
+
+    def run(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
 
 
 @pytest.fixture(scope='session')
@@ -77,6 +130,13 @@ def obj():
     return ExampleObject()
 
 
+@pytest.fixture()
+def scheduler(monkeypatch):
+    scheduler = ManualScheduler()
+    monkeypatch.setattr(dbus_objects, '_scheduler', scheduler)
+    return scheduler
+
+
 @pytest.fixture()
 def obj_methods(obj):
     return obj.get_dbus_methods()
@@ -107,6 +167,21 @@ def signal_server(signal_obj):
     yield server
 
 
+@pytest.fixture()
+def properties_obj():
+    return ExampleObjectWithProperties()
+
+
+@pytest.fixture()
+def properties_server(properties_obj):
+    server = DummyServer(
+        bus='SESSION',
+        name='io.github.ffy00.dbus-objects.tests'
+    )
+    server.register_object('/io/github/ffy00/dbus_objects/example_properties', properties_obj)
+    yield server
+
+
 @pytest.fixture()
 def base_server(obj):
     server = DBusServerBase(
@@ -128,14 +203,8 @@ def jeepney_one_time_server(obj, signal_obj):
     server.register_object('/io/github/ffy00/dbus_objects/example_signal', signal_obj)
 
     # start server
-    run = multiprocessing.Event()
-    run.set()
-    process = multiprocessing.Process(target=server.listen, kwargs={'event': run})
-    process.start()
-
-    # clear the event, listen will block until it receives the next message
-    time.sleep(0.2)
-    run.clear()
+    thread = threading.Thread(target=server.listen)
+    thread.start()
 
     print('is up')
     yield
@@ -143,7 +212,9 @@ def jeepney_one_time_server(obj, signal_obj):
 
     # wait to finish
     print('joining')
-    process.join()
+    server.stop()
+    thread.join()
+    server.close()
 
 
 @pytest.fixture()
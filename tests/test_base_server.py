@@ -1,5 +1,10 @@
 # SPDX-License-Identifier: MIT
 
+import concurrent.futures
+import threading
+import time
+import xml.etree.ElementTree as ET
+
 import pytest
 import xmldiff.main
 
@@ -50,6 +55,24 @@ def test_introspectable(base_server):
     ''')  # noqa: E501
 
 
+def test_introspectable_cache(base_server, obj):
+    introspect, _descriptor = base_server.get_method(
+        '/io/github/ffy00/dbus_objects',
+        'org.freedesktop.DBus.Introspectable',
+        'Introspect',
+    )
+
+    xml = introspect()
+    assert introspect() is xml
+    assert '<node name="other" />' not in xml
+
+    base_server.register_object('/io/github/ffy00/dbus_objects/other/nested', obj)
+
+    xml = introspect()
+    assert '<node name="example" /><node name="other" />' in xml
+    assert '<node name="nested" />' not in xml
+
+
 def test_peer(base_server):
     ping, _descriptor = base_server.get_method(
         '/io/github/ffy00/dbus_objects/example',
@@ -60,6 +83,42 @@ def test_peer(base_server):
     assert ping() is None
 
 
+def test_standard_interfaces(base_server):
+    introspect, _descriptor = base_server.get_method(
+        '/io/github/ffy00/dbus_objects/example',
+        'org.freedesktop.DBus.Introspectable',
+        'Introspect',
+    )
+    xml = introspect()
+    for interface in ('org.freedesktop.DBus.Properties', 'org.freedesktop.DBus.Peer'):
+        assert f'<interface name="{interface}">' in xml
+    assert '<signal name="PropertiesChanged">' in xml
+
+    # Properties is only available in the paths with objects
+    with pytest.raises(KeyError):
+        base_server.get_method('/io/github/ffy00', 'org.freedesktop.DBus.Properties', 'GetAll')
+    with pytest.raises(KeyError):
+        base_server.get_method('/io/github/ffy00/unknown', 'org.freedesktop.DBus.Peer', 'Ping')
+    with pytest.raises(KeyError):
+        base_server.get_method('/io/github/ffy00', 'org.freedesktop.DBus.Peer', 'Unknown')
+
+    # standard interfaces are not registered in the index
+    assert base_server._method_index.interfaces('/io/github/ffy00') == {}
+
+
+def test_standard_interface_methods(base_server, obj):
+    properties = base_server._standard_interfaces['org.freedesktop.DBus.Properties']
+    methods = {descriptor.name: (method, descriptor) for method, descriptor in properties.get_dbus_methods()}
+    # the path is passed by the server, it is not a DBus argument
+    assert {name: descriptor.signature for name, (_method, descriptor) in methods.items()} == {
+        'Get': ('ss', 'v'),
+        'Set': ('ssv', ''),
+        'GetAll': ('s', 'a{sv}'),
+    }
+    get, _descriptor = methods['Get']
+    assert get('/io/github/ffy00/dbus_objects/example', '', 'Prop') == ('s', obj.prop)
+
+
 def test_properties(base_server):
     get, _descriptor_get = base_server.get_method(
         '/io/github/ffy00/dbus_objects/example',
@@ -77,8 +136,379 @@ def test_properties(base_server):
         'GetAll',
     )
 
-    assert get('interface', 'property') == ('', None)
-    assert set_('interface', 'property', 'value') is None
-    assert get_all('interface') == {
-        'Prop': ('s', 'some property'),
+    assert set_('com.example.object.ExampleObject', 'Prop', ('s', 'some property')) is None
+    assert get('com.example.object.ExampleObject', 'Prop') == ('s', 'some property')
+    assert set_('', 'Prop', ('s', 'other property')) is None
+    assert get('', 'Prop') == ('s', 'other property')
+    assert get_all('com.example.object.ExampleObject') == {
+        'Prop': ('s', 'other property'),
+    }
+    assert get_all('') == {
+        'Prop': ('s', 'other property'),
+    }
+    assert get_all('interface') == {}
+
+    with pytest.raises(dbus_objects.DBusError) as exc_info:
+        get('interface', 'Prop')
+    assert exc_info.value.name == 'org.freedesktop.DBus.Error.UnknownInterface'
+    with pytest.raises(dbus_objects.DBusError) as exc_info:
+        get('', 'property')
+    assert exc_info.value.name == 'org.freedesktop.DBus.Error.UnknownProperty'
+    with pytest.raises(dbus_objects.DBusError) as exc_info:
+        set_('com.example.object.ExampleObject', 'property', ('s', 'value'))
+    assert exc_info.value.name == 'org.freedesktop.DBus.Error.UnknownProperty'
+    # the interface exists, even if it has no properties
+    with pytest.raises(dbus_objects.DBusError) as exc_info:
+        get('org.freedesktop.DBus.Peer', 'Prop')
+    assert exc_info.value.name == 'org.freedesktop.DBus.Error.UnknownProperty'
+    with pytest.raises(dbus_objects.DBusError) as exc_info:
+        set_('com.example.object.ExampleObject', 'Prop', ('i', 1))
+    assert exc_info.value.name == 'org.freedesktop.DBus.Error.InvalidArgs'
+
+
+def test_properties_read_only(base_server):
+    class ReadOnlyObject(dbus_objects.DBusObject):
+        @dbus_objects.dbus_property(interface='com.example.ReadOnly')
+        def counter(self) -> int:
+            return 0
+
+    base_server.register_object('/io/github/ffy00/dbus_objects/read_only', ReadOnlyObject())
+    set_, _descriptor = base_server.get_method(
+        '/io/github/ffy00/dbus_objects/read_only',
+        'org.freedesktop.DBus.Properties',
+        'Set',
+    )
+    with pytest.raises(dbus_objects.DBusError) as exc_info:
+        set_('com.example.ReadOnly', 'Counter', ('i', 1))
+    assert exc_info.value.name == 'org.freedesktop.DBus.Error.PropertyReadOnly'
+
+
+def test_object_manager(properties_server, properties_obj):
+    properties_server.register_object_manager('/io/github/ffy00')
+    get_managed_objects, _descriptor = properties_server.get_method(
+        '/io/github/ffy00',
+        'org.freedesktop.DBus.ObjectManager',
+        'GetManagedObjects',
+    )
+    standard_interfaces = {
+        'org.freedesktop.DBus.Peer': {},
+        'org.freedesktop.DBus.Introspectable': {},
+        'org.freedesktop.DBus.Properties': {},
+    }
+
+    assert get_managed_objects() == {
+        '/io/github/ffy00/dbus_objects/example_properties': {
+            **standard_interfaces,
+            'com.example.object.ExampleObjectWithProperties': {
+                'Name': ('s', 'name'),
+                'Age': ('i', 0),
+                'Blob': ('s', ''),
+            },
+        },
     }
+    assert not properties_server.emitted_signals
+
+    other = type(properties_obj)()
+    other.blob = 'blob'
+    properties_server.register_object('/io/github/ffy00/other', other)
+    assert properties_server.emitted_signals == [
+        ('InterfacesAdded', '/io/github/ffy00', (
+            '/io/github/ffy00/other',
+            {
+                **standard_interfaces,
+                'com.example.object.ExampleObjectWithProperties': {
+                    'Name': ('s', 'name'),
+                    'Age': ('i', 0),
+                    'Blob': ('s', 'blob'),
+                },
+            },
+        )),
+    ]
+
+    properties_obj.age = 10
+    other.name = 'other'
+    time.sleep(0.2)
+    objects = get_managed_objects()
+    assert objects['/io/github/ffy00/dbus_objects/example_properties']['com.example.object.ExampleObjectWithProperties'] == {
+        'Name': ('s', 'name'),
+        'Age': ('i', 10),
+        'Blob': ('s', ''),
+    }
+    assert objects['/io/github/ffy00/other']['com.example.object.ExampleObjectWithProperties']['Name'] == ('s', 'other')
+
+    with pytest.raises(ValueError):
+        properties_server.register_object_manager('/io/github/ffy00')
+
+
+def test_object_manager_read_only(properties_server):
+    class ReadOnlyObject(dbus_objects.DBusObject):
+        def __init__(self):
+            super().__init__(default_interface_root='com.example.object')
+            self.count = 0
+
+        @dbus_objects.dbus_property()
+        def counter(self) -> int:
+            return self.count
+
+    obj = ReadOnlyObject()
+    [(_getter, _setter, descriptor)] = obj.get_dbus_properties()
+    assert descriptor.emits_changed is False
+    assert not xmldiff.main.diff_texts(
+        ET.tostring(descriptor.xml).decode(),
+        (
+            '<property name="Counter" type="i" access="read">'
+            '<annotation name="org.freedesktop.DBus.Property.EmitsChangedSignal" value="false" />'
+            '</property>'
+        )
+    )
+
+    properties_server.register_object_manager('/io/github/ffy00')
+    properties_server.register_object('/io/github/ffy00/read_only', obj)
+    get_managed_objects, _descriptor = properties_server.get_method(
+        '/io/github/ffy00',
+        'org.freedesktop.DBus.ObjectManager',
+        'GetManagedObjects',
+    )
+    assert get_managed_objects()['/io/github/ffy00/read_only']['com.example.object.ReadOnlyObject'] == {
+        'Counter': ('i', 0),
+    }
+    # the value is read on demand, so it is never stale
+    obj.count = 10
+    assert get_managed_objects()['/io/github/ffy00/read_only']['com.example.object.ReadOnlyObject'] == {
+        'Counter': ('i', 10),
+    }
+
+
+def test_unregister_object(properties_server, properties_obj):
+    properties_server.register_object_manager('/io/github/ffy00')
+    other = type(properties_obj)()
+    properties_server.register_object('/io/github/ffy00/transient/device', other)
+    assert len(other._properties_changed_callbacks) == 2
+
+    properties_server.unregister_object('/io/github/ffy00/transient/device')
+
+    assert not other._properties_changed_callbacks
+    assert properties_server.emitted_signals[-1] == (
+        'InterfacesRemoved', '/io/github/ffy00', (
+            '/io/github/ffy00/transient/device',
+            [
+                'com.example.object.ExampleObjectWithProperties',
+                'org.freedesktop.DBus.Peer',
+                'org.freedesktop.DBus.Introspectable',
+                'org.freedesktop.DBus.Properties',
+            ],
+        ),
+    )
+    for path in ('/io/github/ffy00/transient/device', '/io/github/ffy00/transient'):
+        assert path not in properties_server._method_index.paths
+        assert path not in properties_server._children
+    assert '/io/github/ffy00/transient' not in properties_server._children['/io/github/ffy00']
+    get_managed_objects, _descriptor = properties_server.get_method(
+        '/io/github/ffy00',
+        'org.freedesktop.DBus.ObjectManager',
+        'GetManagedObjects',
+    )
+    assert list(get_managed_objects()) == ['/io/github/ffy00/dbus_objects/example_properties']
+
+    with pytest.raises(KeyError):
+        properties_server.unregister_object('/io/github/ffy00/transient/device')
+
+    # the path is kept while it has children
+    properties_server.unregister_object('/io/github/ffy00')
+    assert '/io/github/ffy00' in properties_server._children
+    assert properties_server._method_index.interfaces('/io/github/ffy00') == {}
+    ping, _descriptor = properties_server.get_method('/io/github/ffy00', 'org.freedesktop.DBus.Peer', 'Ping')
+    assert ping() is None
+    # only the PropertiesChanged callback is left, the object manager one was removed
+    assert len(properties_obj._properties_changed_callbacks) == 1
+
+
+def test_unregister_object_signals(signal_server, signal_obj):
+    assert signal_obj._emit_signal_callbacks
+    signal_server.unregister_object('/io/github/ffy00/dbus_objects/example')
+    assert not signal_obj._emit_signal_callbacks
+    signal_obj.signal(30, 'test')
+    assert not signal_server.emitted_signal
+
+
+def test_unregister_subtree(base_server, obj):
+    introspect, _descriptor = base_server.get_method(
+        '/io/github/ffy00/dbus_objects',
+        'org.freedesktop.DBus.Introspectable',
+        'Introspect',
+    )
+    elements = len(base_server._method_index._elements)
+
+    for i in range(10):
+        base_server.register_object(f'/io/github/ffy00/dbus_objects/tree/{i}', obj)
+        base_server.register_object(f'/io/github/ffy00/dbus_objects/tree/{i}/nested', obj)
+    assert '<node name="tree" />' in introspect()
+
+    base_server.unregister_subtree('/io/github/ffy00/dbus_objects/tree')
+
+    assert '<node name="tree" />' not in introspect()
+    assert len(base_server._method_index._elements) == elements
+    assert not [path for path in base_server._method_index.paths if path.startswith('/io/github/ffy00/dbus_objects/tree')]
+    assert '/io/github/ffy00/dbus_objects/example' in base_server._method_index.paths
+
+
+def test_fallback(base_server, obj):
+    created = []
+
+    def factory(path):
+        name = path.rsplit('/', 1)[-1]
+        if not name.isdigit():
+            return None
+        created.append(path)
+        return type(obj)()
+
+    base_server.register_fallback(
+        '/io/github/ffy00/users',
+        factory,
+        enumerate_children=lambda path: [str(i) for i in range(3)] if path == '/io/github/ffy00/users' else [],
+        max_instances=2,
+    )
+
+    for path in ('/io/github/ffy00/users/0', '/io/github/ffy00/users/1', '/io/github/ffy00/users/0'):
+        method, _descriptor = base_server.get_method(path, 'com.example.object.ExampleObject', 'ExampleMethod')
+        assert method() == 'test'
+    assert created == ['/io/github/ffy00/users/0', '/io/github/ffy00/users/1']
+
+    # /io/github/ffy00/users/1 is the least recently used, so it gets evicted
+    base_server.get_method('/io/github/ffy00/users/2', 'com.example.object.ExampleObject', 'ExampleMethod')
+    assert '/io/github/ffy00/users/1' not in base_server._method_index.paths
+    assert '/io/github/ffy00/users/0' in base_server._method_index.paths
+    base_server.get_method('/io/github/ffy00/users/1', 'com.example.object.ExampleObject', 'ExampleMethod')
+    assert created[-1] == '/io/github/ffy00/users/1'
+    assert len(base_server._fallbacks['/io/github/ffy00/users'].instances) == 2
+
+    with pytest.raises(KeyError):
+        base_server.get_method('/io/github/ffy00/users/invalid', 'com.example.object.ExampleObject', 'ExampleMethod')
+    with pytest.raises(KeyError):
+        base_server.get_method('/io/github/ffy00/users/0', 'com.example.object.ExampleObject', 'Unknown')
+
+    introspect, _descriptor = base_server.get_method(
+        '/io/github/ffy00/users',
+        'org.freedesktop.DBus.Introspectable',
+        'Introspect',
+    )
+    xml = introspect()
+    for i in range(3):
+        assert xml.count(f'<node name="{i}" />') == 1
+    introspect, _descriptor = base_server.get_method(
+        '/io/github/ffy00',
+        'org.freedesktop.DBus.Introspectable',
+        'Introspect',
+    )
+    assert '<node name="users" />' in introspect()
+
+
+def test_fallback_max_instances(base_server, obj):
+    with pytest.raises(ValueError):
+        base_server.register_fallback('/io/github/ffy00/users', lambda path: type(obj)(), max_instances=0)
+    assert not base_server._fallbacks
+
+
+def test_fallback_slow_factory(base_server, obj):
+    release = threading.Event()
+
+    def slow_factory(path):
+        release.wait(3)
+        return type(obj)()
+
+    base_server.register_fallback('/io/github/ffy00/slow', slow_factory)
+    base_server.register_fallback('/io/github/ffy00/users', lambda path: type(obj)())
+    base_server.get_method('/io/github/ffy00/users/0', 'com.example.object.ExampleObject', 'ExampleMethod')
+
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        slow = executor.submit(
+            base_server.get_method, '/io/github/ffy00/slow/0', 'com.example.object.ExampleObject', 'ExampleMethod',
+        )
+        # the other fallback paths are served while the factory runs
+        for path in ('/io/github/ffy00/users/0', '/io/github/ffy00/users/1'):
+            call = executor.submit(base_server.get_method, path, 'com.example.object.ExampleObject', 'ExampleMethod')
+            method, _descriptor = call.result(timeout=1)
+            assert method() == 'test'
+        assert not slow.done()
+        release.set()
+        method, _descriptor = slow.result(timeout=3)
+        assert method() == 'test'
+
+
+def test_fallback_missing_paths(base_server):
+    base_server.register_fallback(
+        '/io/github/ffy00/users',
+        lambda path: None,
+        enumerate_children=lambda path: ['listed'] if path == '/io/github/ffy00/users' else [],
+    )
+
+    # the paths the factory has no object for, and that are not enumerated, don't exist
+    for i in range(100):
+        with pytest.raises(KeyError):
+            base_server.get_method(f'/io/github/ffy00/users/{i}', 'org.freedesktop.DBus.Introspectable', 'Introspect')
+    with pytest.raises(KeyError):
+        base_server.get_method('/io/github/ffy00/users/nope/deep', 'org.freedesktop.DBus.Peer', 'Ping')
+    assert not [path for path in base_server._introspection_cache if path.startswith('/io/github/ffy00/users/')]
+
+    ping, _descriptor = base_server.get_method('/io/github/ffy00/users/listed', 'org.freedesktop.DBus.Peer', 'Ping')
+    ping()
+    introspect, _descriptor = base_server.get_method(
+        '/io/github/ffy00/users/listed',
+        'org.freedesktop.DBus.Introspectable',
+        'Introspect',
+    )
+    introspect()
+    assert '/io/github/ffy00/users/listed' not in base_server._introspection_cache
+
+
+def test_unregister_fallback(base_server, obj):
+    base_server.register_fallback('/io/github/ffy00/users', lambda path: type(obj)())
+    base_server.get_method('/io/github/ffy00/users/0', 'com.example.object.ExampleObject', 'ExampleMethod')
+
+    base_server.unregister_fallback('/io/github/ffy00/users')
+
+    assert '/io/github/ffy00/users/0' not in base_server._objects
+    assert not base_server._has_path('/io/github/ffy00/users')
+    with pytest.raises(KeyError):
+        base_server.get_method('/io/github/ffy00/users/0', 'com.example.object.ExampleObject', 'ExampleMethod')
+    with pytest.raises(KeyError):
+        base_server.unregister_fallback('/io/github/ffy00/users')
+
+
+def test_unregister_subtree_fallback(base_server, obj):
+    base_server.register_fallback('/io/github/ffy00/users', lambda path: type(obj)())
+    base_server.get_method('/io/github/ffy00/users/0', 'com.example.object.ExampleObject', 'ExampleMethod')
+
+    base_server.unregister_subtree('/io/github/ffy00')
+
+    assert not base_server._fallbacks
+    assert not base_server._has_path('/io/github/ffy00/users')
+    with pytest.raises(KeyError):
+        base_server.get_method('/io/github/ffy00/users/0', 'com.example.object.ExampleObject', 'ExampleMethod')
+
+
+def test_get_method_not_found(base_server):
+    with pytest.raises(KeyError):
+        base_server.get_method(
+            '/io/github/ffy00/dbus_objects/example',
+            'com.example.object.ExampleObject',
+            'DoesNotExist',
+        )
+    with pytest.raises(KeyError):
+        base_server.get_method(
+            '/io/github/ffy00/dbus_objects/example',
+            'org.freedesktop.DBus.Peer',
+            'ExampleMethod',
+        )
+
+
+def test_topology(base_server):
+    assert base_server._method_index.show().splitlines() == [
+        'paths',
+        '└── /io/github/ffy00/dbus_objects/example',
+        '    └── com.example.object.ExampleObject',
+        '        ├── ExampleMethod',
+        '        ├── Multiple',
+        '        ├── Ping',
+        '        └── Print',
+    ]
@@ -0,0 +1,63 @@
+# SPDX-License-Identifier: MIT
+
+import os
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+
+# modules that are slow to import and that we only need for some features
+# (introspection, the asyncio server, worker threads, ...)
+DEFERRED_MODULES = (
+    'asyncio',
+    'concurrent.futures',
+    'inspect',
+    'xml.etree.ElementTree',
+)
+
+
+def loaded_modules(code):
+    output = subprocess.check_output(
+        [sys.executable, '-c', code + '\nimport sys\nprint("\\n".join(sys.modules))'],
+        env={**os.environ, 'PYTHONPATH': os.pathsep.join(sys.path)},
+        universal_newlines=True,
+    )
+    return set(output.splitlines())
+
+
+@pytest.mark.parametrize(
+    'code',
+    [
+        'import dbus_objects',
+        'import dbus_objects.integration',
+        'import dbus_objects.integration.jeepney',
+        textwrap.dedent('''
+            import typing
+            from dbus_objects import DBusObject, dbus_method, dbus_property, dbus_signal
+            from dbus_objects.integration import DBusServerBase
+
+            class ExampleObject(DBusObject):
+                @dbus_method()
+                def method(self, a: int, b: typing.List[str]) -> str:
+                    pass
+
+                @dbus_method()
+                async def coroutine(self) -> None:
+                    pass
+
+                @dbus_property()
+                def prop(self) -> str:
+                    pass
+
+                signal = dbus_signal(value=int)
+
+            server = DBusServerBase(bus='SESSION', name='com.example')
+            server.emit_signal_callback = print
+            server.register_object('/com/example', ExampleObject(default_interface_root='com.example'))
+        '''),
+    ],
+)
+def test_deferred_imports(code):
+    assert not loaded_modules(code).intersection(DEFERRED_MODULES)
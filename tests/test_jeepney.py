@@ -1,11 +1,131 @@
 # SPDX-License-Identifier: MIT
 
+import array
+import concurrent.futures
+import contextlib
+import os
+import socket
+import subprocess
+import threading
+import time
+
 import jeepney
 import jeepney.bus_messages
 import jeepney.io.blocking
 import pytest
 
-from dbus_objects.integration.jeepney import BlockingDBusServer
+from dbus_objects import DBusObject, dbus_method, dbus_signal
+from dbus_objects.integration.jeepney import (
+    BlockingDBusServer, _buffer_view, _BufferMessage, _JeepneyMethodCall, _map_fds, _sasl_external_handshake, _sendmsg_all,
+)
+from dbus_objects.types import ByteBuffer, Int32Buffer, MultipleReturn, UnixFD
+
+
+class SlowExampleObject(DBusObject):
+    def __init__(self, serialize_calls=False):
+        super().__init__(default_interface_root='com.example.object', serialize_calls=serialize_calls)
+
+    @dbus_method()
+    def sleep(self, seconds: float) -> str:
+        time.sleep(seconds)
+        return 'Slept!'
+
+
+class CPUBoundExampleObject(DBusObject):
+    def __init__(self):
+        super().__init__(default_interface_root='com.example.object')
+
+    @dbus_method(cpu_bound=True)
+    def pid(self) -> int:
+        return os.getpid()
+
+    @dbus_method(cpu_bound=True, multiple_returns=True)
+    def sleep(self, seconds: float) -> MultipleReturn[float, float]:
+        start = time.monotonic()
+        time.sleep(seconds)
+        return start, time.monotonic()
+
+    @dbus_method(cpu_bound=True)
+    def fail(self) -> None:
+        raise RuntimeError('failed in the worker')
+
+    @dbus_method(cpu_bound=True)
+    def emit_tick(self) -> int:
+        self.tick(os.getpid())
+        return os.getpid()
+
+    tick = dbus_signal(int)
+
+
+class BufferExampleObject(DBusObject):
+    def __init__(self):
+        super().__init__(default_interface_root='com.example.object')
+
+    @dbus_method()
+    def describe(self, data: ByteBuffer) -> str:
+        return f'{type(data).__name__} {data.tobytes()!r}'
+
+    @dbus_method()
+    def samples(self, count: int) -> Int32Buffer:
+        return array.array('i', range(-count, count))
+
+    @dbus_method()
+    def blob(self, size: int) -> ByteBuffer:
+        return memoryview(bytearray(range(256)) * (size // 256))
+
+
+class FDExampleObject(DBusObject):
+    def __init__(self):
+        super().__init__(default_interface_root='com.example.object')
+
+    @dbus_method()
+    def write(self, fd: UnixFD, data: str) -> None:
+        os.write(fd, data.encode())
+
+    @dbus_method()
+    async def write_async(self, fd: UnixFD, data: str) -> None:
+        os.write(fd, data.encode())  # pragma: no cover
+
+    @dbus_method()
+    def pipe(self, data: str) -> UnixFD:
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, data.encode())
+        os.close(write_fd)
+        return read_fd
+
+
+@pytest.fixture()
+def jeepney_threaded_server(request):
+    server = BlockingDBusServer(
+        bus='SESSION',
+        name='io.github.ffy00.dbus-objects.threaded_tests'
+    )
+    server.register_object('/io/github/ffy00/dbus_objects/slow', SlowExampleObject())
+    server.register_object('/io/github/ffy00/dbus_objects/slow_serial', SlowExampleObject(serialize_calls=True))
+    server.register_object('/io/github/ffy00/dbus_objects/buffer', BufferExampleObject())
+    server.register_object('/io/github/ffy00/dbus_objects/fd', FDExampleObject())
+    server.register_object_manager('/io/github/ffy00/dbus_objects')
+
+    run = threading.Event()
+    run.set()
+    thread = threading.Thread(target=server.listen, kwargs={'event': run, 'workers': 4})
+    thread.start()
+    yield server
+    run.clear()
+    thread.join()
+    server.close()
+
+
+def _call_sleep(path, seconds):
+    address = jeepney.DBusAddress(
+        path,
+        bus_name='io.github.ffy00.dbus-objects.threaded_tests',
+        interface='com.example.object.SlowExampleObject',
+    )
+    msg = jeepney.new_method_call(address, 'Sleep', 'd', (seconds,))
+    with jeepney.io.blocking.open_dbus_connection(bus='SESSION') as connection:
+        reply = connection.send_and_get_reply(msg, timeout=3)
+    return reply.body, time.monotonic()
 
 
 def test_create_error():
@@ -19,6 +139,75 @@ def test_listen(jeepney_one_time_server, jeepney_client, jeepney_connection):
     assert reply.body[0] == 'Pong!'
 
 
+def test_properties(jeepney_one_time_server, jeepney_client, jeepney_connection):
+    properties = jeepney.Properties(jeepney_client)
+    reply = jeepney_connection.send_and_get_reply(properties.set('Prop', 's', 'over the bus'))
+    assert reply.header.message_type == jeepney.MessageType.method_return
+    reply = jeepney_connection.send_and_get_reply(properties.get('Prop'))
+    assert reply.body == (('s', 'over the bus'),)
+    reply = jeepney_connection.send_and_get_reply(properties.get_all())
+    assert reply.body == ({'Prop': ('s', 'over the bus')},)
+
+    reply = jeepney_connection.send_and_get_reply(properties.get('Unknown'))
+    assert reply.header.fields[jeepney.HeaderFields.error_name] == 'org.freedesktop.DBus.Error.UnknownProperty'
+    assert reply.body == ('No such property: Unknown',)
+    reply = jeepney_connection.send_and_get_reply(properties.set('Prop', 'i', 1))
+    assert reply.header.fields[jeepney.HeaderFields.error_name] == 'org.freedesktop.DBus.Error.InvalidArgs'
+
+
+def test_properties_changed(jeepney_one_time_server, obj, jeepney_connection):
+    rule = jeepney.bus_messages.MatchRule(
+        type='signal',
+        interface='org.freedesktop.DBus.Properties',
+        member='PropertiesChanged',
+        path='/io/github/ffy00/dbus_objects/example',
+    )
+
+    bus_proxy = jeepney.io.blocking.Proxy(
+        jeepney.bus_messages.message_bus,
+        jeepney_connection,
+    )
+    bus_proxy.AddMatch(rule)
+
+    obj.prop = 'changed'
+
+    with jeepney_connection.filter(rule) as queue:
+        signal_msg = jeepney_connection.recv_until_filtered(queue, timeout=3)
+
+    assert signal_msg.header.fields[jeepney.HeaderFields.signature] == 'sa{sv}as'
+    assert signal_msg.body == ('com.example.object.ExampleObject', {'Prop': ('s', 'changed')}, [])
+
+
+def test_properties_changed_listen_thread(properties_obj, jeepney_connection):
+    server = BlockingDBusServer(
+        bus='SESSION',
+        name='io.github.ffy00.dbus-objects.properties_thread_tests'
+    )
+    server.register_object('/io/github/ffy00/dbus_objects/example_properties', properties_obj)
+    thread = threading.Thread(target=server.listen)
+    thread.start()
+
+    rule = jeepney.bus_messages.MatchRule(
+        type='signal',
+        interface='org.freedesktop.DBus.Properties',
+        member='PropertiesChanged',
+        path='/io/github/ffy00/dbus_objects/example_properties',
+    )
+    jeepney.io.blocking.Proxy(jeepney.bus_messages.message_bus, jeepney_connection).AddMatch(rule)
+    try:
+        properties_obj.age = 10
+        with jeepney_connection.filter(rule) as queue:
+            signal_msg = jeepney_connection.recv_until_filtered(queue, timeout=3)
+    finally:
+        server.stop()
+        thread.join()
+        server.close()
+
+    assert signal_msg.body == ('com.example.object.ExampleObjectWithProperties', {'Age': ('i', 10)}, [])
+    # the getter runs in the listen loop, like the calls
+    assert properties_obj.age_threads == [thread]
+
+
 def test_emit_signal(jeepney_one_time_server, signal_obj, jeepney_connection):
     rule = jeepney.bus_messages.MatchRule(
         type='signal',
@@ -40,3 +229,591 @@ def test_emit_signal(jeepney_one_time_server, signal_obj, jeepney_connection):
 
     assert signal_msg.header.fields[jeepney.HeaderFields.signature] == 'is'
     assert signal_msg.body == (30, 'test')
+
+
+def test_listen_workers(jeepney_threaded_server):
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        slow = executor.submit(_call_sleep, '/io/github/ffy00/dbus_objects/slow', 0.5)
+        time.sleep(0.1)
+        fast = executor.submit(_call_sleep, '/io/github/ffy00/dbus_objects/slow', 0)
+
+        slow_body, slow_time = slow.result()
+        fast_body, fast_time = fast.result()
+
+    assert slow_body == fast_body == ('Slept!',)
+    # the slow call must not block the fast one
+    assert fast_time < slow_time
+
+
+def test_listen_workers_serialized(jeepney_threaded_server):
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        slow = executor.submit(_call_sleep, '/io/github/ffy00/dbus_objects/slow_serial', 0.5)
+        time.sleep(0.1)
+        fast = executor.submit(_call_sleep, '/io/github/ffy00/dbus_objects/slow_serial', 0)
+
+        slow_body, slow_time = slow.result()
+        fast_body, fast_time = fast.result()
+
+    assert slow_body == fast_body == ('Slept!',)
+    assert fast_time > slow_time
+
+
+def test_listen_workers_serialized_queued(jeepney_threaded_server):
+    with concurrent.futures.ThreadPoolExecutor(max_workers=9) as executor:
+        # more calls to the serialized object than there are workers
+        serialized = [
+            executor.submit(_call_sleep, '/io/github/ffy00/dbus_objects/slow_serial', 0.2)
+            for _ in range(8)
+        ]
+        time.sleep(0.1)
+        fast = executor.submit(_call_sleep, '/io/github/ffy00/dbus_objects/slow', 0)
+
+        serialized_results = [future.result() for future in serialized]
+        fast_body, fast_time = fast.result()
+
+    assert fast_body == ('Slept!',)
+    assert all(body == ('Slept!',) for body, _time in serialized_results)
+    # the queued calls don't hold the workers, so the other objects are still served
+    assert fast_time < sorted(call_time for _body, call_time in serialized_results)[1]
+
+
+def test_unregister_object(jeepney_threaded_server):
+    jeepney_threaded_server.unregister_object('/io/github/ffy00/dbus_objects/slow_serial')
+    assert '/io/github/ffy00/dbus_objects/slow_serial' not in jeepney_threaded_server._serial_locks
+
+    address = jeepney.DBusAddress(
+        '/io/github/ffy00/dbus_objects/slow_serial',
+        bus_name='io.github.ffy00.dbus-objects.threaded_tests',
+        interface='com.example.object.SlowExampleObject',
+    )
+    msg = jeepney.new_method_call(address, 'Sleep', 'd', (0,))
+    with jeepney.io.blocking.open_dbus_connection(bus='SESSION') as connection:
+        reply = connection.send_and_get_reply(msg, timeout=3)
+        assert reply.header.message_type == jeepney.MessageType.error
+        assert reply.header.fields[jeepney.HeaderFields.error_name] == 'org.freedesktop.DBus.Error.UnknownObject'
+
+        # the path still exists, the method doesn't
+        address = jeepney.DBusAddress(
+            '/io/github/ffy00/dbus_objects/slow',
+            bus_name='io.github.ffy00.dbus-objects.threaded_tests',
+            interface='com.example.object.SlowExampleObject',
+        )
+        msg = jeepney.new_method_call(address, 'Unknown')
+        reply = connection.send_and_get_reply(msg, timeout=3)
+        assert reply.header.fields[jeepney.HeaderFields.error_name] == 'org.freedesktop.DBus.Error.UnknownMethod'
+
+
+def test_invalid_signature(jeepney_threaded_server):
+    address = jeepney.DBusAddress(
+        '/io/github/ffy00/dbus_objects/slow',
+        bus_name='io.github.ffy00.dbus-objects.threaded_tests',
+        interface='com.example.object.SlowExampleObject',
+    )
+    with jeepney.io.blocking.open_dbus_connection(bus='SESSION') as connection:
+        reply = connection.send_and_get_reply(jeepney.new_method_call(address, 'Sleep', 's', ('0',)), timeout=3)
+        assert reply.header.message_type == jeepney.MessageType.error
+        assert reply.header.fields[jeepney.HeaderFields.error_name] == 'org.freedesktop.DBus.Error.InvalidArgs'
+
+        # the server is still connected
+        reply = connection.send_and_get_reply(jeepney.new_method_call(address, 'Sleep', 'd', (0,)), timeout=3)
+        assert reply.body == ('Slept!',)
+
+
+def test_buffers(jeepney_threaded_server):
+    address = jeepney.DBusAddress(
+        '/io/github/ffy00/dbus_objects/buffer',
+        bus_name='io.github.ffy00.dbus-objects.threaded_tests',
+        interface='com.example.object.BufferExampleObject',
+    )
+    with jeepney.io.blocking.open_dbus_connection(bus='SESSION') as connection:
+        reply = connection.send_and_get_reply(jeepney.new_method_call(address, 'Describe', 'ay', (b'data',)), timeout=3)
+        assert reply.body == ("memoryview b'data'",)
+
+        reply = connection.send_and_get_reply(jeepney.new_method_call(address, 'Samples', 'i', (3,)), timeout=3)
+        assert reply.header.fields[jeepney.HeaderFields.signature] == 'ai'
+        assert reply.body == ([-3, -2, -1, 0, 1, 2],)
+
+        reply = connection.send_and_get_reply(jeepney.new_method_call(address, 'Blob', 'i', (2 ** 20,)), timeout=3)
+        assert reply.body == (bytes(range(256)) * (2 ** 12),)
+
+
+def _check_fds(connection, bus_name):
+    address = jeepney.DBusAddress(
+        '/io/github/ffy00/dbus_objects/fd',
+        bus_name=bus_name,
+        interface='com.example.object.FDExampleObject',
+    )
+    read_fd, write_fd = os.pipe()
+    with open(read_fd, 'rb') as read_file:
+        with open(write_fd, 'wb') as write_file:
+            reply = connection.send_and_get_reply(
+                jeepney.new_method_call(address, 'Write', 'hs', (write_file, 'through the pipe')), timeout=3
+            )
+            assert reply.header.message_type == jeepney.MessageType.method_return
+        # the server closed its copy of the write end, so we get EOF
+        assert read_file.read() == b'through the pipe'
+
+    reply = connection.send_and_get_reply(jeepney.new_method_call(address, 'Pipe', 's', ('from the server',)), timeout=3)
+    fd, = reply.body
+    with fd.to_file('rb') as read_file:
+        assert read_file.read() == b'from the server'
+
+
+def test_fds(jeepney_threaded_server):
+    with jeepney.io.blocking.open_dbus_connection(bus='SESSION', enable_fds=True) as connection:
+        _check_fds(connection, 'io.github.ffy00.dbus-objects.threaded_tests')
+
+
+def test_fds_coroutine_method(jeepney_threaded_server, monkeypatch):
+    closed = []
+    close_fds = _JeepneyMethodCall.close_fds
+
+    def record_close_fds(call):
+        closed.append(call.descriptor.name)
+        close_fds(call)
+
+    monkeypatch.setattr(_JeepneyMethodCall, 'close_fds', record_close_fds)
+    address = jeepney.DBusAddress(
+        '/io/github/ffy00/dbus_objects/fd',
+        bus_name='io.github.ffy00.dbus-objects.threaded_tests',
+        interface='com.example.object.FDExampleObject',
+    )
+    read_fd, write_fd = os.pipe()
+    with jeepney.io.blocking.open_dbus_connection(bus='SESSION', enable_fds=True) as connection:
+        with open(read_fd, 'rb') as read_file:
+            with open(write_fd, 'wb') as write_file:
+                reply = connection.send_and_get_reply(
+                    jeepney.new_method_call(address, 'WriteAsync', 'hs', (write_file, 'data')), timeout=3
+                )
+            assert reply.header.fields[jeepney.HeaderFields.error_name] == 'org.freedesktop.DBus.Error.NotSupported'
+            # the call was rejected, but the server still closed the descriptor it received
+            assert closed == ['WriteAsync']
+            assert read_file.read() == b''
+
+
+def test_map_fds():
+    value_type = jeepney.low_level.parse_signature(list('(ha{sh}(vh)ai)'))
+    value = (1, {'a': 2}, (('h', 3), 4), [5])
+    assert _map_fds(value_type, value, lambda fd: fd * 10) == (10, {'a': 20}, (('h', 30), 40), [5])
+
+
+def test_buffer_message():
+    body = (1, array.array('i', [1, -2, 3]), bytearray(b'xyz'), memoryview(array.array('d', [0.5])), ['a'], b'')
+    address = jeepney.DBusAddress('/io/github/ffy00/dbus_objects/buffer', bus_name='com.example', interface='com.example')
+    msg = jeepney.new_method_call(address, 'Method', 'yaiayadasay', body)
+    buffer_msg = _BufferMessage(msg.header, msg.body)
+    expected = jeepney.new_method_call(address, 'Method', 'yaiayadasay', (1, [1, -2, 3], b'xyz', [0.5], ['a'], b''))
+    expected.header.endianness = buffer_msg.header.endianness
+
+    assert buffer_msg.serialise(serial=5) == expected.serialise(serial=5)
+    assert jeepney.Message.from_buffer(buffer_msg.serialise(serial=5)).body == expected.body
+
+
+def test_buffer_view():
+    assert _buffer_view(array.array('i', [1]), 4).tolist() == list(array.array('i', [1]).tobytes())
+    with pytest.raises(TypeError):
+        _buffer_view(array.array('h', [1, 2]), 4)
+    with pytest.raises(TypeError):
+        _buffer_view(memoryview(b'abcdefgh')[::2], 1)
+    with pytest.raises(ValueError):
+        _buffer_view(b'abc', 4)
+
+
+@pytest.fixture()
+def cpu_bound_server():
+    server = BlockingDBusServer(
+        bus='SESSION',
+        name='io.github.ffy00.dbus-objects.cpu_bound_tests'
+    )
+    server.register_object('/io/github/ffy00/dbus_objects/cpu_bound', CPUBoundExampleObject())
+    thread = threading.Thread(target=server.listen, kwargs={'processes': 2})
+    thread.start()
+    yield server
+    server.stop()
+    thread.join()
+    server.close()
+
+
+def _call_cpu_bound(path, method, signature='', body=()):
+    address = jeepney.DBusAddress(
+        path,
+        bus_name='io.github.ffy00.dbus-objects.cpu_bound_tests',
+        interface='com.example.object.CPUBoundExampleObject',
+    )
+    msg = jeepney.new_method_call(address, method, signature, body)
+    with jeepney.io.blocking.open_dbus_connection(bus='SESSION') as connection:
+        return connection.send_and_get_reply(msg, timeout=3)
+
+
+def test_listen_processes(cpu_bound_server):
+    reply = _call_cpu_bound('/io/github/ffy00/dbus_objects/cpu_bound', 'Pid')
+    assert reply.body[0] != os.getpid()
+
+    reply = _call_cpu_bound('/io/github/ffy00/dbus_objects/cpu_bound', 'Fail')
+    assert reply.header.message_type == jeepney.MessageType.error
+    assert reply.header.fields[jeepney.HeaderFields.error_name] == 'org.freedesktop.DBus.Error.Failed'
+    assert reply.body == ('RuntimeError: failed in the worker',)
+
+    # the calls run in parallel, even without worker threads
+    with concurrent.futures.ThreadPoolExecutor() as executor:
+        replies = list(executor.map(
+            lambda seconds: _call_cpu_bound('/io/github/ffy00/dbus_objects/cpu_bound', 'Sleep', 'd', (seconds,)),
+            [0.5, 0.5],
+        ))
+    (first_start, first_end), (second_start, second_end) = [reply.body for reply in replies]
+    assert max(first_start, second_start) < min(first_end, second_end)
+
+
+def test_listen_processes_signals(cpu_bound_server):
+    rule = jeepney.bus_messages.MatchRule(
+        type='signal',
+        interface='com.example.object.CPUBoundExampleObject',
+        member='Tick',
+    )
+    with jeepney.io.blocking.open_dbus_connection(bus='SESSION') as connection:
+        jeepney.io.blocking.Proxy(jeepney.bus_messages.message_bus, connection).AddMatch(rule)
+        with connection.filter(rule) as queue:
+            reply = _call_cpu_bound('/io/github/ffy00/dbus_objects/cpu_bound', 'EmitTick')
+            assert reply.body[0] != os.getpid()
+            # the workers don't write to the server connections, so the first signal is the one emitted here
+            [obj] = cpu_bound_server._objects['/io/github/ffy00/dbus_objects/cpu_bound']
+            obj.tick(0)
+            assert connection.recv_until_filtered(queue, timeout=3).body == (0,)
+
+
+def test_listen_processes_registered_later(cpu_bound_server):
+    # the workers were forked without this object, so it is called in-process
+    cpu_bound_server.register_object('/io/github/ffy00/dbus_objects/cpu_bound_later', CPUBoundExampleObject())
+    reply = _call_cpu_bound('/io/github/ffy00/dbus_objects/cpu_bound_later', 'Pid')
+    assert reply.body[0] == os.getpid()
+
+
+def test_get_managed_objects(jeepney_threaded_server):
+    address = jeepney.DBusAddress(
+        '/io/github/ffy00/dbus_objects',
+        bus_name='io.github.ffy00.dbus-objects.threaded_tests',
+        interface='org.freedesktop.DBus.ObjectManager',
+    )
+    msg = jeepney.new_method_call(address, 'GetManagedObjects')
+    with jeepney.io.blocking.open_dbus_connection(bus='SESSION') as connection:
+        reply = connection.send_and_get_reply(msg, timeout=3)
+
+    assert reply.header.fields[jeepney.HeaderFields.signature] == 'a{oa{sa{sv}}}'
+    objects, = reply.body
+    assert sorted(objects) == [
+        '/io/github/ffy00/dbus_objects/buffer',
+        '/io/github/ffy00/dbus_objects/fd',
+        '/io/github/ffy00/dbus_objects/slow',
+        '/io/github/ffy00/dbus_objects/slow_serial',
+    ]
+    assert objects['/io/github/ffy00/dbus_objects/slow']['com.example.object.SlowExampleObject'] == {}
+
+
+@pytest.fixture()
+def private_bus():
+    daemon = subprocess.Popen(
+        ['dbus-daemon', '--session', '--nofork', '--print-address'],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+    )
+    yield daemon.stdout.readline().strip()
+    daemon.terminate()
+    daemon.wait()
+    daemon.stdout.close()
+
+
+def test_add_bus(private_bus, obj, signal_obj):
+    server = BlockingDBusServer(
+        bus='SESSION',
+        name='io.github.ffy00.dbus-objects.multi_bus_tests'
+    )
+    server.register_object('/io/github/ffy00/dbus_objects/example', obj)
+    server.register_object('/io/github/ffy00/dbus_objects/example_signal', signal_obj)
+    thread = threading.Thread(target=server.listen)
+    thread.start()
+    # buses can be added while listening
+    server.add_bus(private_bus)
+
+    address = jeepney.DBusAddress(
+        '/io/github/ffy00/dbus_objects/example',
+        bus_name='io.github.ffy00.dbus-objects.multi_bus_tests',
+        interface='com.example.object.ExampleObject',
+    )
+    rule = jeepney.bus_messages.MatchRule(
+        type='signal',
+        interface='com.example.object.ExampleObjectWithSignal',
+        member='Signal',
+        path='/io/github/ffy00/dbus_objects/example_signal',
+    )
+    try:
+        with contextlib.ExitStack() as stack:
+            connections = [
+                stack.enter_context(jeepney.io.blocking.open_dbus_connection(bus))
+                for bus in ('SESSION', private_bus)
+            ]
+            for connection in connections:
+                # calls are replied to on the bus they were received from
+                reply = connection.send_and_get_reply(jeepney.new_method_call(address, 'Ping'), timeout=3)
+                assert reply.body == ('Pong!',)
+                jeepney.io.blocking.Proxy(jeepney.bus_messages.message_bus, connection).AddMatch(rule)
+
+            # signals are emitted on all buses
+            signal_obj.signal(30, 'test')
+            for connection in connections:
+                with connection.filter(rule) as queue:
+                    assert connection.recv_until_filtered(queue, timeout=3).body == (30, 'test')
+    finally:
+        server.stop()
+        thread.join()
+        server.close()
+
+
+@pytest.fixture()
+def peer_server(obj, signal_obj):
+    server = BlockingDBusServer(
+        bus='SESSION',
+        name='io.github.ffy00.dbus-objects.peer_tests'
+    )
+    server.register_object('/io/github/ffy00/dbus_objects/example', obj)
+    server.register_object('/io/github/ffy00/dbus_objects/example_signal', signal_obj)
+    server.register_object('/io/github/ffy00/dbus_objects/fd', FDExampleObject())
+    thread = threading.Thread(target=server.listen)
+    thread.start()
+    yield server
+    server.stop()
+    thread.join()
+    server.close()
+
+
+def test_add_listener(tmp_path, peer_server, signal_obj):
+    address = f'unix:path={tmp_path / "socket"}'
+    peer_server.add_listener(address)
+
+    rule = jeepney.bus_messages.MatchRule(
+        type='signal',
+        interface='com.example.object.ExampleObjectWithSignal',
+        member='Signal',
+        path='/io/github/ffy00/dbus_objects/example_signal',
+    )
+    with jeepney.io.blocking.open_dbus_connection(address, enable_fds=True) as connection:
+        assert connection.unique_name == ':1.1'
+        msg = jeepney.new_method_call(
+            jeepney.DBusAddress(
+                '/io/github/ffy00/dbus_objects/example',
+                bus_name='io.github.ffy00.dbus-objects.peer_tests',
+                interface='com.example.object.ExampleObject',
+            ),
+            'Ping',
+        )
+        assert connection.send_and_get_reply(msg, timeout=3).body == ('Pong!',)
+
+        jeepney.io.blocking.Proxy(jeepney.bus_messages.message_bus, connection).AddMatch(rule)
+        signal_obj.signal(30, 'test')
+        with connection.filter(rule) as queue:
+            assert connection.recv_until_filtered(queue, timeout=3).body == (30, 'test')
+
+        _check_fds(connection, 'io.github.ffy00.dbus-objects.peer_tests')
+
+    # the connection is dropped once the peer disconnects
+    deadline = time.monotonic() + 3
+    while len(peer_server._connections) > 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(peer_server._connections) == 1
+
+
+def test_add_listener_not_reading(tmp_path, peer_server, signal_obj):
+    address = f'unix:path={tmp_path / "socket"}'
+    peer_server.add_listener(address)
+    peer_server.peer_max_output = 2 ** 20
+    value = 'x' * 2 ** 16
+
+    with jeepney.io.blocking.open_dbus_connection(address) as connection:
+        # more than the socket buffers take, but less than the limit
+        for _ in range(8):
+            signal_obj.signal(30, value)
+        # the rest is written once the peer reads
+        for _ in range(8):
+            assert connection.receive(timeout=3).body == (30, value)
+
+        # the peer stops reading, the server keeps serving everyone else
+        for _ in range(32):
+            signal_obj.signal(30, value)
+        msg = jeepney.new_method_call(
+            jeepney.DBusAddress(
+                '/io/github/ffy00/dbus_objects/example',
+                bus_name='io.github.ffy00.dbus-objects.peer_tests',
+                interface='com.example.object.ExampleObject',
+            ),
+            'Ping',
+        )
+        with jeepney.io.blocking.open_dbus_connection(bus='SESSION') as bus_connection:
+            assert bus_connection.send_and_get_reply(msg, timeout=3).body == ('Pong!',)
+
+        # and drops the peer, as its queue went over the limit
+        deadline = time.monotonic() + 3
+        while len(peer_server._connections) > 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert len(peer_server._connections) == 1
+
+
+def test_add_listener_close(tmp_path):
+    server = BlockingDBusServer(
+        bus='SESSION',
+        name='io.github.ffy00.dbus-objects.peer_close_tests'
+    )
+    server.add_listener(f'unix:path={tmp_path / "socket"}')
+    assert (tmp_path / 'socket').exists()
+
+    server.close()
+    assert not (tmp_path / 'socket').exists()
+
+
+def test_add_listener_rejected(tmp_path, peer_server):
+    address = f'unix:path={tmp_path / "socket"}'
+    peer_server.add_listener(address, uids=())
+
+    # the socket is closed before the handshake, which the client may see as a reset
+    with pytest.raises((jeepney.auth.AuthenticationError, ConnectionError)):
+        jeepney.io.blocking.open_dbus_connection(address)
+
+    # the peer is dropped before any handshake
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.settimeout(3)
+        sock.connect(str(tmp_path / 'socket'))
+        assert sock.recv(1024) == b''
+    assert not any(thread.name.endswith('-auth') for thread in threading.enumerate())
+
+
+def test_add_listener_max_handshakes(tmp_path, peer_server):
+    address = f'unix:path={tmp_path / "socket"}'
+    peer_server.add_listener(address)
+    peer_server.peer_max_handshakes = 1
+
+    with socket.socket(socket.AF_UNIX) as pending:
+        # authenticating, but never finishing
+        pending.connect(str(tmp_path / 'socket'))
+        pending.sendall(b'\0')
+
+        with socket.socket(socket.AF_UNIX) as sock:
+            sock.settimeout(3)
+            sock.connect(str(tmp_path / 'socket'))
+            assert sock.recv(1024) == b''
+
+    # the pending handshake fails once the peer goes away, making room for others
+    deadline = time.monotonic() + 3
+    while peer_server._handshakes and time.monotonic() < deadline:
+        time.sleep(0.01)
+    with jeepney.io.blocking.open_dbus_connection(address) as connection:
+        assert connection.unique_name
+
+
+def test_add_listener_auth_timeout(tmp_path, peer_server):
+    address = f'unix:path={tmp_path / "socket"}'
+    peer_server.add_listener(address)
+    peer_server.peer_auth_timeout = 0.5
+
+    with socket.socket(socket.AF_UNIX) as sock:
+        sock.settimeout(3)
+        sock.connect(str(tmp_path / 'socket'))
+        start = time.monotonic()
+        # a peer sending a byte at a time, each within the timeout
+        try:
+            for byte in b'\0AUTH EXTERNAL':
+                sock.send(bytes([byte]))
+                time.sleep(0.1)
+            assert sock.recv(1024) == b''
+        except ConnectionError:  # dropped while sending, or without reading everything
+            pass
+        assert time.monotonic() - start < 1.5
+
+
+def test_sasl_external_handshake():
+    a, b = socket.socketpair()
+    with a, b, concurrent.futures.ThreadPoolExecutor() as executor:
+        result = executor.submit(_sasl_external_handshake, a, {os.getuid()}, 'guid')
+
+        b.sendall(b'\0AUTH ANONYMOUS\r\n')
+        assert b.recv(1024) == b'REJECTED EXTERNAL\r\n'
+        b.sendall(f'AUTH EXTERNAL {str(os.getuid() + 1).encode().hex()}\r\n'.encode())
+        assert b.recv(1024) == b'REJECTED EXTERNAL\r\n'
+        b.sendall(b'BEGIN\r\n')
+        assert b.recv(1024) == b'ERROR\r\n'
+        # without initial response
+        b.sendall(b'AUTH EXTERNAL\r\n')
+        assert b.recv(1024) == b'DATA\r\n'
+        b.sendall(b'DATA\r\n')
+        assert b.recv(1024) == b'OK guid\r\n'
+        b.sendall(b'NEGOTIATE_UNIX_FD\r\n')
+        assert b.recv(1024) == b'AGREE_UNIX_FD\r\n'
+        b.sendall(b'BEGIN\r\nmessage data')
+
+        assert result.result(timeout=3)
+        # the data after BEGIN is left in the socket
+        assert a.recv(1024) == b'message data'
+
+
+def test_sasl_external_handshake_max_lines():
+    a, b = socket.socketpair()
+    with a, b, concurrent.futures.ThreadPoolExecutor() as executor:
+        result = executor.submit(_sasl_external_handshake, a, {os.getuid()}, 'guid', 3, max_lines=4)
+
+        b.sendall(b'\0')
+        for _ in range(4):
+            b.sendall(b'UNKNOWN\r\n')
+            assert b.recv(1024) == b'ERROR\r\n'
+        b.sendall(b'UNKNOWN\r\n')
+
+        with pytest.raises(ValueError, match='Too many handshake lines'):
+            result.result(timeout=3)
+
+
+def test_stop():
+    server = BlockingDBusServer(
+        bus='SESSION',
+        name='io.github.ffy00.dbus-objects.stop_tests'
+    )
+    thread = threading.Thread(target=server.listen)
+    thread.start()
+    time.sleep(0.1)
+
+    # the loop waits with no timeout, so it only returns if stop wakes it up
+    start = time.monotonic()
+    server.stop()
+    thread.join(timeout=3)
+    server.close()
+
+    assert not thread.is_alive()
+    assert time.monotonic() - start < 1
+
+
+def test_listen_pipelined(jeepney_one_time_server, jeepney_client):
+    with jeepney.io.blocking.open_dbus_connection(bus='SESSION') as connection:
+        serials = [next(connection.outgoing_serial) for _ in range(20)]
+        # send all calls before reading any reply, so the server receives them in batches
+        connection.sock.sendall(b''.join(
+            jeepney.new_method_call(jeepney_client, 'Ping', '', ()).serialise(serial=serial)
+            for serial in serials
+        ))
+
+        replies = {}
+        while len(replies) < len(serials):
+            msg = connection.receive(timeout=3)
+            reply_serial = msg.header.fields.get(jeepney.HeaderFields.reply_serial)
+            if reply_serial in serials:
+                replies[reply_serial] = msg.body
+
+    assert replies == {serial: ('Pong!',) for serial in serials}
+
+
+def test_sendmsg_all():
+    buffers = [bytes([i]) * (i * 10000) for i in range(1, 20)]
+    a, b = socket.socketpair()
+    with a, b:
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            sent = executor.submit(_sendmsg_all, a, buffers)
+            received = bytearray()
+            while len(received) < sum(len(buffer) for buffer in buffers):
+                received += b.recv(65536)
+            sent.result()
+
+    assert received == b''.join(buffers)
@@ -0,0 +1,168 @@
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import contextlib
+import threading
+
+import jeepney
+import jeepney.bus_messages
+import jeepney.io.asyncio
+import pytest
+
+from dbus_objects import DBusObject, dbus_method
+from dbus_objects.integration.jeepney import AsyncioDBusServer
+from dbus_objects.types import UnixFD
+
+
+NAME = 'io.github.ffy00.dbus-objects.jeepney_asyncio_test'
+
+
+class AsyncExampleObject(DBusObject):
+    def __init__(self):
+        super().__init__(default_interface_root='com.example.object')
+
+    @dbus_method()
+    async def sleep(self, seconds: float) -> str:
+        await asyncio.sleep(seconds)
+        return 'Slept!'
+
+    @dbus_method()
+    def stdin(self) -> UnixFD:
+        return 0  # pragma: no cover
+
+
+@pytest.fixture()
+def client():
+    return jeepney.DBusAddress(
+        '/io/github/ffy00/dbus_objects/example',
+        bus_name=NAME,
+        interface='com.example.object.ExampleObject',
+    )
+
+
+@pytest.fixture()
+def async_client():
+    return jeepney.DBusAddress(
+        '/io/github/ffy00/dbus_objects/example_async',
+        bus_name=NAME,
+        interface='com.example.object.AsyncExampleObject',
+    )
+
+
+@contextlib.asynccontextmanager
+async def run_server(obj, signal_obj, properties_obj=None, **kwargs):
+    server = await AsyncioDBusServer.new(bus='SESSION', name=NAME)
+    server.register_object('/io/github/ffy00/dbus_objects/example', obj)
+    server.register_object('/io/github/ffy00/dbus_objects/example_async', AsyncExampleObject())
+    server.register_object('/io/github/ffy00/dbus_objects/example_signal', signal_obj)
+    if properties_obj is not None:
+        server.register_object('/io/github/ffy00/dbus_objects/example_properties', properties_obj)
+
+    task = asyncio.ensure_future(server.listen(**kwargs))
+    try:
+        conn = await jeepney.io.asyncio.open_dbus_connection(bus='SESSION')
+        async with conn, jeepney.io.asyncio.DBusRouter(conn) as router:
+            yield router
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        await server.close()
+
+
+def test_create_error():
+    with pytest.raises(jeepney.DBusErrorResponse):
+        asyncio.run(AsyncioDBusServer.new(bus='SESSION', name='org.freedesktop.DBus'))
+
+
+def test_listen_asyncio(obj, signal_obj, client, async_client):
+    async def main():
+        async with run_server(obj, signal_obj) as router:
+            ping = jeepney.new_method_call(client, 'Ping', '', ())
+            sleep = jeepney.new_method_call(async_client, 'Sleep', 'd', (0,))
+            return (
+                await asyncio.wait_for(router.send_and_get_reply(ping), 3),
+                await asyncio.wait_for(router.send_and_get_reply(sleep), 3),
+            )
+
+    ping_reply, sleep_reply = asyncio.run(main())
+
+    assert ping_reply.header.message_type is jeepney.MessageType.method_return
+    assert ping_reply.body == ('Pong!',)
+    assert sleep_reply.header.message_type is jeepney.MessageType.method_return
+    assert sleep_reply.body == ('Slept!',)
+
+
+def test_concurrent_calls_asyncio(obj, signal_obj, client, async_client):
+    async def main():
+        async with run_server(obj, signal_obj, max_concurrent_calls=2) as router:
+            replies = []
+
+            async def call(address, method, signature, body):
+                msg = jeepney.new_method_call(address, method, signature, body)
+                replies.append((await router.send_and_get_reply(msg)).body)
+
+            sleep = asyncio.ensure_future(call(async_client, 'Sleep', 'd', (0.5,)))
+            await asyncio.sleep(0.1)
+            # the slow call above must not block this one
+            await asyncio.wait_for(asyncio.gather(sleep, call(client, 'Ping', '', ())), 3)
+            return replies
+
+    assert asyncio.run(main()) == [('Pong!',), ('Slept!',)]
+
+
+def test_fds_asyncio(obj, signal_obj, async_client):
+    async def main():
+        async with run_server(obj, signal_obj) as router:
+            msg = jeepney.new_method_call(async_client, 'Stdin')
+            return await asyncio.wait_for(router.send_and_get_reply(msg), 3)
+
+    reply = asyncio.run(main())
+
+    assert reply.header.message_type is jeepney.MessageType.error
+    assert reply.header.fields[jeepney.HeaderFields.error_name] == 'org.freedesktop.DBus.Error.NotSupported'
+
+
+def test_properties_changed_asyncio(obj, signal_obj, properties_obj):
+    rule = jeepney.bus_messages.MatchRule(
+        type='signal',
+        interface='org.freedesktop.DBus.Properties',
+        member='PropertiesChanged',
+        path='/io/github/ffy00/dbus_objects/example_properties',
+    )
+
+    async def main():
+        async with run_server(obj, signal_obj, properties_obj=properties_obj) as router:
+            bus_proxy = jeepney.io.asyncio.Proxy(jeepney.bus_messages.message_bus, router)
+            await bus_proxy.AddMatch(rule)
+            with router.filter(rule) as queue:
+                properties_obj.age = 10
+                return await asyncio.wait_for(queue.get(), 3)
+
+    signal_msg = asyncio.run(main())
+
+    assert signal_msg.body == ('com.example.object.ExampleObjectWithProperties', {'Age': ('i', 10)}, [])
+    # the getter runs in the event loop, like the calls
+    assert properties_obj.age_threads == [threading.current_thread()]
+
+
+def test_emit_signal_asyncio(obj, signal_obj):
+    rule = jeepney.bus_messages.MatchRule(
+        type='signal',
+        interface='com.example.object.ExampleObjectWithSignal',
+        member='Signal',
+        path='/io/github/ffy00/dbus_objects/example_signal',
+    )
+
+    async def main():
+        async with run_server(obj, signal_obj) as router:
+            bus_proxy = jeepney.io.asyncio.Proxy(jeepney.bus_messages.message_bus, router)
+            await bus_proxy.AddMatch(rule)
+            with router.filter(rule) as queue:
+                signal_obj.signal(30, 'test')
+                return await asyncio.wait_for(queue.get(), 3)
+
+    signal_msg = asyncio.run(main())
+
+    assert signal_msg.header.fields[jeepney.HeaderFields.signature] == 'is'
+    assert signal_msg.body == (30, 'test')
@@ -1,11 +1,15 @@
 # SPDX-License-Identifier: MIT
 
+import os
+
 import jeepney
 import jeepney.io.trio
 import pytest
 import trio
 
+from dbus_objects import DBusObject, dbus_method
 from dbus_objects.integration.jeepney import TrioDBusServer
+from dbus_objects.types import UnixFD
 
 
 pytestmark = [
@@ -13,17 +17,54 @@ pytestmark = [
 ]
 
 
+class AsyncExampleObject(DBusObject):
+    def __init__(self):
+        super().__init__(default_interface_root='com.example.object')
+
+    @dbus_method()
+    async def sleep(self, seconds: float) -> str:
+        await trio.sleep(seconds)
+        return 'Slept!'
+
+    @dbus_method(cpu_bound=True)
+    def pid(self) -> int:
+        return os.getpid()
+
+    @dbus_method()
+    async def pipe(self, data: str) -> UnixFD:
+        read_fd, write_fd = os.pipe()
+        os.write(write_fd, data.encode())
+        os.close(write_fd)
+        return read_fd
+
+    @dbus_method()
+    def write(self, fd: UnixFD, data: str) -> None:
+        os.write(fd, data.encode())
+
+
 @pytest.fixture()
-async def jeepney_trio_server(obj, nursery):
+async def jeepney_trio_server(request, obj, nursery):
+    max_concurrent_calls = getattr(request, 'param', None)
     server = await TrioDBusServer.new(
         bus='SESSION',
         name='io.github.ffy00.dbus-objects.jeepney_trio_test',
     )
 
     server.register_object('/io/github/ffy00/dbus_objects/example', obj)
+    server.register_object('/io/github/ffy00/dbus_objects/example_async', AsyncExampleObject())
+
+    async def listen(task_status=trio.TASK_STATUS_IGNORED):
+        with trio.CancelScope() as cancel_scope:
+            task_status.started(cancel_scope)
+            await server.listen(max_concurrent_calls=max_concurrent_calls)
 
     # start server
-    nursery.start_soon(server.listen)
+    cancel_scope = await nursery.start(listen)
+    yield server
+
+    # stop server, releasing the name for the next test
+    cancel_scope.cancel()
+    await server.close()
 
 
 @pytest.fixture()
@@ -54,3 +95,139 @@ async def test_listen_trio(jeepney_trio_client, jeepney_trio_router, jeepney_tri
 
     assert reply.header.message_type is jeepney.MessageType.method_return
     assert reply.body[0] == 'Pong!'
+
+
+async def test_multiple_returns_trio(jeepney_trio_client, jeepney_trio_router, jeepney_trio_server):
+    msg = jeepney.new_method_call(jeepney_trio_client, 'Multiple', 's', ('test',))
+
+    with trio.fail_after(3):
+        reply = await jeepney_trio_router.send_and_get_reply(msg)
+
+    assert reply.header.message_type is jeepney.MessageType.method_return
+    assert reply.header.fields[jeepney.HeaderFields.signature] == 'ii'
+    assert reply.body == (1, 2)
+
+
+@pytest.fixture()
+def jeepney_trio_async_client():
+    yield jeepney.DBusAddress(
+        '/io/github/ffy00/dbus_objects/example_async',
+        bus_name='io.github.ffy00.dbus-objects.jeepney_trio_test',
+        interface='com.example.object.AsyncExampleObject',
+    )
+
+
+async def test_async_method_trio(jeepney_trio_async_client, jeepney_trio_router, jeepney_trio_server):
+    msg = jeepney.new_method_call(jeepney_trio_async_client, 'Sleep', 'd', (0,))
+
+    with trio.fail_after(3):
+        reply = await jeepney_trio_router.send_and_get_reply(msg)
+
+    assert reply.header.message_type is jeepney.MessageType.method_return
+    assert reply.body == ('Slept!',)
+
+
+@pytest.mark.parametrize('jeepney_trio_server', [2], indirect=True)
+async def test_concurrent_calls_trio(
+    jeepney_trio_client,
+    jeepney_trio_async_client,
+    jeepney_trio_router,
+    jeepney_trio_server,
+):
+    replies = []
+
+    async def call(address, method, signature, body):
+        msg = jeepney.new_method_call(address, method, signature, body)
+        replies.append((await jeepney_trio_router.send_and_get_reply(msg)).body)
+
+    with trio.fail_after(3):
+        async with trio.open_nursery() as nursery:
+            nursery.start_soon(call, jeepney_trio_async_client, 'Sleep', 'd', (0.5,))
+            await trio.sleep(0.1)
+            # the slow call above must not block this one
+            nursery.start_soon(call, jeepney_trio_client, 'Ping', '', ())
+
+    assert replies == [('Pong!',), ('Slept!',)]
+
+
+async def test_listen_pipelined_trio(jeepney_trio_client, jeepney_trio_router, jeepney_trio_server):
+    replies = []
+
+    async def call():
+        msg = jeepney.new_method_call(jeepney_trio_client, 'Ping', '', ())
+        replies.append((await jeepney_trio_router.send_and_get_reply(msg)).body)
+
+    with trio.fail_after(3):
+        async with trio.open_nursery() as nursery:
+            for _ in range(20):
+                nursery.start_soon(call)
+
+    assert replies == [('Pong!',)] * 20
+
+
+async def test_fds_trio(jeepney_trio_async_client, nursery):
+    server = await TrioDBusServer.new(
+        bus='SESSION',
+        name='io.github.ffy00.dbus-objects.jeepney_trio_test',
+        enable_fds=True,
+    )
+    server.register_object('/io/github/ffy00/dbus_objects/example_async', AsyncExampleObject())
+
+    async def listen(task_status=trio.TASK_STATUS_IGNORED):
+        with trio.CancelScope() as cancel_scope:
+            task_status.started(cancel_scope)
+            await server.listen()
+
+    cancel_scope = await nursery.start(listen)
+    async with jeepney.io.trio.open_dbus_router(bus='SESSION', enable_fds=True) as router:
+        read_fd, write_fd = os.pipe()
+        with open(read_fd, 'rb') as read_file:
+            with open(write_fd, 'wb') as write_file:
+                msg = jeepney.new_method_call(jeepney_trio_async_client, 'Write', 'hs', (write_file, 'to the server'))
+                with trio.fail_after(3):
+                    reply = await router.send_and_get_reply(msg)
+                assert reply.header.message_type is jeepney.MessageType.method_return
+            # the server closed its copy of the write end, so we get EOF
+            assert read_file.read() == b'to the server'
+
+        msg = jeepney.new_method_call(jeepney_trio_async_client, 'Pipe', 's', ('from the server',))
+        with trio.fail_after(3):
+            reply = await router.send_and_get_reply(msg)
+    cancel_scope.cancel()
+    await server.close()
+
+    fd, = reply.body
+    with fd.to_file('rb') as read_file:
+        assert read_file.read() == b'from the server'
+
+
+async def test_fds_not_enabled_trio(jeepney_trio_async_client, jeepney_trio_router, jeepney_trio_server):
+    msg = jeepney.new_method_call(jeepney_trio_async_client, 'Pipe', 's', ('from the server',))
+    with trio.fail_after(3):
+        reply = await jeepney_trio_router.send_and_get_reply(msg)
+
+    assert reply.header.message_type is jeepney.MessageType.error
+    assert reply.header.fields[jeepney.HeaderFields.error_name] == 'org.freedesktop.DBus.Error.NotSupported'
+
+
+async def test_listen_processes_trio(jeepney_trio_async_client, jeepney_trio_router, nursery):
+    server = await TrioDBusServer.new(
+        bus='SESSION',
+        name='io.github.ffy00.dbus-objects.jeepney_trio_test',
+    )
+    server.register_object('/io/github/ffy00/dbus_objects/example_async', AsyncExampleObject())
+
+    async def listen(task_status=trio.TASK_STATUS_IGNORED):
+        with trio.CancelScope() as cancel_scope:
+            task_status.started(cancel_scope)
+            await server.listen(max_concurrent_calls=2, processes=1)
+
+    cancel_scope = await nursery.start(listen)
+    msg = jeepney.new_method_call(jeepney_trio_async_client, 'Pid')
+    with trio.fail_after(3):
+        reply = await jeepney_trio_router.send_and_get_reply(msg)
+    cancel_scope.cancel()
+    await server.close()
+
+    assert reply.header.message_type is jeepney.MessageType.method_return
+    assert reply.body[0] != os.getpid()
@@ -1,11 +1,14 @@
 # SPDX-License-Identifier: MIT
 
+import gc
+import weakref
 import xml.etree.ElementTree as ET
 
 import pytest
 import xmldiff
 
-from dbus_objects import DBusObject, DBusObjectException, DBusObjectWarning, dbus_method
+from dbus_objects import DBusObject, DBusObjectException, DBusObjectWarning, custom_dbus_signal, dbus_method
+from dbus_objects.types import UnixFD
 
 
 def test_dbus_object(obj):
@@ -51,6 +54,75 @@ def test_no_interface():
         list(TestObject().get_dbus_methods())
 
 
+def test_interface_per_object():
+    class TestObject(DBusObject):
+        def __init__(self, root):
+            super().__init__(default_interface_root=root)
+
+        @dbus_method()
+        def method(self) -> None:
+            pass  # pragma: no cover
+
+    first = TestObject('com.example.first')
+    second = TestObject('com.example.second')
+    [(_method, first_descriptor)] = first.get_dbus_methods()
+    [(_method, second_descriptor)] = second.get_dbus_methods()
+    assert first_descriptor.interface == 'com.example.first.TestObject'
+    assert second_descriptor.interface == 'com.example.second.TestObject'
+    # the member tables are shared by the objects with the same interface root
+    assert TestObject('com.example.first')._dbus_members is first._dbus_members
+
+
+def test_member_tables_per_name():
+    class TestObject(DBusObject):
+        def __init__(self, name):
+            super().__init__(name=name, default_interface_root='com.example')
+
+        @dbus_method(interface='com.example.Test')
+        def method(self) -> None:
+            pass  # pragma: no cover
+
+    class UnqualifiedObject(TestObject):
+        @dbus_method()
+        def other_method(self) -> None:
+            pass  # pragma: no cover
+
+    # the explicit interfaces do not depend on the name, so the table is shared
+    assert TestObject('First')._dbus_members is TestObject('Second')._dbus_members
+    # the resolved interface does, so each name gets its own table
+    first = UnqualifiedObject('First')
+    second = UnqualifiedObject('Second')
+    assert first._dbus_members is not second._dbus_members
+    assert [descriptor.interface for _method, descriptor in second.get_dbus_methods()] == [
+        'com.example.Test',
+        'com.example.Second',
+    ]
+
+    # the tables do not keep the class alive
+    cls = weakref.ref(UnqualifiedObject)
+    del UnqualifiedObject, first, second
+    gc.collect()
+    assert cls() is None
+
+
+def test_subclass_members():
+    class Parent(DBusObject):
+        def __init__(self):
+            super().__init__(default_interface_root='com.example')
+
+        @dbus_method()
+        def parent_method(self) -> None:
+            pass  # pragma: no cover
+
+    class Child(Parent):
+        @dbus_method()
+        def child_method(self) -> None:
+            pass  # pragma: no cover
+
+    assert [descriptor.name for _method, descriptor in Parent().get_dbus_methods()] == ['ParentMethod']
+    assert [descriptor.name for _method, descriptor in Child().get_dbus_methods()] == ['ParentMethod', 'ChildMethod']
+
+
 def test_property(obj_properties):
     for getter, setter, descriptor in obj_properties:
         if descriptor.name == 'Prop':
@@ -90,6 +162,91 @@ def test_custom_signal_call(signal_server, signal_obj):
     )
 
 
+def test_coalesced_signal_call(signal_server, signal_obj, scheduler):
+    for value in range(5):
+        signal_obj.coalesced_signal(value)
+    assert not signal_server.emitted_signals
+    scheduler.run()
+    assert signal_server.emitted_signals == [
+        ('CoalescedSignal', '/io/github/ffy00/dbus_objects/example', (4,)),
+    ]
+
+
+def test_rate_limited_signal_call(signal_server, signal_obj, scheduler):
+    for value in range(5):
+        signal_obj.rate_limited_signal(value)
+    assert signal_server.emitted_signals == [
+        ('RateLimitedSignal', '/io/github/ffy00/dbus_objects/example', (0,)),
+    ]
+    scheduler.run()
+    assert signal_server.emitted_signals == [
+        ('RateLimitedSignal', '/io/github/ffy00/dbus_objects/example', (0,)),
+        ('RateLimitedSignal', '/io/github/ffy00/dbus_objects/example', (4,)),
+    ]
+
+
+def test_signal_throttle_options():
+    with pytest.raises(ValueError):
+        custom_dbus_signal(coalesce=0.1, max_rate=10)(int)
+    with pytest.raises(ValueError):
+        custom_dbus_signal(max_rate=0)(int)
+
+
+def test_cpu_bound_coroutine():
+    async def method(self) -> None:
+        pass  # pragma: no cover
+
+    with pytest.raises(ValueError):
+        dbus_method(cpu_bound=True)(method)
+
+
+def test_cpu_bound_fds():
+    def method(self, fd: UnixFD) -> None:
+        pass  # pragma: no cover
+
+    with pytest.raises(ValueError):
+        dbus_method(cpu_bound=True)(method)
+
+
+def test_properties_changed(properties_server, properties_obj, scheduler):
+    properties_obj.name = 'other name'
+    properties_obj.age = 10
+    properties_obj.blob = 'large value'
+    properties_obj.age = 20
+    assert not properties_server.emitted_signals
+    # the changes are batched into a single flush
+    assert len(scheduler.callbacks) == 1
+    scheduler.run()
+    assert properties_server.emitted_signals == [
+        (
+            'PropertiesChanged',
+            '/io/github/ffy00/dbus_objects/example_properties',
+            (
+                'com.example.object.ExampleObjectWithProperties',
+                {'Name': ('s', 'other name'), 'Age': ('i', 20)},
+                ['Blob'],
+            ),
+        ),
+    ]
+
+
+def test_properties_changed_serialized(properties_server, properties_obj, scheduler):
+    properties_obj.serialize_calls = True
+    # a call is in progress, the getters can't run until it is done
+    with properties_obj._serial_lock:
+        properties_obj.age = 10
+        scheduler.run()
+        assert not properties_server.emitted_signals
+    scheduler.run()
+    assert properties_server.emitted_signals == [
+        (
+            'PropertiesChanged',
+            '/io/github/ffy00/dbus_objects/example_properties',
+            ('com.example.object.ExampleObjectWithProperties', {'Age': ('i', 10)}, []),
+        ),
+    ]
+
+
 def test_method_xml(obj_methods):
     for _method, descriptor in obj_methods:
         if descriptor.name == 'ExampleMethod':
@@ -118,6 +275,21 @@ def test_property_xml(obj_properties):
     assert False  # pragma: no cover
 
 
+def test_property_emits_changed_xml(properties_obj):
+    for _getter, _setter, descriptor in properties_obj.get_dbus_properties():
+        if descriptor.name == 'Blob':
+            assert not xmldiff.main.diff_texts(
+                ET.tostring(descriptor.xml).decode(),
+                (
+                    '<property name="Blob" type="s" access="readwrite">'
+                    '<annotation name="org.freedesktop.DBus.Property.EmitsChangedSignal" value="invalidates" />'
+                    '</property>'
+                )
+            )
+            return
+    assert False  # pragma: no cover
+
+
 def test_signal_xml(obj_signals):
     for _method, descriptor in obj_signals:
         if descriptor.name == 'Signal':
@@ -1,5 +1,7 @@
 # SPDX-License-Identifier: MIT
 
+import functools
+import inspect
 import typing
 
 import pytest
@@ -7,7 +9,7 @@ import pytest
 import dbus_objects.types
 
 from dbus_objects import DBusObject, DBusObjectException
-from dbus_objects.signature import DBusSignature, dbus_case
+from dbus_objects.signature import DBusMethodPlan, DBusSignature, dbus_case, signature_of
 
 
 @pytest.mark.parametrize(
@@ -23,6 +25,7 @@ from dbus_objects.signature import DBusSignature, dbus_case
         (dbus_objects.types.Int16, 'n'),
         (dbus_objects.types.Int32, 'i'),
         (dbus_objects.types.Int64, 'x'),
+        (dbus_objects.types.UnixFD, 'h'),
         (DBusObject, 'o'),
         (typing.List[int], 'ai'),
         (typing.Dict[str, int], 'a{si}'),
@@ -44,6 +47,16 @@ from dbus_objects.signature import DBusSignature, dbus_case
             dbus_objects.types.Int32,
             dbus_objects.types.Int64,
         ], '(yqutnix)'),
+        (typing.Tuple[
+            dbus_objects.types.ByteBuffer,
+            dbus_objects.types.UInt16Buffer,
+            dbus_objects.types.UInt32Buffer,
+            dbus_objects.types.UInt64Buffer,
+            dbus_objects.types.Int16Buffer,
+            dbus_objects.types.Int32Buffer,
+            dbus_objects.types.Int64Buffer,
+            dbus_objects.types.DoubleBuffer,
+        ], '(ayaqauatanaiaxad)'),
     ],
 )
 def test_signature(subtests, types, signature):
@@ -58,6 +71,22 @@ def test_signature(subtests, types, signature):
 def test_signature_error():
     with pytest.raises(DBusObjectException):
         DBusSignature._type_signature(complex)
+    with pytest.raises(DBusObjectException):
+        DBusSignature._type_signature(dbus_objects.types._typing.Annotated[dbus_objects.types.Buffer, 'as'])
+
+
+def test_signature_of():
+    typ = typing.Dict[str, typing.List[typing.Tuple[int, str]]]
+    assert signature_of(typ) == 'a{sa(is)}'
+
+    cache_info = dbus_objects.signature._cached_signature_of.cache_info()
+    assert signature_of(typ) == 'a{sa(is)}'
+    assert dbus_objects.signature._cached_signature_of.cache_info().hits == cache_info.hits + 1
+
+
+def test_signature_of_unhashable():
+    with pytest.raises(DBusObjectException):
+        signature_of(dbus_objects.types._typing.Annotated[int, ['y']])
 
 
 @pytest.mark.parametrize(
@@ -124,3 +153,70 @@ def test_get_dbus_sigature_no_annotations():
 
     with pytest.raises(DBusObjectException):
         DBusSignature.from_parameters(method, skip_first_argument=False)
+
+
+@pytest.mark.parametrize(
+    ('multiple_returns', 'return_type', 'value', 'body'),
+    [
+        (False, None, None, ()),
+        (False, int, 1, (1,)),
+        (False, typing.Tuple[int, int], (1, 2), ((1, 2),)),
+        (True, dbus_objects.types.MultipleReturn[int, int], (1, 2), (1, 2)),
+    ],
+)
+def test_method_plan(multiple_returns, return_type, value, body):
+    def method(self, a: str, b: typing.List[int]) -> return_type:
+        pass  # pragma: no cover
+
+    plan = DBusMethodPlan(
+        DBusSignature.from_parameters(method),
+        DBusSignature.from_return(method, multiple_returns=multiple_returns),
+        multiple_returns,
+    )
+
+    assert plan.input_signature == 'sai'
+    assert plan.unpack_arguments(('a', [1])) == ('a', [1])
+    assert plan.pack_return(value) == body
+
+
+def test_method_plan_buffers():
+    def method(self, a: dbus_objects.types.ByteBuffer, b: dbus_objects.types.Int32Buffer, c: str) -> None:
+        pass  # pragma: no cover
+
+    plan = DBusMethodPlan(DBusSignature.from_parameters(method), DBusSignature.from_return(method))
+
+    assert plan.input_signature == 'ayais'
+    a, b, c = plan.unpack_arguments((b'data', [1, -2], 'c'))
+    assert isinstance(a, memoryview) and isinstance(b, memoryview)
+    assert a.tobytes() == b'data'
+    assert b.format == 'i' and b.tolist() == [1, -2]
+    assert c == 'c'
+
+
+def _decorated(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        return func(*args, **kwargs)  # pragma: no cover
+    return wrapper
+
+
+def _plain(a: int, b, *args: str, c: float = 1.0, **kwargs: bool) -> str:
+    pass  # pragma: no cover
+
+
+async def _coroutine(a: int) -> None:
+    pass  # pragma: no cover
+
+
+@pytest.mark.parametrize('func', [_plain, _coroutine, _decorated(_plain), _decorated(_coroutine)])
+def test_function_annotations(func):
+    sig = inspect.signature(func)
+    args, ret = dbus_objects.signature._function_annotations(func)
+
+    assert [name for name, _annotation in args] == list(sig.parameters)
+    assert [
+        inspect.Parameter.empty if annotation is dbus_objects.signature._EMPTY else annotation
+        for _name, annotation in args
+    ] == [param.annotation for param in sig.parameters.values()]
+    assert ret == sig.return_annotation
+    assert dbus_objects.signature._is_coroutine_function(func) == inspect.iscoroutinefunction(func)